@@ -0,0 +1,352 @@
+"""
+Benchmarks the vendor drivers and PduLibraryManager against simulated PDUs, see Simulators.SimulatorFarm
+
+For every vendor, level (driver or manager), operation and concurrency (1, 10 and 100 callers by default) it
+measures the ops/sec, p50/p99 latency, device round trips per operation and peak traced memory. The simulated
+PDUs run in a child process, so that the traced memory is the one of the library only. Results are saved as
+JSON, and compared with a baseline when one is given: the run fails on regressions.
+
+Usage (from the Sources folder):
+    python -m Benchmarks.DriverBenchmark --output results.json
+    python -m Benchmarks.DriverBenchmark --output results.json --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from Simulators.SimulatorBase import SimulatorConfig
+from Simulators.SimulatorFarm import SimulatorFarm
+
+VENDORS = ('apc', 'raritan', 'dli', 'aten')
+LEVELS = ('driver', 'manager')
+OPERATIONS = ('get_pdu_info', 'get_port_info', 'power_on', 'power_off')
+CONCURRENCIES = (1, 10, 100)
+
+# Loopback range of the simulated PDUs of each vendor, Aten has no simulator since its driver does not
+# reach the device
+FARM_BASE_ADDRESSES = {
+    'apc': '127.1.0.1',
+    'raritan': '127.2.0.1',
+    'dli': '127.3.0.1'
+}
+
+
+def configure_library():
+    """
+    Points the session managers at the simulators, before the drivers create them
+    """
+    from PduLibrary.PDUManager.ApcSessionManager import ApcSessionManager
+    ApcSessionManager.get_instance(telnet_port=SimulatorFarm.default_ports['apc'])
+    try:
+        from PduLibrary.PDUManager.RaritanSessionPool import RaritanSessionPool
+    except ImportError:
+        return
+    RaritanSessionPool.get_instance(rpc_scheme='http')
+
+
+class FarmProcess(object):
+    """
+    A SimulatorFarm running in a child process, out of reach of tracemalloc and of the GIL of the benchmark
+    """
+
+    def __init__(self, vendor, pdu_count, config):
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=self._serve,
+                                                args=(child_connection, vendor, pdu_count, config,
+                                                      FARM_BASE_ADDRESSES[vendor]),
+                                                name='SimulatorFarm-' + vendor, daemon=True)
+
+    def start(self):
+        """
+        Starts the child process and returns once the PDUs listen
+        @return: List of targets
+        """
+        self._process.start()
+        return self._receive()
+
+    def get_stats(self):
+        self._connection.send('stats')
+        return self._receive()
+
+    def stop(self):
+        if self._process.is_alive():
+            self._connection.send('stop')
+            self._receive()
+        self._process.join()
+
+    def _receive(self):
+        error, value = self._connection.recv()
+        if error is not None:
+            raise Exception('Simulator farm failed: ' + error)
+        return value
+
+    @staticmethod
+    def _serve(connection, vendor, pdu_count, config, base_address):
+        farm = SimulatorFarm(vendor, pdu_count, config, base_address)
+        try:
+            farm.start()
+        except Exception as err:
+            connection.send((str(err), None))
+            return
+        connection.send((None, farm.get_targets()))
+        try:
+            while True:
+                command = connection.recv()
+                if command == 'stats':
+                    connection.send((None, farm.get_stats()))
+                else:
+                    break
+        finally:
+            farm.stop()
+            connection.send((None, None))
+
+
+def start_farm(vendor, pdu_count, config):
+    """
+    Starts the simulated PDUs of a vendor
+    @return: (FarmProcess or None, list of targets)
+    """
+    if vendor == 'aten':
+        return None, [{'manufacturer': 'aten', 'ip': '127.4.0.%d' % (index + 1), 'username': 'admin',
+                       'password': 'admin'} for index in range(pdu_count)]
+
+    farm = FarmProcess(vendor, pdu_count, config)
+    return farm, farm.start()
+
+
+def make_call(pdu_library_manager, vendor, level, operation, target, port):
+    """
+    Builds the callable running one operation against a target
+    Reads bypass the cache of the manager (max_age=0) and the outlet status snapshot of DliSwitchCache so that
+    every call reaches the device
+    """
+    arguments = (target['ip'], target['username'], target['password'])
+    if operation in ('get_pdu_info', 'get_port_info'):
+        read = make_read(pdu_library_manager, vendor, level, operation, arguments, port)
+        if vendor != 'dli':
+            return read
+        from PduLibrary.PDUManager.DliSwitchCache import DliSwitchCache
+        dli_switch_cache = DliSwitchCache.get_instance()
+
+        def uncached_read():
+            dli_switch_cache.invalidate_status(target['ip'], target['username'])
+            return read()
+
+        return uncached_read
+
+    if level == 'manager':
+        return lambda: getattr(pdu_library_manager, operation)(vendor, *arguments, port)
+    driver = pdu_library_manager.Factory(vendor)
+    power_state = 'ON' if operation == 'power_on' else 'OFF'
+    return lambda: getattr(driver, operation)(*arguments, port,
+                                              pdu_library_manager.get_default_power_output(power_state))
+
+
+def make_read(pdu_library_manager, vendor, level, operation, arguments, port):
+    """
+    Builds the callable running get_pdu_info or get_port_info against a target
+    """
+    if level == 'manager':
+        if operation == 'get_pdu_info':
+            return lambda: pdu_library_manager.get_pdu_info(vendor, *arguments, max_age=0)
+        return lambda: pdu_library_manager.get_port_info(vendor, *arguments, port, max_age=0)
+
+    driver = pdu_library_manager.Factory(vendor)
+    if operation == 'get_pdu_info':
+        return lambda: driver.get_pdu_info(*arguments, dict())
+    return lambda: driver.get_port_info(*arguments, port, dict())
+
+
+def run_calls(calls, concurrency, operation_count):
+    """
+    Runs operation_count calls from concurrency callers, caller i cycling over calls[i % len(calls)]
+    @return: (wall clock secs, list of latencies in secs, error count)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def caller(index):
+        call = calls[index % len(calls)]
+        own_latencies = []
+        own_errors = 0
+        for _ in range(index, operation_count, concurrency):
+            started_at = time.perf_counter()
+            try:
+                call()
+            except Exception:
+                own_errors += 1
+            own_latencies.append(time.perf_counter() - started_at)
+        with lock:
+            latencies.extend(own_latencies)
+            errors[0] += own_errors
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(caller, range(concurrency)))
+    return time.perf_counter() - started_at, latencies, errors[0]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def benchmark(pdu_library_manager, farm, vendor, level, operation, concurrency, targets, operation_count, port):
+    """
+    Measures one scenario: a timed pass, then a short pass under tracemalloc for the peak memory
+    @return: Result dictionary
+    """
+    calls = [make_call(pdu_library_manager, vendor, level, operation, target, port)
+             for target in targets[:concurrency]]
+    # Warm up: sessions are opened and drivers loaded outside of the measurement
+    run_calls(calls, concurrency, concurrency)
+
+    request_count_before = farm.get_stats()['requestCount'] if farm else 0
+    elapsed, latencies, error_count = run_calls(calls, concurrency, operation_count)
+    request_count = (farm.get_stats()['requestCount'] if farm else 0) - request_count_before
+
+    tracemalloc.start()
+    run_calls(calls, concurrency, max(concurrency, operation_count // 10))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'vendor': vendor,
+        'level': level,
+        'operation': operation,
+        'concurrency': concurrency,
+        'operations': len(latencies),
+        'errors': error_count,
+        'opsPerSec': len(latencies) / elapsed if elapsed else None,
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+        'mean': statistics.mean(latencies) if latencies else None,
+        'roundTripsPerOp': request_count / len(latencies) if latencies else None,
+        'peakMemoryBytes': peak_memory
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline
+    Throughput may drop, and latency and peak memory grow, by the tolerance (0.2 is 20%); round trips per
+    operation may not grow at all
+    @return: List of regression descriptions
+    """
+    baseline_results = {scenario_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        base = baseline_results.get(scenario_key(result))
+        if base is None:
+            continue
+        name = '%s/%s/%s x%d' % scenario_key(result)
+        checks = [
+            ('opsPerSec', lambda new, old: new < old * (1 - tolerance)),
+            ('p50', lambda new, old: new > old * (1 + tolerance)),
+            ('p99', lambda new, old: new > old * (1 + tolerance)),
+            ('peakMemoryBytes', lambda new, old: new > old * (1 + tolerance)),
+            ('roundTripsPerOp', lambda new, old: new > old + 0.01),
+            ('errors', lambda new, old: new > old)
+        ]
+        for metric, is_regression in checks:
+            if result.get(metric) is not None and base.get(metric) is not None \
+                    and is_regression(result[metric], base[metric]):
+                regressions.append('%s: %s went from %s to %s' % (name, metric, format_value(base[metric]),
+                                                                 format_value(result[metric])))
+    return regressions
+
+
+def scenario_key(result):
+    return result['vendor'], result['level'], result['operation'], result['concurrency']
+
+
+def format_value(value):
+    return '%.4g' % value if isinstance(value, float) else str(value)
+
+
+def report(result):
+    print('%-8s %-8s %-14s x%-4d ops/s: %9.1f  p50: %8.2f ms  p99: %8.2f ms  RT/op: %5.2f  peak: %7.1f KiB'
+          '  errors: %d' % (
+              result['vendor'], result['level'], result['operation'], result['concurrency'],
+              result['opsPerSec'] or 0, (result['p50'] or 0) * 1000, (result['p99'] or 0) * 1000,
+              result['roundTripsPerOp'] or 0, result['peakMemoryBytes'] / 1024, result['errors']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Driver benchmark against simulated PDUs')
+    parser.add_argument('--vendors', nargs='+', default=VENDORS, choices=VENDORS)
+    parser.add_argument('--levels', nargs='+', default=LEVELS, choices=LEVELS)
+    parser.add_argument('--operations', nargs='+', default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument('--concurrency', nargs='+', type=int, default=CONCURRENCIES,
+                        help='Numbers of concurrent callers')
+    parser.add_argument('--operation-count', type=int, default=500, help='Calls per scenario')
+    parser.add_argument('--latency', type=float, default=0.005, help='Latency of the simulated PDUs in secs')
+    parser.add_argument('--port', type=int, default=1, help='Port/Outlet used by port operations')
+    parser.add_argument('--output', help='Writes the results as JSON to this file')
+    parser.add_argument('--baseline', help='Fails when the results regress compared to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative regression allowed for throughput, latency and memory')
+    args = parser.parse_args()
+
+    configure_library()
+    pdu_library_manager = PduLibraryManager.get_instance()
+    # Every caller gets a PDU of its own, like a fleet operation
+    config = SimulatorConfig(latency_in_secs=args.latency, outlet_count=max(8, args.port))
+    results = []
+    for vendor in args.vendors:
+        try:
+            pdu_library_manager.Factory(vendor)
+        except Exception as err:
+            print('Skipping %s, its driver cannot be loaded: %s' % (vendor, err))
+            continue
+
+        farm, targets = start_farm(vendor, max(args.concurrency), config)
+        try:
+            for level in args.levels:
+                for operation in args.operations:
+                    for concurrency in args.concurrency:
+                        result = benchmark(pdu_library_manager, farm, vendor, level, operation, concurrency,
+                                           targets, args.operation_count, args.port)
+                        report(result)
+                        results.append(result)
+        finally:
+            if farm:
+                farm.stop()
+
+    output = {
+        'createdAt': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'simulatorLatencyInSecs': args.latency,
+        'operationCount': args.operation_count,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as file_handler:
+            json.dump(output, file_handler, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file_handler:
+            baseline = json.load(file_handler)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            sys.exit(1)
+        print('No regression compared to ' + args.baseline)
+
+
+if __name__ == '__main__':
+    main()
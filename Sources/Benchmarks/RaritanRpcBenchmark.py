@@ -0,0 +1,67 @@
+"""
+Counts the JSON-RPC round trips and the latency of Raritan get_pdu_info / get_port_info calls
+
+Usage (from the Sources folder):
+    python -m Benchmarks.RaritanRpcBenchmark --ip <pdu ip> --username <user> --password <password>
+"""
+import argparse
+import statistics
+import time
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from PduLibrary.PDUManager.RaritanSessionPool import RaritanSessionPool
+
+
+def measure(operation, iterations):
+    """
+    Runs an operation repeatedly and collects its latency and RPC count per call
+    @param operation: Callable running one call
+    @param iterations: Number of calls
+    @return: (list of latencies in secs, list of RPC counts)
+    """
+    session_pool = RaritanSessionPool.get_instance()
+    latencies = []
+    rpc_counts = []
+    for _ in range(iterations):
+        rpc_count_before = session_pool.get_rpc_count()
+        started_at = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - started_at)
+        rpc_counts.append(session_pool.get_rpc_count() - rpc_count_before)
+    return latencies, rpc_counts
+
+
+def report(name, latencies, rpc_counts):
+    print('%-16s calls: %4d  RPCs/call: %6.1f  mean: %8.1f ms  min: %8.1f ms  max: %8.1f ms' % (
+        name,
+        len(latencies),
+        statistics.mean(rpc_counts),
+        statistics.mean(latencies) * 1000,
+        min(latencies) * 1000,
+        max(latencies) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Raritan RPC round trip benchmark')
+    parser.add_argument('--ip', required=True, help='IP of the Raritan PDU')
+    parser.add_argument('--username', required=True, help='Username of the Raritan PDU')
+    parser.add_argument('--password', required=True, help='Password of the Raritan PDU')
+    parser.add_argument('--port', type=int, default=1, help='Port used for get_port_info')
+    parser.add_argument('--iterations', type=int, default=10, help='Calls per operation')
+    args = parser.parse_args()
+
+    pdu_library_manager = PduLibraryManager.get_instance()
+
+    # The first call opens the pooled session, keep it out of the numbers
+    pdu_library_manager.get_pdu_info('raritan', args.ip, args.username, args.password)
+
+    report('get_pdu_info', *measure(
+        lambda: pdu_library_manager.get_pdu_info('raritan', args.ip, args.username, args.password),
+        args.iterations))
+    report('get_port_info', *measure(
+        lambda: pdu_library_manager.get_port_info('raritan', args.ip, args.username, args.password, args.port),
+        args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Measures the overhead of the REST layer: request validation, resource dispatch, PduLibraryManager and JSON
+rendering, with the vendor driver stubbed out so that no device is reached
+
+Three parts:
+- validation: the compiled RequestSchema of each device resource against a reqparse.RequestParser built for every
+  request, as the resources did before
+- endpoints: requests through the WSGI app (Flask test client, no sockets) to the device endpoints
+- encoding: a fleet sized response encoded with the json module, as Flask-RESTful did before, and with the
+  encodings of ResponseEncoder, compressed or not
+
+Usage (from the Sources folder):
+    python -m Benchmarks.RestOverheadBenchmark --requests 20000 --output rest.json
+"""
+import argparse
+import gzip
+import json
+import statistics
+import tempfile
+import time
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from PduLibrary.Core.ResponseEncoder import ResponseEncoder
+from PduLibrary.Core.RestServer import RestServer
+from PduLibrary.RestResource.GetPduInfo import GetPduInfo
+from PduLibrary.RestResource.GetPortInfo import GetPortInfo
+from PduLibrary.RestResource.PowerOff import PowerOff
+from PduLibrary.RestResource.PowerOn import PowerOn
+from PduLibrary.RestResource.Reboot import Reboot
+
+STUB_MANUFACTURER = 'stub'
+TARGET = {'manufacturer': STUB_MANUFACTURER, 'ip': '10.0.0.1', 'username': 'admin', 'password': 'admin'}
+
+# (resource class, url, request body)
+ENDPOINTS = (
+    (GetPduInfo, '/v1/get_pdu_info', dict(TARGET, max_age=0)),
+    (GetPortInfo, '/v1/get_port_info', dict(TARGET, port=1, max_age=0)),
+    (PowerOn, '/v1/power_on', dict(TARGET, port=1)),
+    (PowerOff, '/v1/power_off', dict(TARGET, port=1)),
+    (Reboot, '/v1/reboot', dict(TARGET, port=1))
+)
+
+
+class StubLibraryManager(object):
+    """
+    Driver answering every operation right away with the default output
+    """
+
+    def get_pdu_info(self, ip, username, password, output):
+        return output
+
+    def get_port_info(self, ip, username, password, port, output):
+        return output
+
+    def power_on(self, ip, username, password, port, output):
+        return output
+
+    def power_off(self, ip, username, password, port, output):
+        return output
+
+    def reboot(self, ip, username, password, port, output):
+        return output
+
+
+def measure(operation, count):
+    """
+    Runs an operation count times
+    @return: List of latencies in secs
+    """
+    latencies = []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - started_at)
+    return latencies
+
+
+def summarize(name, latencies):
+    latencies = sorted(latencies)
+    return {
+        'name': name,
+        'count': len(latencies),
+        'perSec': len(latencies) / sum(latencies),
+        'meanMicros': statistics.mean(latencies) * 1e6,
+        'p50Micros': latencies[len(latencies) // 2] * 1e6,
+        'p99Micros': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6
+    }
+
+
+def report(result):
+    print('%-48s %9.0f /s  mean: %8.1f us  p50: %8.1f us  p99: %8.1f us%s' % (
+        result['name'], result['perSec'], result['meanMicros'], result['p50Micros'], result['p99Micros'],
+        '  %d bytes' % result['bytes'] if 'bytes' in result else ''))
+
+
+def benchmark_validation(app, count):
+    """
+    Parses the body of each device resource with its compiled RequestSchema, and with a reqparse.RequestParser
+    built for the request
+    """
+    results = []
+    for resource_class, url, body in ENDPOINTS:
+        request_schema = resource_class.build_request_schema()
+        with app.test_request_context(url, method='POST', json=body):
+            request_schema.parse()
+            results.append(summarize('validation %s schema' % url, measure(request_schema.parse, count)))
+            results.append(summarize('validation %s reqparse' % url, measure(
+                lambda: request_schema.to_request_parser().parse_args(), count)))
+    return results
+
+
+def benchmark_endpoints(app, count):
+    """
+    Posts to every device endpoint through the WSGI app
+    """
+    client = app.test_client()
+    results = []
+    for _, url, body in ENDPOINTS:
+        response = client.post(url, json=body)
+        if response.status_code != 200:
+            raise RuntimeError('%s answered %d : %s' % (url, response.status_code, response.get_data(as_text=True)))
+        results.append(summarize('endpoint %s' % url, measure(lambda: client.post(url, json=body), count)))
+    return results
+
+
+def make_fleet_response(outlet_count):
+    """
+    Builds a response of the size of a fleet operation, outlet_count outlets spread over PDUs of 24 outlets
+    """
+    return {
+        'ErrorCode': 0,
+        'Message': None,
+        'Data': [{
+            'manufacturer': 'raritan',
+            'ip': '10.%d.%d.%d' % (pdu_index // 65536, pdu_index // 256 % 256, pdu_index % 256),
+            'ErrorCode': 0,
+            'Message': None,
+            'Data': {
+                'model': 'PX3-5190R',
+                'serialNumber': 'QAB%07d' % pdu_index,
+                'outlets': [{
+                    'portNumber': port,
+                    'portName': 'Outlet %d' % port,
+                    'portStatus': 'ON' if port % 3 else 'OFF'
+                } for port in range(1, 25)]
+            }
+        } for pdu_index in range(max(1, outlet_count // 24))]
+    }
+
+
+def benchmark_encodings(count, outlet_count):
+    """
+    Encodes a fleet sized response with each encoding
+    """
+    data = make_fleet_response(outlet_count)
+    encodings = [
+        ('json module', lambda: (json.dumps(data) + '\n').encode('utf-8')),
+        ('ResponseEncoder json', lambda: ResponseEncoder.to_json(data)),
+        ('ResponseEncoder json + gzip', lambda: ResponseEncoder.compress(ResponseEncoder.to_json(data),
+                                                                         ResponseEncoder.GZIP)),
+        ('json module + gzip module', lambda: gzip.compress(json.dumps(data).encode('utf-8')))
+    ]
+    if ResponseEncoder.is_msgpack_available():
+        encodings += [
+            ('ResponseEncoder msgpack', lambda: ResponseEncoder.to_msgpack(data)),
+            ('ResponseEncoder msgpack + gzip', lambda: ResponseEncoder.compress(ResponseEncoder.to_msgpack(data),
+                                                                                ResponseEncoder.GZIP))
+        ]
+
+    results = []
+    for name, encode in encodings:
+        result = summarize('encoding %d outlets %s' % (outlet_count, name), measure(encode, count))
+        result['bytes'] = len(encode())
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='REST layer overhead benchmark, with a stubbed driver')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per endpoint')
+    parser.add_argument('--encoding-requests', type=int, default=200, help='Encodings per encoding')
+    parser.add_argument('--outlets', type=int, default=5000, help='Outlets of the fleet sized response')
+    parser.add_argument('--output', help='Writes the results as JSON to this file')
+    args = parser.parse_args()
+
+    PduLibraryManager.get_instance().register_driver(STUB_MANUFACTURER, StubLibraryManager())
+    app = RestServer.get_instance(tempfile.mkdtemp(prefix='RestOverheadBenchmark')).get_rest_server_wsgi_app()
+
+    results = benchmark_validation(app, args.requests) + benchmark_endpoints(app, args.requests) + \
+        benchmark_encodings(args.encoding_requests, args.outlets)
+    for result in results:
+        report(result)
+
+    if args.output:
+        with open(args.output, 'w') as file_handler:
+            json.dump(results, file_handler, indent=2)
+
+
+if __name__ == '__main__':
+    main()
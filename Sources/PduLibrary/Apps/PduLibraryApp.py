@@ -6,6 +6,12 @@ import logging.config
 from datetime import datetime
 from inspect import isclass, ismodule
 
+from PduLibrary.Core.ServingMode import ServingMode
+
+# The gevent serving mode needs socket, ssl and threading patched before anything else imports them
+if ServingMode.get_requested_mode(sys.argv[1:]) == ServingMode.GEVENT:
+    ServingMode.patch_for_gevent()
+
 from pkg_resources import resource_filename
 from cliff.app import App
 from cliff.commandmanager import CommandManager
@@ -191,7 +197,8 @@ class PduLibraryApp(App):
         if (return_code == -1) and argv and (argv[0] == 'restserver') and (argv[1] == 'start'):
             self.stop_rest_server(True)
 
-    def start_rest_server(self, force_start=False):
+    def start_rest_server(self, force_start=False, serving_mode=None, worker_count=None, thread_count=None,
+                          keep_alive_timeout_in_secs=None):
         """
         Starts the rest server
         """
@@ -200,7 +207,9 @@ class PduLibraryApp(App):
             self._rest_server = RestServer.get_instance(self._rest_server_working_folder_path)
             self.LOG.info('Initialized Rest Server')
         self.LOG.info('Starting rest server')
-        self._rest_server.start_rest_server(force_start=force_start)
+        self._rest_server.start_rest_server(force_start=force_start, serving_mode=serving_mode,
+                                            worker_count=worker_count, thread_count=thread_count,
+                                            keep_alive_timeout_in_secs=keep_alive_timeout_in_secs)
 
     def stop_rest_server(self, ignore_stop_failure=False):
         """
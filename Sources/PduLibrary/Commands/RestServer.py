@@ -1,6 +1,7 @@
 import logging
 from argparse import ArgumentError
 from PduLibrary.Common.Command import Command
+from PduLibrary.Core.ServingMode import ServingMode
 
 
 def validate_url_prefix(value):
@@ -16,6 +17,50 @@ def validate_url_prefix(value):
     return value
 
 
+def add_serving_arguments(parser):
+    """
+    Adds the serving mode options of the start / restart commands
+    """
+    parser.add_argument(
+        '-m',
+        '--mode',
+        action='store',
+        help='Serving mode: gevent (default, or PDU_LIBRARY_SERVING_MODE), threaded or prefork. The prefork '
+             'processes do not share memory: jobs, polling, events, sensor history, metrics and APC/DLI PDUs are '
+             'not available in it',
+        required=False,
+        dest='serving_mode',
+        choices=ServingMode.modes
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        action='store',
+        help='Concurrent connections (gevent), threads (threaded) or processes (prefork)',
+        required=False,
+        dest='worker_count',
+        type=int
+    )
+    parser.add_argument(
+        '-t',
+        '--threads',
+        action='store',
+        help='Threads of every prefork process',
+        required=False,
+        dest='thread_count',
+        type=int
+    )
+    parser.add_argument(
+        '-k',
+        '--keep-alive',
+        action='store',
+        help='Idle keep-alive connections are closed after this many secs',
+        required=False,
+        dest='keep_alive_timeout_in_secs',
+        type=float
+    )
+
+
 class RestServer(Command):
     """
     Launching the rest server to support with scripts/commandline
@@ -42,9 +87,9 @@ class RestServer(Command):
             dest='rest_server_command',
             metavar='{rest_server_command}'
         )
-        subparser.add_parser('start', help='Starts a Rest server')
+        add_serving_arguments(subparser.add_parser('start', help='Starts a Rest server'))
         subparser.add_parser('stop', help='Stops a running Rest server')
-        subparser.add_parser('restart', help='Restarts Rest server')
+        add_serving_arguments(subparser.add_parser('restart', help='Restarts Rest server'))
 
         subparser.add_parser('showapispec', help='Launches Rest server API Spec in a browser')
 
@@ -114,12 +159,12 @@ class RestServer(Command):
             return True
 
         if parsed_arguments.rest_server_command == 'start':
-            self.app.start_rest_server()
+            self.app.start_rest_server(**self._get_serving_options(parsed_arguments))
             return True
 
         if parsed_arguments.rest_server_command == 'restart':
             self.app.stop_rest_server(True)
-            self.app.start_rest_server(True)
+            self.app.start_rest_server(True, **self._get_serving_options(parsed_arguments))
             return True
 
         if parsed_arguments.rest_server_command == 'getnwcfg':
@@ -158,3 +203,14 @@ class RestServer(Command):
             if parsed_arguments.deregister_rest_server_as_service:
                 self.app.deregister_rest_server_as_service()
                 self.LOG.info('De-registered rest server from service')
+
+    def _get_serving_options(self, parsed_arguments):
+        """
+        Gets the serving options given on the command line
+        """
+        return {
+            'serving_mode': parsed_arguments.serving_mode,
+            'worker_count': parsed_arguments.worker_count,
+            'thread_count': parsed_arguments.thread_count,
+            'keep_alive_timeout_in_secs': parsed_arguments.keep_alive_timeout_in_secs
+        }
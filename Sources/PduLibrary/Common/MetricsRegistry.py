@@ -0,0 +1,211 @@
+import bisect
+import contextlib
+import functools
+import inspect
+import threading
+import time
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Common.Singleton import Singleton
+
+
+class _Metric(object):
+    """
+    A metric family, one value per combination of label values
+    """
+    metric_type = None
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = dict()
+
+    def _render_labels(self, label_values, extra_labels=()):
+        labels = list(zip(self.label_names, label_values)) + list(extra_labels)
+        if not labels:
+            return ''
+        return '{' + ','.join('%s="%s"' % (name, self._escape(value)) for name, value in labels) + '}'
+
+    def _escape(self, value):
+        return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+    def render(self):
+        lines = ['# HELP %s %s' % (self.name, self.documentation), '# TYPE %s %s' % (self.name, self.metric_type)]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.extend(self._render_value(label_values, value))
+        return lines
+
+    def _render_value(self, label_values, value):
+        return ['%s%s %s' % (self.name, self._render_labels(label_values), self._format(value))]
+
+    def _format(self, value):
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, label_values, amount=1):
+        self.inc(label_values, -amount)
+
+    def set(self, label_values, value):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, label_names, buckets):
+        _Metric.__init__(self, name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, label_values, value):
+        with self._lock:
+            counts = self._values.get(label_values)
+            if counts is None:
+                # One count per bucket (not cumulative), then the sum and the total count
+                counts = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def _render_value(self, label_values, counts):
+        lines = []
+        cumulative_count = 0
+        for bucket, count in zip(self.buckets, counts):
+            cumulative_count += count
+            lines.append('%s_bucket%s %d' % (self.name, self._render_labels(label_values, [('le', repr(bucket))]),
+                                             cumulative_count))
+        lines.append('%s_bucket%s %d' % (self.name, self._render_labels(label_values, [('le', '+Inf')]),
+                                         counts[-1]))
+        lines.append('%s_sum%s %r' % (self.name, self._render_labels(label_values), counts[-2]))
+        lines.append('%s_count%s %d' % (self.name, self._render_labels(label_values), counts[-1]))
+        return lines
+
+
+class MetricsRegistry(BaseObject, Singleton):
+    """
+    Process wide metrics, rendered in the Prometheus text exposition format by the /metrics endpoint
+    Operations are recorded at two levels: 'pdu_library_operation' by PduLibraryManager, including cache
+    hits, and 'pdu_driver_operation' by the vendor drivers, for the calls actually reaching the devices.
+    """
+    default_latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    operation_levels = ('pdu_library_operation', 'pdu_driver_operation')
+
+    def __init__(self):
+        """
+        Initializes the class
+        """
+        BaseObject.__init__(self)
+        self._lock = threading.Lock()
+        self._metrics = dict()
+        for level in self.operation_levels:
+            self.histogram(level + '_duration_seconds', 'Latency of ' + level.replace('_', ' ') + 's',
+                           ('vendor', 'operation'))
+            self.gauge(level + 's_in_flight', 'Number of ' + level.replace('_', ' ') + 's running',
+                       ('vendor', 'operation'))
+            self.counter(level + '_errors_total', 'Number of failed ' + level.replace('_', ' ') + 's',
+                         ('vendor', 'operation', 'error_code'))
+
+    def counter(self, name, documentation, label_names=()):
+        """
+        Gets a counter, creating it on first use
+        """
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=()):
+        """
+        Gets a gauge, creating it on first use
+        """
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=None):
+        """
+        Gets a histogram, creating it on first use
+        """
+        return self._get_or_create(Histogram, name, documentation, label_names,
+                                   buckets or self.default_latency_buckets)
+
+    @contextlib.contextmanager
+    def track_operation(self, level, vendor, operation):
+        """
+        Records the latency, in flight count and error code of an operation run in the with block
+        @param level: One of operation_levels
+        @param vendor: The manufacturer in lowercase
+        @param operation: Name of the operation
+        """
+        label_values = (vendor, operation)
+        in_flight = self._metrics[level + 's_in_flight']
+        in_flight.inc(label_values)
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception as err:
+            error_code = err.get_error_code() if hasattr(err, 'get_error_code') else GENERIC_ERR
+            self._metrics[level + '_errors_total'].inc((vendor, operation, str(error_code)))
+            raise
+        finally:
+            self._metrics[level + '_duration_seconds'].observe(label_values, time.perf_counter() - started_at)
+            in_flight.dec(label_values)
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format
+        @return: The text
+        """
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self, metric_class, name, documentation, label_names, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, documentation, label_names, *args)
+            return metric
+
+
+def driver_metrics(vendor, operation):
+    """
+    Decorator recording a driver method, or coroutine, as a pdu_driver_operation
+    @param vendor: The manufacturer in lowercase
+    @param operation: Name of the operation
+    """
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with MetricsRegistry.get_instance().track_operation('pdu_driver_operation', vendor, operation):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with MetricsRegistry.get_instance().track_operation('pdu_driver_operation', vendor, operation):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator
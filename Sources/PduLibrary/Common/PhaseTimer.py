@@ -0,0 +1,135 @@
+import contextlib
+import contextvars
+import time
+
+
+class PhaseTiming(object):
+    """
+    Time spent in each phase (connect, login, rpc, command...) of one operation
+    """
+
+    def __init__(self, vendor, operation):
+        self.vendor = vendor
+        self.operation = operation
+        self.started_at = time.perf_counter()
+        self.total = None
+        self.phases = dict()
+        self.phase_depth = 0
+
+    def add(self, name, duration_in_secs, count=1):
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += duration_in_secs
+        phase[1] += count
+
+    def to_dict(self):
+        return {
+            'vendor': self.vendor,
+            'operation': self.operation,
+            'total': self.total,
+            'phases': {name: {'duration': duration, 'count': count}
+                       for name, (duration, count) in self.phases.items()}
+        }
+        '''
+        {
+            "vendor": "<manufacturer>",
+            "operation": "<operation>",
+            "total": "<secs>",
+            "phases": {"<phase name>": {"duration": "<secs>", "count": "<number of times the phase ran>"}}
+        }
+        '''
+
+    @staticmethod
+    def to_server_timing(timing):
+        """
+        Formats a timing dictionary as a Server-Timing header value, in milliseconds
+        """
+        metrics = ['%s;dur=%.3f' % (name, phase['duration'] * 1000) for name, phase in timing['phases'].items()]
+        if timing['total'] is not None:
+            metrics.append('total;dur=%.3f' % (timing['total'] * 1000))
+        return ', '.join(metrics)
+
+
+class PhaseTimer(object):
+    """
+    Collects the phase timings of the operation running in the current thread or asyncio task
+    PduLibraryManager opens an operation, drivers time their phases within it, and the timing of the last
+    operation stays available through get_last_timing(). Phases nested in another phase are not recorded
+    on their own, so the phases of an operation never overlap.
+    """
+    _current = contextvars.ContextVar('PhaseTimer.current', default=None)
+    _last = contextvars.ContextVar('PhaseTimer.last', default=None)
+
+    @classmethod
+    @contextlib.contextmanager
+    def operation(cls, vendor, operation):
+        """
+        Times an operation, operations nested in it are timed as part of it
+        @param vendor: The manufacturer in lowercase
+        @param operation: Name of the operation
+        """
+        if cls._current.get() is not None:
+            yield
+            return
+
+        timing = PhaseTiming(vendor, operation)
+        token = cls._current.set(timing)
+        try:
+            yield
+        finally:
+            timing.total = time.perf_counter() - timing.started_at
+            cls._current.reset(token)
+            cls._last.set(timing.to_dict())
+
+    @classmethod
+    @contextlib.contextmanager
+    def phase(cls, name):
+        """
+        Times a phase of the current operation, does nothing outside of an operation
+        @param name: Name of the phase, e.g. connect, login, rpc, command, parse
+        """
+        timing = cls._current.get()
+        if timing is None or timing.phase_depth:
+            yield
+            return
+
+        timing.phase_depth += 1
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing.phase_depth -= 1
+            timing.add(name, time.perf_counter() - started_at)
+
+    @classmethod
+    def add_phases(cls, phases):
+        """
+        Adds phases timed elsewhere, e.g. by the worker thread of an APC session, to the current operation
+        @param phases: List of (name, duration in secs)
+        """
+        timing = cls._current.get()
+        if timing is None:
+            return
+        for name, duration_in_secs in phases:
+            timing.add(name, duration_in_secs)
+
+    @classmethod
+    def get_last_timing(cls, context=None):
+        """
+        Gets the timing of the last operation completed in the current thread or asyncio task
+        @param context: contextvars.Context to look in instead of the current one, e.g. the one a worker ran in
+        @return: Dictionary with vendor, operation, total and phases, None if no operation was timed
+        """
+        if context is not None:
+            return context.get(cls._last)
+        return cls._last.get()
+
+    @classmethod
+    def set_last_timing(cls, timing):
+        """
+        Sets the timing of the last operation, e.g. to hand it over from a worker thread
+        """
+        cls._last.set(timing)
+
+    @classmethod
+    def clear_last_timing(cls):
+        cls._last.set(None)
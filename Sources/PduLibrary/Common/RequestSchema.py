@@ -0,0 +1,126 @@
+from flask import request
+from flask_restful.reqparse import Namespace, RequestParser
+from werkzeug.exceptions import BadRequest
+
+
+class RequestSchema(object):
+    """
+    Validates the JSON body or the query string of a request, a faster replacement of reqparse.RequestParser for
+    the hot resources
+    Arguments are declared once with the add_argument vocabulary of reqparse, and compiled into a list of plain
+    tuples; parse() then costs a dictionary lookup and, when the value does not already have the expected type,
+    a conversion per argument.
+    """
+    # Types whose instances need no conversion, e.g. an int given for an int argument
+    builtin_types = (str, int, float)
+    # Supported locations of the arguments, and how error messages name them
+    locations = ('json', 'args')
+    location_names = {'json': 'JSON body', 'args': 'query string'}
+
+    def __init__(self):
+        self._arguments = []
+        self._compiled_arguments = None
+
+    def add_argument(self, name, help=None, required=False, location='json', dest=None, type=str, default=None,
+                     action='store'):
+        """
+        Declares an argument
+        @param name: Name of the argument in the JSON body or the query string
+        @param help: Description of the argument, used in error messages
+        @param required: Whether the argument must be present
+        @param location: json for the JSON body, args for the query string
+        @param dest: Name of the parsed argument, defaults to name
+        @param type: Callable converting the value
+        @param default: Value of a missing argument
+        @param action: store, or append for a list of values
+        @return: The schema, for chaining
+        """
+        if location not in self.locations:
+            raise ValueError('RequestSchema only parses %s, not %s' % (' and '.join(self.locations), location))
+        if action not in ('store', 'append'):
+            raise ValueError('Unsupported action %s' % action)
+        self._arguments.append((name, help, required, location, dest or name, type, default, action == 'append'))
+        self._compiled_arguments = None
+        return self
+
+    def compile(self):
+        """
+        Compiles the arguments, done on first use otherwise
+        @return: The schema, for chaining
+        """
+        self._compiled_arguments = [
+            (name, location == 'args', dest, self._make_converter(name, help, type), required, default, is_list,
+             'Missing required parameter in the %s : %s%s' % (self.location_names[location], name,
+                                                              ' (%s)' % help if help else ''))
+            for name, help, required, location, dest, type, default, is_list in self._arguments
+        ]
+        return self
+
+    def parse(self, body=None, query=None):
+        """
+        Parses a JSON body and a query string
+        @param body: Decoded JSON body, defaults to the body of the current request
+        @param query: MultiDict of the query string, defaults to the query string of the current request
+        @return: Namespace of the parsed arguments, by dest
+        @raise BadRequest: When a required argument is missing or a value cannot be converted
+        """
+        if self._compiled_arguments is None:
+            self.compile()
+        if body is None:
+            body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            body = dict()
+
+        parsed = Namespace()
+        for name, in_query, dest, convert, required, default, is_list, missing_message in self._compiled_arguments:
+            if in_query:
+                if query is None:
+                    query = request.args
+                if name not in query:
+                    if required:
+                        raise BadRequest(missing_message)
+                    parsed[dest] = default
+                elif is_list:
+                    parsed[dest] = [convert(item) for item in query.getlist(name)]
+                else:
+                    parsed[dest] = convert(query[name])
+                continue
+
+            if name not in body:
+                if required:
+                    raise BadRequest(missing_message)
+                parsed[dest] = default
+                continue
+
+            value = body[name]
+            if value is None:
+                parsed[dest] = None
+            elif is_list:
+                parsed[dest] = [convert(item) for item in (value if isinstance(value, list) else [value])]
+            else:
+                parsed[dest] = convert(value)
+        return parsed
+
+    def to_request_parser(self):
+        """
+        Builds the equivalent reqparse.RequestParser, the benchmarks compare both
+        """
+        request_parser = RequestParser()
+        for name, help, required, location, dest, type, default, is_list in self._arguments:
+            request_parser.add_argument(name, help=help, required=required, location=location, dest=dest, type=type,
+                                        default=default, action='append' if is_list else 'store')
+        return request_parser
+
+    def _make_converter(self, name, help, type):
+        fast_type = type if type in self.builtin_types else None
+
+        def convert(value):
+            # Values of the right type, the common case, skip the conversion
+            if fast_type is not None and value.__class__ is fast_type:
+                return value
+            try:
+                return type(value)
+            except (TypeError, ValueError) as err:
+                raise BadRequest('Invalid value for %s%s : %s' % (name, ' (%s)' % help if help else '', err))
+
+        return convert
@@ -0,0 +1,85 @@
+import copy
+import threading
+from collections import defaultdict
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+
+
+class _Call(object):
+    """
+    A call in flight, shared by its leader and every caller joining it
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(BaseObject):
+    """
+    Coalesces concurrent identical calls: while a call for a key is in flight, callers with the same key wait
+    for it and get a copy of its result (or its exception) instead of starting their own call
+    Nothing is kept once the call completes, the next caller starts a new call
+    """
+
+    def __init__(self):
+        """
+        Initializes the class
+        """
+        BaseObject.__init__(self)
+        self._lock = threading.Lock()
+        self._calls = dict()
+        self._executed = defaultdict(int)
+        self._coalesced = defaultdict(int)
+
+    def do(self, key, function):
+        """
+        Runs function, unless a call with the same key is in flight, in which case its result is shared
+        @param key: Hashable tuple identifying the call, its first element names the operation in the stats
+        @param function: Callable without arguments making the call
+        @return: The result of the call, deep copied for the callers that joined it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+                self._executed[key[0]] += 1
+            else:
+                call.followers += 1
+                self._coalesced[key[0]] += 1
+
+        if not is_leader:
+            with PhaseTimer.phase('coalesced'):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = function()
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.followers:
+            return copy.deepcopy(call.result)
+        return call.result
+
+    def get_stats(self):
+        """
+        Gets the number of calls made and coalesced so far, per operation
+        @return: Dictionary of operation name to its executed and coalesced counts
+        """
+        with self._lock:
+            return {operation: {
+                'executed': self._executed[operation],
+                'coalesced': self._coalesced[operation]
+            } for operation in set(self._executed) | set(self._coalesced)}
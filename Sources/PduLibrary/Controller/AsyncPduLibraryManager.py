@@ -0,0 +1,174 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import MetricsRegistry
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from PduLibrary.Errors.ErrorCodes import OPERATION_TIMED_OUT
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class AsyncPduLibraryManager(BaseObject, Singleton):
+    """
+    Awaitable front end of PduLibraryManager
+    Drivers providing async_<operation> coroutines are awaited directly. Every other call runs on a bounded
+    thread pool, so blocking SDKs such as raritan.rpc never block the event loop.
+    Timeouts and cancellation stop the wait; a call already running on the thread pool finishes in the background.
+    """
+    default_max_workers = 32
+    default_timeout_in_secs = 120
+
+    def __init__(self, max_workers=None, timeout_in_secs=None):
+        """
+        Initializes the class
+        @param max_workers: Size of the thread pool running blocking driver calls
+        @param timeout_in_secs: Default timeout of every call, default_timeout_in_secs when None
+        """
+        BaseObject.__init__(self)
+        self._pdu_library_manager = PduLibraryManager.get_instance()
+        self._metrics = MetricsRegistry.get_instance()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or self.default_max_workers,
+                                            thread_name_prefix='AsyncPduWorker')
+        self._timeout_in_secs = timeout_in_secs or self.default_timeout_in_secs
+
+    async def get_version(self):
+        """
+        Gets the version of Common IP PDU Library
+        @return: Version of Common IP PDU Library
+        """
+        return self._pdu_library_manager.get_version()
+
+    async def get_pdu_info(self, manufacturer, ip, username, password, timeout=None, max_age=None):
+        """
+        Gets PDU Information
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param timeout: Timeout in secs, defaults to the timeout of the manager
+        @param max_age: Maximum age in secs of a cached result, 0 to read the device, None for the cache TTLs
+        @return: The PDU information
+        """
+        return await self._run_blocking('get_pdu_info', ip, timeout,
+                                        manufacturer, ip, username, password, max_age)
+
+    async def get_port_info(self, manufacturer, ip, username, password, port, timeout=None, max_age=None):
+        """
+        Gets Port/Outlet Information
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param timeout: Timeout in secs, defaults to the timeout of the manager
+        @param max_age: Maximum age in secs of a cached result, 0 to read the device, None for the cache TTLs
+        @return: The Port/Outlet information
+        """
+        return await self._run_blocking('get_port_info', ip, timeout,
+                                        manufacturer, ip, username, password, port, max_age)
+
+    async def power_on(self, manufacturer, ip, username, password, port, timeout=None):
+        """
+        Power ON the outlet
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param timeout: Timeout in secs, defaults to the timeout of the manager
+        @return: The Status of Power ON request
+        """
+        return await self._run_power_operation('power_on', 'ON', manufacturer, ip, username, password, port,
+                                               timeout)
+
+    async def power_off(self, manufacturer, ip, username, password, port, timeout=None):
+        """
+        Power Off the outlet
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param timeout: Timeout in secs, defaults to the timeout of the manager
+        @return: The Status of Power Off request
+        """
+        return await self._run_power_operation('power_off', 'OFF', manufacturer, ip, username, password, port,
+                                               timeout)
+
+    async def reboot(self, manufacturer, ip, username, password, port, timeout=None):
+        """
+        Reboots the outlet
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param timeout: Timeout in secs, defaults to the timeout of the manager
+        @return: The Status of Reboot request
+        """
+        return await self._run_power_operation('reboot', 'ON', manufacturer, ip, username, password, port,
+                                               timeout)
+
+    def get_last_timing(self):
+        """
+        Gets the phase timing breakdown of the last operation awaited by the current asyncio task
+        @return: Dictionary with vendor, operation, total and phases, in secs, None if no operation ran yet
+        """
+        return PhaseTimer.get_last_timing()
+
+    def shutdown(self):
+        """
+        Stops the thread pool once the running calls are done
+        """
+        self._executor.shutdown(wait=False)
+
+    async def _run_power_operation(self, operation, power_state, manufacturer, ip, username, password, port,
+                                   timeout):
+        # Resolving the driver may import it, or wait for the thread importing it, off the event loop
+        driver = await asyncio.get_running_loop().run_in_executor(self._executor, self._pdu_library_manager.Factory,
+                                                                  manufacturer.lower())
+        native_operation = getattr(driver, 'async_' + operation, None)
+        if native_operation is None:
+            return await self._run_blocking(operation, ip, timeout,
+                                            manufacturer, ip, username, password, port)
+
+        self._Logger.info('Running %s in PDU %s for Port %s' % (operation, ip, port))
+        output = self._pdu_library_manager.get_default_power_output(power_state)
+        try:
+            with self._metrics.track_operation('pdu_library_operation', manufacturer.lower(), operation), \
+                    PhaseTimer.operation(manufacturer.lower(), operation):
+                output = await self._wait(operation, ip, timeout,
+                                          native_operation(ip, username, password, port, output))
+        except Exception as err:
+            self._pdu_library_manager.publish_power_operation(operation, ip, {port: output}, err)
+            raise
+        finally:
+            self._pdu_library_manager.invalidate_cache(manufacturer, ip, [port])
+        self._pdu_library_manager.publish_power_operation(operation, ip, {port: output})
+        return output
+
+    async def _run_blocking(self, operation, ip, timeout, *args):
+        """
+        Runs a PduLibraryManager operation on the thread pool
+        """
+        loop = asyncio.get_running_loop()
+        # The operation times its phases in the context it runs in, which is handed back to the caller's task
+        context = contextvars.copy_context()
+        call = loop.run_in_executor(self._executor, context.run,
+                                    functools.partial(getattr(self._pdu_library_manager, operation), *args))
+        try:
+            return await self._wait(operation, ip, timeout, call)
+        finally:
+            if call.done():
+                PhaseTimer.set_last_timing(PhaseTimer.get_last_timing(context))
+
+    async def _wait(self, operation, ip, timeout, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, timeout or self._timeout_in_secs)
+        except asyncio.TimeoutError:
+            self._Logger.error('Timed out while running %s against PDU %s' % (operation, ip))
+            raise PduLibraryException(OPERATION_TIMED_OUT, operation, ip)
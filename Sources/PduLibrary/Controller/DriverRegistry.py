@@ -0,0 +1,115 @@
+import importlib
+import threading
+
+from pkg_resources import iter_entry_points
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Errors.ErrorCodes import UNSUPPORTED_MANUFACTURER, ERROR_WHILE_LOADING_DRIVER
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class DriverRegistry(BaseObject, Singleton):
+    """
+    Resolves a manufacturer name to its library manager (driver)
+    Driver modules are imported on first use and a single driver instance is kept per manufacturer
+    Third party drivers are discovered through the PduLibrary.drivers entry point group
+    """
+    entry_point_group = 'PduLibrary.drivers'
+
+    builtin_drivers = {
+        'raritan': 'PduLibrary.PDUManager.RaritanLibraryManager:RaritanLibraryManager',
+        'dli': 'PduLibrary.PDUManager.DliLibraryManager:DliLibraryManager',
+        'apc': 'PduLibrary.PDUManager.ApcLibraryManager:ApcLibraryManager',
+        'aten': 'PduLibrary.PDUManager.AtenLibraryManager:AtenLibraryManager'
+    }
+
+    def __init__(self):
+        """
+        Initializes the class
+        """
+        BaseObject.__init__(self)
+        self._lock = threading.RLock()
+        self._driver_sources = dict(self.builtin_drivers)
+        self._drivers = dict()
+        self._entry_points_loaded = False
+
+    def register(self, manufacturer, driver):
+        """
+        Registers a driver for a manufacturer, replacing any driver registered before
+        @param manufacturer: The manufacturer name, case insensitive
+        @param driver: 'module:Class' path, a driver class or a driver instance
+        """
+        manufacturer = manufacturer.lower()
+        with self._lock:
+            self._load_entry_points()
+            self._driver_sources[manufacturer] = driver
+            self._drivers.pop(manufacturer, None)
+
+    def get_manufacturers(self):
+        """
+        Gets the names of all known manufacturers, without loading their drivers
+        @return: Sorted list of manufacturer names
+        """
+        with self._lock:
+            self._load_entry_points()
+            return sorted(self._driver_sources)
+
+    def get_driver(self, manufacturer):
+        """
+        Gets the driver of a manufacturer, importing and instantiating it on first use
+        @param manufacturer: The manufacturer name, case insensitive
+        @return: The driver instance
+        """
+        manufacturer = manufacturer.lower()
+        driver = self._drivers.get(manufacturer)
+        if driver is not None:
+            return driver
+
+        with self._lock:
+            if manufacturer in self._drivers:
+                return self._drivers[manufacturer]
+
+            self._load_entry_points()
+            if manufacturer not in self._driver_sources:
+                raise PduLibraryException(UNSUPPORTED_MANUFACTURER, manufacturer)
+
+            try:
+                driver = self._create_driver(self._driver_sources[manufacturer])
+            except Exception as err:
+                self._Logger.error('Error while loading driver for ' + manufacturer + ' :: ' + str(err))
+                raise PduLibraryException(ERROR_WHILE_LOADING_DRIVER, manufacturer, str(err))
+
+            self._Logger.info('Loaded driver for ' + manufacturer + ' :: ' + type(driver).__name__)
+            self._drivers[manufacturer] = driver
+            return driver
+
+    def get_loaded_drivers(self):
+        """
+        Gets the drivers instantiated so far
+        @return: Dictionary of manufacturer name to driver instance
+        """
+        with self._lock:
+            return dict(self._drivers)
+
+    def _load_entry_points(self):
+        """
+        Records the drivers advertised by installed packages, without importing them
+        """
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in iter_entry_points(self.entry_point_group):
+            self._Logger.debug('Found driver entry point :: ' + str(entry_point))
+            self._driver_sources[entry_point.name.lower()] = entry_point
+
+    def _create_driver(self, driver_source):
+        if isinstance(driver_source, str):
+            module_name, _, class_name = driver_source.partition(':')
+            driver_source = getattr(importlib.import_module(module_name), class_name)
+        elif hasattr(driver_source, 'load') and hasattr(driver_source, 'module_name'):
+            driver_source = driver_source.load()
+
+        if isinstance(driver_source, type):
+            return driver_source()
+        return driver_source
@@ -0,0 +1,308 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Controller.SensorHistory import SensorHistory
+from PduLibrary.Errors.ErrorCodes import TOO_MANY_EVENT_SUBSCRIBERS
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class SensorThreshold(object):
+    """
+    Threshold on a sensor reading of get_port_info, e.g. current>8 or voltage<200
+    """
+    comparisons = ('>', '<')
+
+    def __init__(self, sensor, comparison, value):
+        self.sensor = sensor
+        self.comparison = comparison
+        self.value = value
+
+    @staticmethod
+    def parse(text):
+        """
+        Parses a threshold
+        @param text: <sensor>><value> or <sensor><<value>, the sensor being one of SensorHistory.fields
+        @return: The SensorThreshold
+        @raise ValueError: When the text is not a valid threshold
+        """
+        for comparison in SensorThreshold.comparisons:
+            sensor, separator, value = str(text).partition(comparison)
+            if separator:
+                if sensor.strip() not in SensorHistory.fields:
+                    raise ValueError('unknown sensor %s, expected one of %s' % (
+                        sensor.strip(), ', '.join(SensorHistory.fields)))
+                return SensorThreshold(sensor.strip(), comparison, float(value))
+        raise ValueError('expected <sensor>><value> or <sensor><<value>, got %s' % text)
+
+    def is_crossed(self, value):
+        return value > self.value if self.comparison == '>' else value < self.value
+
+    def __str__(self):
+        return '%s%s%s' % (self.sensor, self.comparison, self.value)
+
+
+class EventSubscription(object):
+    """
+    Bounded queue of the events of one subscriber
+    A subscriber that does not keep up loses the oldest events, and gets an overflow event telling how many
+    before the next one it reads, so that it can read the current state again.
+    """
+
+    def __init__(self, ips=None, ports=None, event_types=None, thresholds=None, max_queued_events=None):
+        self.ips = set(ips) if ips else None
+        self.ports = set(int(port) for port in ports) if ports else None
+        self.event_types = set(event_types) if event_types else None
+        self.thresholds = list(thresholds or [])
+        self._condition = threading.Condition()
+        self._events = deque()
+        self._max_queued_events = max_queued_events or EventBroker.default_max_queued_events
+        self._dropped_event_count = 0
+        self._crossed_thresholds = set()
+        self._closed = False
+
+    def matches(self, event_type, ip, port):
+        """
+        Whether an event passes the PDU, port and event type filters of the subscription
+        """
+        if self.event_types is not None and event_type not in self.event_types:
+            return False
+        if self.ips is not None and ip not in self.ips:
+            return False
+        return self.ports is None or port in self.ports
+
+    def put(self, event):
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._events) >= self._max_queued_events:
+                self._events.popleft()
+                self._dropped_event_count += 1
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Waits for the next event
+        @param timeout: Maximum wait in secs
+        @return: The next event, None on timeout or once the subscription is closed
+        """
+        with self._condition:
+            if not self._events and not self._dropped_event_count and not self._closed:
+                self._condition.wait(timeout)
+            if self._dropped_event_count:
+                event = EventBroker.make_event(EventBroker.OVERFLOW, None, None,
+                                               droppedEventCount=self._dropped_event_count)
+                self._dropped_event_count = 0
+                return event
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._events.clear()
+            self._condition.notify_all()
+
+    def is_closed(self):
+        return self._closed
+
+    def check_thresholds(self, ip, port, readings, timestamp):
+        """
+        Compares sensor readings with the thresholds of the subscription
+        @return: List of sensor_threshold events, for the thresholds crossed or cleared since the last readings
+        """
+        events = []
+        with self._condition:
+            for threshold in self.thresholds:
+                value = readings.get(threshold.sensor)
+                if value is None:
+                    continue
+                key = (ip, port, threshold)
+                is_crossed = threshold.is_crossed(value)
+                if is_crossed == (key in self._crossed_thresholds):
+                    continue
+                if is_crossed:
+                    self._crossed_thresholds.add(key)
+                else:
+                    self._crossed_thresholds.discard(key)
+                events.append(EventBroker.make_event(
+                    EventBroker.SENSOR_THRESHOLD, ip, port, timestamp=timestamp, sensor=threshold.sensor,
+                    threshold=str(threshold), value=value, state='crossed' if is_crossed else 'cleared'))
+        return events
+
+
+class EventBroker(BaseObject):
+    """
+    Fans the events of the library out to subscribers, e.g. the /v1/events stream
+    - power_state: the power state of an outlet differs from the last one read, by a poll of FleetPoller or by
+      any get_pdu_info / get_port_info that reached the device
+    - power_operation: the result of a power operation, one event per port, without powerState when it failed
+    - sensor_threshold: a sensor reading crossed, or came back within, a threshold of the subscription
+    - overflow: events were dropped because the subscriber did not keep up
+    Every device read is published once, whatever the number of subscribers.
+    """
+    POWER_STATE = 'power_state'
+    POWER_OPERATION = 'power_operation'
+    SENSOR_THRESHOLD = 'sensor_threshold'
+    OVERFLOW = 'overflow'
+    event_types = (POWER_STATE, POWER_OPERATION, SENSOR_THRESHOLD)
+
+    # Every /v1/events stream holds one of the WsgiServer.default_stream_thread_count threads in the threaded mode,
+    # the rest of them being left to the other streams, e.g. /v1/fleet/stream
+    default_max_subscribers = 192
+    default_max_queued_events = 1000
+
+    _event_ids = itertools.count(1)
+
+    def __init__(self, max_subscribers=None, max_queued_events=None):
+        """
+        Initializes the class
+        @param max_subscribers: Maximum number of subscriptions at the same time
+        @param max_queued_events: Events kept for a subscriber that does not keep up, the oldest are dropped
+        """
+        BaseObject.__init__(self)
+        self._max_subscribers = max_subscribers or self.default_max_subscribers
+        self._max_queued_events = max_queued_events or self.default_max_queued_events
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self._power_states = dict()
+
+    @staticmethod
+    def make_event(event_type, ip, port, timestamp=None, **fields):
+        event = {
+            'id': next(EventBroker._event_ids),
+            'event': event_type,
+            'ip': ip,
+            'port': port,
+            'timestamp': timestamp or time.time()
+        }
+        event.update(fields)
+        return event
+
+    @staticmethod
+    def parse_event_type(text):
+        """
+        Validates an event type, for the filters of a subscription
+        @raise ValueError: When the event type is unknown
+        """
+        if text not in EventBroker.event_types:
+            raise ValueError('unknown event type %s, expected one of %s' % (text, ', '.join(EventBroker.event_types)))
+        return text
+
+    def subscribe(self, ips=None, ports=None, event_types=None, thresholds=None):
+        """
+        Subscribes to events
+        @param ips: IPs of the PDUs to get events of, None for every PDU
+        @param ports: Port/Outlet Numbers to get events of, None for every port
+        @param event_types: Event types to get, None for every type
+        @param thresholds: List of SensorThreshold raising sensor_threshold events
+        @return: The EventSubscription, to unsubscribe once done
+        """
+        subscription = EventSubscription(ips, ports, event_types, thresholds, self._max_queued_events)
+        with self._lock:
+            if len(self._subscriptions) >= self._max_subscribers:
+                raise PduLibraryException(TOO_MANY_EVENT_SUBSCRIBERS, self._max_subscribers)
+            # Copy on write, publishers iterate over the list without the lock
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            self._subscriptions = [other for other in self._subscriptions if other is not subscription]
+
+    def get_subscriber_count(self):
+        return len(self._subscriptions)
+
+    def publish_power_states(self, ip, power_states):
+        """
+        Records the power states read from a PDU, and publishes those that changed since the last read
+        The first read of an outlet is not a change.
+        @param ip: IP of PDU
+        @param power_states: Dictionary of Port/Outlet Number to power state
+        """
+        timestamp = time.time()
+        changes = []
+        with self._lock:
+            for port, power_state in power_states.items():
+                if power_state in (None, ''):
+                    continue
+                key = (ip, self._to_port(port))
+                previous_power_state = self._power_states.get(key)
+                self._power_states[key] = power_state
+                if previous_power_state is not None and previous_power_state != power_state:
+                    changes.append((key[1], power_state, previous_power_state))
+
+        for port, power_state, previous_power_state in changes:
+            self._Logger.info('Power state of PDU %s Port %s changed from %s to %s' % (
+                ip, port, previous_power_state, power_state))
+            self._publish(self.make_event(self.POWER_STATE, ip, port, timestamp=timestamp, powerState=power_state,
+                                          previousPowerState=previous_power_state))
+
+    def publish_power_operation(self, operation, ip, port_outputs, error=None):
+        """
+        Publishes the result of a power operation
+        @param operation: Name of the operation, e.g. power_on or reboot_ports
+        @param ip: IP of PDU
+        @param port_outputs: Dictionary of Port/Outlet Number to the output of the operation for the port
+        @param error: Exception raised by the operation, if any
+        """
+        if not self._subscriptions:
+            return
+        timestamp = time.time()
+        for port, output in port_outputs.items():
+            fields = dict(output or {})
+            fields.setdefault('ErrorCode', 0)
+            fields.setdefault('Message', None)
+            if error is not None:
+                fields['ErrorCode'] = error.get_error_code() if isinstance(error, PduLibraryException) \
+                    else GENERIC_ERR
+                fields['Message'] = error.get_error_message() if isinstance(error, PduLibraryException) \
+                    else str(error)
+            fields.pop('portNumber', None)
+            if fields['ErrorCode']:
+                # The output then only holds the state the operation was meant to reach
+                fields.pop('powerState', None)
+                fields.pop('lastPowerStateChangeTime', None)
+            self._publish(self.make_event(self.POWER_OPERATION, ip, self._to_port(port), timestamp=timestamp,
+                                          operation=operation, **fields))
+
+    def publish_sensor_readings(self, ip, port, sensor_data):
+        """
+        Checks the sensor readings of an outlet against the thresholds of the subscriptions
+        @param ip: IP of PDU
+        @param port: Port/Outlet Number
+        @param sensor_data: The sensorData of get_port_info
+        """
+        subscriptions = [subscription for subscription in self._subscriptions if subscription.thresholds]
+        if not subscriptions:
+            return
+        port = self._to_port(port)
+        readings = dict()
+        for sensor, value in sensor_data.items():
+            try:
+                readings[sensor] = float(value)
+            except (TypeError, ValueError):
+                continue
+        timestamp = time.time()
+        for subscription in subscriptions:
+            if subscription.matches(self.SENSOR_THRESHOLD, ip, port):
+                for event in subscription.check_thresholds(ip, port, readings, timestamp):
+                    subscription.put(event)
+
+    def _publish(self, event):
+        for subscription in self._subscriptions:
+            if subscription.matches(event['event'], event['ip'], event['port']):
+                subscription.put(event)
+
+    @staticmethod
+    def _to_port(port):
+        try:
+            return int(port)
+        except (TypeError, ValueError):
+            return port
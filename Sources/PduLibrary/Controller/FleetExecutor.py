@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Errors.ErrorCodes import INVALID_FLEET_TARGET, UNSUPPORTED_FLEET_OPERATION
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class FleetExecutor(BaseObject):
+    """
+    Runs the same PduLibraryManager operation against many PDUs concurrently
+    A shared worker pool bounds the concurrency of the whole process, and every run is further bounded
+    per run and per PDU. Targets are consumed lazily, so memory does not grow with the size of the fleet.
+    """
+    default_max_workers = 64
+    default_max_concurrency = 32
+    default_max_concurrency_per_pdu = 1
+
+    # Operation name -> name of the target field passed after the credentials
+    supported_operations = {
+        'get_pdu_info': None,
+        'get_port_info': 'port',
+        'power_on': 'port',
+        'power_off': 'port',
+        'reboot': 'port',
+        'power_on_ports': 'ports',
+        'power_off_ports': 'ports',
+        'reboot_ports': 'ports'
+    }
+
+    def __init__(self, pdu_library_manager, max_workers=None):
+        """
+        Initializes the class
+        @param pdu_library_manager: The PduLibraryManager running the operations
+        @param max_workers: Size of the worker pool shared by every run
+        """
+        BaseObject.__init__(self)
+        self._pdu_library_manager = pdu_library_manager
+        self._max_workers = max_workers or self.default_max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def execute(self, operation, targets, max_concurrency=None, max_concurrency_per_pdu=None):
+        """
+        Runs an operation against every target, yielding the result of each target as soon as it completes
+        @param operation: One of supported_operations
+        @param targets: Iterable of dictionaries with manufacturer, ip, username, password and port/ports
+        @param max_concurrency: Maximum number of targets of this run in flight at the same time
+        @param max_concurrency_per_pdu: Maximum number of targets of this run in flight against the same ip
+        @return: Generator of result dictionaries with target, ErrorCode, Message, Data and latency
+        """
+        if operation not in self.supported_operations:
+            raise PduLibraryException(UNSUPPORTED_FLEET_OPERATION, operation)
+
+        return self._execute(operation, targets,
+                             max_concurrency or self.default_max_concurrency,
+                             max_concurrency_per_pdu or self.default_max_concurrency_per_pdu)
+
+    def _execute(self, operation, targets, max_concurrency, max_concurrency_per_pdu):
+        max_deferred_targets = 4 * max_concurrency
+
+        executor = self._get_executor()
+        targets = iter(targets)
+        targets_exhausted = False
+        deferred_targets = deque()
+        in_flight = dict()
+        in_flight_per_pdu = defaultdict(int)
+
+        while True:
+            while len(in_flight) < max_concurrency:
+                target = None
+                for deferred_target in deferred_targets:
+                    if in_flight_per_pdu[deferred_target.get('ip')] < max_concurrency_per_pdu:
+                        target = deferred_target
+                        deferred_targets.remove(deferred_target)
+                        break
+
+                while target is None and not targets_exhausted and len(deferred_targets) < max_deferred_targets:
+                    try:
+                        next_target = next(targets)
+                    except StopIteration:
+                        targets_exhausted = True
+                        break
+                    invalid_field = self._get_invalid_field(next_target)
+                    if invalid_field is not None:
+                        # Answered at once, in_flight_per_pdu is never keyed by an ip which may not even be hashable
+                        yield self._make_invalid_result(operation, next_target, invalid_field)
+                        continue
+                    if in_flight_per_pdu[next_target.get('ip')] < max_concurrency_per_pdu:
+                        target = next_target
+                    else:
+                        deferred_targets.append(next_target)
+
+                if target is None:
+                    break
+
+                in_flight_per_pdu[target.get('ip')] += 1
+                in_flight[executor.submit(self._run_target, operation, target)] = target
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                target = in_flight.pop(future)
+                in_flight_per_pdu[target.get('ip')] -= 1
+                if not in_flight_per_pdu[target.get('ip')]:
+                    del in_flight_per_pdu[target.get('ip')]
+                yield future.result()
+
+    def summarize(self, results):
+        """
+        Summarizes the results of a run
+        @param results: Iterable of result dictionaries yielded by execute()
+        @return: Dictionary with counts, latency statistics and failures per error code
+        """
+        latencies = []
+        failures_per_error_code = defaultdict(int)
+        summary = {
+            'total': 0,
+            'succeeded': 0,
+            'failed': 0
+        }
+        for result in results:
+            summary['total'] += 1
+            latencies.append(result['latency'])
+            if result['ErrorCode']:
+                summary['failed'] += 1
+                failures_per_error_code[str(result['ErrorCode'])] += 1
+            else:
+                summary['succeeded'] += 1
+
+        latencies.sort()
+        summary['latency'] = {
+            'min': latencies[0] if latencies else None,
+            'max': latencies[-1] if latencies else None,
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+            'p50': self._percentile(latencies, 50),
+            'p95': self._percentile(latencies, 95),
+            'p99': self._percentile(latencies, 99)
+        }
+        summary['failuresPerErrorCode'] = dict(failures_per_error_code)
+        return summary
+
+    def shutdown(self):
+        """
+        Stops the shared worker pool once the running targets are done
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='FleetWorker')
+            return self._executor
+
+    def _get_invalid_field(self, target):
+        """
+        Checks the fields the run itself relies on, the others are checked by _run_target
+        @return: Description of the missing or invalid field, None when the target is valid
+        """
+        if not isinstance(target, dict):
+            return 'target (not an object)'
+        if 'ip' not in target:
+            return "'ip'"
+        if not isinstance(target['ip'], str):
+            return "'ip' (not a string)"
+        return None
+
+    def _make_result(self, operation, target):
+        if not isinstance(target, dict):
+            target = dict()
+        result = {
+            'target': {
+                'manufacturer': target.get('manufacturer'),
+                'ip': target.get('ip')
+            },
+            'ErrorCode': 0,
+            'Message': None,
+            'Data': None,
+            'latency': 0.0
+        }
+        target_field = self.supported_operations[operation]
+        if target_field:
+            result['target'][target_field] = target.get(target_field)
+        return result
+
+    def _make_invalid_result(self, operation, target, invalid_field):
+        result = self._make_result(operation, target)
+        exception = PduLibraryException(INVALID_FLEET_TARGET, invalid_field)
+        result['ErrorCode'] = exception.get_error_code()
+        result['Message'] = exception.get_error_message()
+        return result
+
+    def _run_target(self, operation, target):
+        """
+        Runs the operation against one target, turning every failure into an error result
+        """
+        result = self._make_result(operation, target)
+        target_field = self.supported_operations[operation]
+
+        started_at = time.perf_counter()
+        try:
+            arguments = [target['manufacturer'], target['ip'], target['username'], target['password']]
+            if target_field:
+                arguments.append(target[target_field])
+        except KeyError as err:
+            return self._make_invalid_result(operation, target, str(err))
+
+        try:
+            result['Data'] = getattr(self._pdu_library_manager, operation)(*arguments)
+        except PduLibraryException as err:
+            result['ErrorCode'] = err.get_error_code()
+            result['Message'] = err.get_error_message()
+        except Exception as err:
+            result['ErrorCode'] = GENERIC_ERR
+            result['Message'] = str(err)
+        result['latency'] = time.perf_counter() - started_at
+        return result
+
+    def _percentile(self, sorted_values, percentile):
+        if not sorted_values:
+            return None
+        index = min(len(sorted_values) - 1, int(round(percentile / 100.0 * (len(sorted_values) - 1))))
+        return sorted_values[index]
@@ -0,0 +1,318 @@
+import copy
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Errors.ErrorCodes import PDU_NOT_REGISTERED
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class _PolledRecord(object):
+    """
+    State of a PDU (port None) or of one of its ports, as last read by the poller
+    """
+
+    def __init__(self, ip, port, interval_in_secs):
+        self.ip = ip
+        self.port = port
+        self.interval_in_secs = interval_in_secs
+        self.data = None
+        self.signature = None
+        self.error_code = 0
+        self.message = None
+        self.updated_at = None
+        self.updated_at_monotonic = None
+        self.changed_at = None
+        self.outdated = True
+        self.outdated_at = float('-inf')
+        self.due_at = 0.0
+
+    def to_dict(self):
+        return {
+            'port': self.port,
+            'ErrorCode': self.error_code,
+            'Message': self.message,
+            'Data': self.data,
+            'updatedAt': self.updated_at,
+            'changedAt': self.changed_at,
+            'pollIntervalInSecs': self.interval_in_secs
+        }
+
+
+class FleetPoller(BaseObject):
+    """
+    Keeps an in-memory state table of registered PDUs and ports, refreshed by a background poller
+    Every record has its own interval: it drops to min_interval_in_secs when the record changed and grows
+    up to max_interval_in_secs while it stays the same. At most max_concurrency reads run at a time and
+    never more than one per PDU.
+    """
+    default_min_interval_in_secs = 5
+    default_max_interval_in_secs = 60
+    default_max_concurrency = 16
+
+    def __init__(self, pdu_library_manager, min_interval_in_secs=None, max_interval_in_secs=None,
+                 max_concurrency=None):
+        """
+        Initializes the class
+        @param pdu_library_manager: The PduLibraryManager used to read the devices
+        @param min_interval_in_secs: Poll interval of records that just changed
+        @param max_interval_in_secs: Poll interval of records that have been stable for a while
+        @param max_concurrency: Maximum number of device reads in flight
+        """
+        BaseObject.__init__(self)
+        self._pdu_library_manager = pdu_library_manager
+        self._min_interval_in_secs = min_interval_in_secs or self.default_min_interval_in_secs
+        self._max_interval_in_secs = max_interval_in_secs or self.default_max_interval_in_secs
+        self._max_concurrency = max_concurrency or self.default_max_concurrency
+        self._condition = threading.Condition()
+        self._pdus = dict()
+        self._records = dict()
+        self._schedule = []
+        self._schedule_sequence = itertools.count()
+        self._busy_ips = set()
+        self._deferred_records = dict()
+        self._in_flight = 0
+        self._executor = None
+        self._thread = None
+        self._running = False
+
+    def register_pdu(self, manufacturer, ip, username, password, ports=None):
+        """
+        Adds a PDU to the state table, or replaces its registration, and starts polling it
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param ports: Port/Outlet Numbers to poll with get_port_info, besides get_pdu_info
+        """
+        with self._condition:
+            self._remove_pdu(ip)
+            self._pdus[ip] = {
+                'manufacturer': manufacturer.lower(),
+                'ip': ip,
+                'username': username,
+                'password': password,
+                'ports': sorted(set(int(port) for port in ports or []))
+            }
+            for port in [None] + self._pdus[ip]['ports']:
+                record = self._records[(ip, port)] = _PolledRecord(ip, port, self._min_interval_in_secs)
+                self._push(record, time.monotonic())
+            self._start()
+        self._Logger.info('Registered PDU %s for polling' % ip)
+
+    def unregister_pdu(self, ip):
+        """
+        Removes a PDU from the state table
+        @param ip: IP of PDU
+        """
+        with self._condition:
+            if ip not in self._pdus:
+                raise PduLibraryException(PDU_NOT_REGISTERED, ip)
+            self._remove_pdu(ip)
+        self._Logger.info('Unregistered PDU %s from polling' % ip)
+
+    def get_state(self):
+        """
+        Gets the state table, without credentials
+        @return: List of registered PDUs with the records of the PDU and of its ports
+        """
+        with self._condition:
+            return [{
+                'manufacturer': pdu['manufacturer'],
+                'ip': pdu['ip'],
+                'pdu': copy.deepcopy(self._records[(pdu['ip'], None)].to_dict()),
+                'ports': [copy.deepcopy(self._records[(pdu['ip'], port)].to_dict()) for port in pdu['ports']]
+            } for pdu in self._pdus.values()]
+
+    def get_polled_data(self, manufacturer, ip, username, password, port=None, max_age=None):
+        """
+        Gets the data of a record if the PDU is polled with the same credentials and the data is recent enough
+        @param manufacturer: The manufacturer in lowercase
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number, None for the PDU information
+        @param max_age: Maximum age in secs, None to accept anything up to twice the maximum poll interval
+        @return: A copy of the data, None if it cannot be served from memory
+        """
+        with self._condition:
+            pdu = self._pdus.get(ip)
+            if pdu is None or (pdu['manufacturer'], pdu['username'], pdu['password']) != \
+                    (manufacturer, username, password):
+                return None
+            record = self._records.get((ip, None if port is None else int(port)))
+            if record is None or record.outdated or record.data is None or record.error_code:
+                return None
+            if time.monotonic() - record.updated_at_monotonic > \
+                    (2 * self._max_interval_in_secs if max_age is None else max_age):
+                return None
+            return copy.deepcopy(record.data)
+
+    def get_registration(self, ip):
+        """
+        Gets the manufacturer and credentials a PDU is polled with
+        @param ip: IP of PDU
+        @return: Tuple of (manufacturer, username, password), None if the PDU is not registered
+        """
+        with self._condition:
+            pdu = self._pdus.get(ip)
+            if pdu is None:
+                return None
+            return pdu['manufacturer'], pdu['username'], pdu['password']
+
+    def get_polled_freshness(self, ip, port=None):
+        """
+        Gets for how long the data of a record stays current, until the record is polled again
+        @param ip: IP of PDU
+        @param port: Port/Outlet Number, None for the PDU information
+        @return: Secs until the next poll of the record, 0 when it is due or outdated, None if it is not polled
+        """
+        with self._condition:
+            record = self._records.get((ip, None if port is None else int(port)))
+            if record is None or record.data is None:
+                return None
+            if record.outdated:
+                return 0
+            return max(0.0, record.due_at - time.monotonic())
+
+    def mark_changed(self, ip, ports=None):
+        """
+        Stops serving the records of a PDU from memory and polls them right away, after a power operation
+        @param ip: IP of PDU
+        @param ports: Port/Outlet Numbers that changed, None for every port
+        """
+        ports = None if ports is None else set(int(port) for port in ports)
+        with self._condition:
+            pdu = self._pdus.get(ip)
+            if pdu is None:
+                return
+            for port in [None] + pdu['ports']:
+                if port is not None and ports is not None and port not in ports:
+                    continue
+                record = self._records[(ip, port)]
+                record.outdated = True
+                record.outdated_at = time.monotonic()
+                record.interval_in_secs = self._min_interval_in_secs
+                self._push(record, time.monotonic())
+            self._condition.notify()
+
+    def stop(self):
+        """
+        Stops the poller thread, the state table is kept
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _start(self):
+        if self._running:
+            return
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix='FleetPollerWorker')
+        self._thread = threading.Thread(target=self._run, name='FleetPoller', daemon=True)
+        self._thread.start()
+
+    def _remove_pdu(self, ip):
+        pdu = self._pdus.pop(ip, None)
+        if pdu is None:
+            return
+        for port in [None] + pdu['ports']:
+            self._records.pop((ip, port), None)
+        self._deferred_records.pop(ip, None)
+
+    def _push(self, record, due_at):
+        record.due_at = due_at
+        heapq.heappush(self._schedule, (due_at, next(self._schedule_sequence), record))
+
+    def _run(self):
+        with self._condition:
+            while self._running:
+                now = time.monotonic()
+                if self._schedule and self._schedule[0][0] <= now and self._in_flight < self._max_concurrency:
+                    due_at, _, record = heapq.heappop(self._schedule)
+                    if self._records.get((record.ip, record.port)) is not record or record.due_at != due_at:
+                        # Unregistered, or rescheduled since this entry was pushed
+                        continue
+                    if record.ip in self._busy_ips:
+                        self._deferred_records.setdefault(record.ip, []).append(record)
+                        continue
+                    self._busy_ips.add(record.ip)
+                    self._in_flight += 1
+                    self._executor.submit(self._poll, record, dict(self._pdus[record.ip]))
+                elif self._schedule and self._in_flight < self._max_concurrency:
+                    self._condition.wait(self._schedule[0][0] - now)
+                else:
+                    self._condition.wait()
+
+    def _poll(self, record, pdu):
+        started_at = time.monotonic()
+        data = None
+        error_code = 0
+        message = None
+        try:
+            if record.port is None:
+                data = self._pdu_library_manager.get_pdu_info(pdu['manufacturer'], pdu['ip'], pdu['username'],
+                                                              pdu['password'], max_age=0)
+            else:
+                data = self._pdu_library_manager.get_port_info(pdu['manufacturer'], pdu['ip'], pdu['username'],
+                                                               pdu['password'], record.port, max_age=0)
+        except PduLibraryException as err:
+            error_code = err.get_error_code()
+            message = err.get_error_message()
+        except Exception as err:
+            error_code = GENERIC_ERR
+            message = str(err)
+
+        with self._condition:
+            self._in_flight -= 1
+            self._busy_ips.discard(record.ip)
+            for deferred_record in self._deferred_records.pop(record.ip, []):
+                self._push(deferred_record, time.monotonic())
+
+            if self._records.get((record.ip, record.port)) is record:
+                self._update(record, data, error_code, message)
+                if record.outdated_at >= started_at:
+                    # Changed by a power operation during the read, read it again
+                    record.outdated = True
+                    self._push(record, time.monotonic())
+                else:
+                    self._push(record, time.monotonic() + record.interval_in_secs)
+            self._condition.notify()
+
+    def _update(self, record, data, error_code, message):
+        if error_code:
+            record.error_code = error_code
+            record.message = message
+            record.interval_in_secs = min(2 * record.interval_in_secs, self._max_interval_in_secs)
+            return
+
+        signature = self._get_signature(record.port, data)
+        if record.signature is None or signature != record.signature:
+            if record.signature is not None:
+                record.changed_at = time.time()
+            record.interval_in_secs = self._min_interval_in_secs
+        else:
+            record.interval_in_secs = min(2 * record.interval_in_secs, self._max_interval_in_secs)
+        record.signature = signature
+        record.data = data
+        record.error_code = 0
+        record.message = None
+        record.updated_at = time.time()
+        record.updated_at_monotonic = time.monotonic()
+        record.outdated = False
+
+    def _get_signature(self, port, data):
+        """
+        Gets the part of a record whose change speeds up polling: the outlet states
+        """
+        if port is None:
+            return tuple((outlet.get('portNumber'), outlet.get('portStatus')) for outlet in data.get('outlets', []))
+        state_data = data.get('stateData') or {}
+        return state_data.get('powerState'), state_data.get('available')
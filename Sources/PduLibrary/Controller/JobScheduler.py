@@ -0,0 +1,170 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Errors.ErrorCodes import JOB_NOT_FOUND
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class Job(object):
+    """
+    A power operation running in the background, made of steps separated by delays
+    """
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+    def __init__(self, operation, target, steps):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.target = target
+        self.steps = steps
+        self.state = Job.PENDING
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error_code = 0
+        self.message = None
+
+    def is_finished(self):
+        return self.state in (Job.SUCCEEDED, Job.FAILED)
+
+    def to_dict(self):
+        return {
+            'jobId': self.id,
+            'operation': self.operation,
+            'target': self.target,
+            'state': self.state,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'ErrorCode': self.error_code,
+            'Message': self.message,
+            'Data': self.result
+        }
+
+
+class JobScheduler(BaseObject, Singleton):
+    """
+    Runs jobs on a small worker pool, waiting between their steps with timers instead of sleeping threads
+    A single timer thread keeps every pending step in a heap, so thousands of delayed steps cost no threads
+    """
+    default_max_workers = 16
+    default_job_retention_in_secs = 3600
+
+    def __init__(self, max_workers=None, job_retention_in_secs=None):
+        """
+        Initializes the class
+        @param max_workers: Number of steps running against devices at the same time
+        @param job_retention_in_secs: Finished jobs are forgotten after this long
+        """
+        BaseObject.__init__(self)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or self.default_max_workers,
+                                            thread_name_prefix='JobWorker')
+        self._job_retention_in_secs = job_retention_in_secs or self.default_job_retention_in_secs
+        self._condition = threading.Condition()
+        self._timers = []
+        self._timer_sequence = itertools.count()
+        self._jobs = dict()
+        # (finished_at, job id) in the order jobs finished, so expired jobs are popped from the left
+        self._finished_jobs = deque()
+        self._timer_thread = None
+
+    def submit(self, operation, target, steps):
+        """
+        Submits a job
+        @param operation: Name of the operation, for reporting
+        @param target: Dictionary describing what the job acts on, for reporting
+        @param steps: List of (delay in secs, callable) run one after the other, each delay counting from the
+                      end of the previous step. The result of the last step is the result of the job.
+        @return: The Job
+        """
+        job = Job(operation, target, list(steps))
+        with self._condition:
+            self._forget_finished_jobs()
+            self._jobs[job.id] = job
+        self._schedule(job, 0)
+        self._Logger.info('Submitted job %s for %s on %s' % (job.id, operation, target))
+        return job
+
+    def get_job(self, job_id):
+        """
+        Gets a job
+        @param job_id: Id of the job
+        @return: The Job
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise PduLibraryException(JOB_NOT_FOUND, job_id)
+        return job
+
+    def get_pending_step_count(self):
+        """
+        Gets the number of steps waiting for their timer
+        """
+        with self._condition:
+            return len(self._timers)
+
+    def _schedule(self, job, step_index):
+        delay_in_secs = job.steps[step_index][0]
+        with self._condition:
+            # Started on first use
+            if self._timer_thread is None or not self._timer_thread.is_alive():
+                self._timer_thread = threading.Thread(target=self._run_timers, name='JobTimer', daemon=True)
+                self._timer_thread.start()
+            heapq.heappush(self._timers, (time.monotonic() + delay_in_secs, next(self._timer_sequence),
+                                          job, step_index))
+            self._condition.notify()
+
+    def _run_timers(self):
+        while True:
+            with self._condition:
+                while not self._timers or self._timers[0][0] > time.monotonic():
+                    self._condition.wait(self._timers[0][0] - time.monotonic() if self._timers else None)
+                _, _, job, step_index = heapq.heappop(self._timers)
+            self._executor.submit(self._run_step, job, step_index)
+
+    def _run_step(self, job, step_index):
+        if job.state == Job.PENDING:
+            job.state = Job.RUNNING
+            job.started_at = time.time()
+
+        try:
+            result = job.steps[step_index][1]()
+        except PduLibraryException as err:
+            self._finish(job, Job.FAILED, None, err.get_error_code(), err.get_error_message())
+            return
+        except Exception as err:
+            self._finish(job, Job.FAILED, None, GENERIC_ERR, str(err))
+            return
+
+        if step_index + 1 < len(job.steps):
+            self._schedule(job, step_index + 1)
+        else:
+            self._finish(job, Job.SUCCEEDED, result, 0, None)
+
+    def _finish(self, job, state, result, error_code, message):
+        job.result = result
+        job.error_code = error_code
+        job.message = message
+        with self._condition:
+            job.finished_at = time.time()
+            job.state = state
+            self._finished_jobs.append((job.finished_at, job.id))
+        self._Logger.info('Job %s finished :: %s' % (job.id, state))
+
+    def _forget_finished_jobs(self):
+        expired_before = time.time() - self._job_retention_in_secs
+        while self._finished_jobs and self._finished_jobs[0][0] < expired_before:
+            _, job_id = self._finished_jobs.popleft()
+            del self._jobs[job_id]
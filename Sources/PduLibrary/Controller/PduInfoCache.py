@@ -0,0 +1,256 @@
+import copy
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from PduLibrary.Common.BaseObject import BaseObject
+
+
+class _CacheEntry(object):
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.refreshing = False
+
+
+class PduInfoCache(BaseObject):
+    """
+    Read-through cache of get_pdu_info / get_port_info results
+    Results are trusted for dynamic_ttl_in_secs. Once expired the cached value is still served for
+    stale_ttl_in_secs while a background read refreshes it. Power operations invalidate the affected entries,
+    reads started before the invalidation are returned to their caller but not cached.
+    Nameplates (model, serial number, firmware, ratings...) of the drivers reading them on their own are kept
+    apart for static_ttl_in_secs, see get_static, so that refreshing a result only reads its state and sensors.
+    Keys carry the credentials, so entries are dropped once they can no longer be served, every
+    sweep_interval_in_secs, and the oldest ones are evicted beyond max_entries results or nameplates.
+    """
+    default_static_ttl_in_secs = 3600
+    default_dynamic_ttl_in_secs = 5
+    default_stale_ttl_in_secs = 30
+    default_max_refresh_workers = 4
+    default_max_entries = 10000
+    sweep_interval_in_secs = 10
+
+    def __init__(self, static_ttl_in_secs=None, dynamic_ttl_in_secs=None, stale_ttl_in_secs=None,
+                 max_refresh_workers=None, max_entries=None):
+        """
+        Initializes the class
+        @param static_ttl_in_secs: Lifetime of the nameplates, see get_static
+        @param dynamic_ttl_in_secs: Lifetime of the results, i.e. of the outlet state and sensor readings
+        @param stale_ttl_in_secs: Time past dynamic_ttl_in_secs during which a stale value is served while
+                                  it is refreshed in the background, 0 to always refresh synchronously
+        @param max_refresh_workers: Number of background refreshes running at the same time
+        @param max_entries: Maximum number of cached results, and of cached nameplates
+        """
+        BaseObject.__init__(self)
+        self._static_ttl_in_secs = static_ttl_in_secs or self.default_static_ttl_in_secs
+        self._dynamic_ttl_in_secs = dynamic_ttl_in_secs or self.default_dynamic_ttl_in_secs
+        self._stale_ttl_in_secs = self.default_stale_ttl_in_secs if stale_ttl_in_secs is None \
+            else stale_ttl_in_secs
+        self._max_refresh_workers = max_refresh_workers or self.default_max_refresh_workers
+        self._max_entries = max_entries or self.default_max_entries
+        self._lock = threading.Lock()
+        self._entries = dict()
+        self._static_entries = dict()
+        self._invalidated_at = dict()
+        # Load id -> start time of the device reads in flight, invalidations older than all of them are forgotten
+        self._loads_in_flight = dict()
+        self._load_ids = itertools.count()
+        self._swept_at = time.monotonic()
+        self._refresh_executor = None
+        self._stats = defaultdict(int)
+
+    def get(self, key, loader, max_age=None):
+        """
+        Gets a value from the cache, reading it with the loader when missing or too old
+        @param key: Tuple of (operation, manufacturer, ip, ...) identifying the value
+        @param loader: Callable without arguments reading the value from the device
+        @param max_age: Maximum age in secs of an acceptable cached value, 0 to force a fresh read,
+                        None for the TTLs of the cache
+        @return: A copy of the value
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sweep_if_due(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if max_age is not None:
+                    if age <= max_age:
+                        self._stats['hits'] += 1
+                        return copy.deepcopy(entry.value)
+                elif age <= self._dynamic_ttl_in_secs:
+                    self._stats['hits'] += 1
+                    return copy.deepcopy(entry.value)
+                elif age <= self._dynamic_ttl_in_secs + self._stale_ttl_in_secs:
+                    self._stats['staleHits'] += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self._get_refresh_executor().submit(self._refresh, key, loader)
+                    return copy.deepcopy(entry.value)
+            self._stats['misses'] += 1
+
+        return copy.deepcopy(self._load(key, loader))
+
+    def get_static(self, key, loader):
+        """
+        Gets a nameplate, reading it with the loader when missing or older than static_ttl_in_secs
+        Nameplates do not change with power operations, they are neither invalidated nor refreshed in the background
+        @param key: Tuple of (operation, manufacturer, ip, ...) identifying the nameplate
+        @param loader: Callable without arguments reading the nameplate from the device
+        @return: A copy of the nameplate
+        """
+        with self._lock:
+            self._sweep_if_due(time.monotonic())
+            entry = self._static_entries.get(key)
+            if entry is not None and time.monotonic() - entry.fetched_at <= self._static_ttl_in_secs:
+                self._stats['staticHits'] += 1
+                return copy.deepcopy(entry.value)
+            self._stats['staticMisses'] += 1
+
+        value = loader()
+        with self._lock:
+            if key not in self._static_entries:
+                self._make_room(self._static_entries)
+            self._static_entries[key] = _CacheEntry(value, time.monotonic())
+        return copy.deepcopy(value)
+
+    def invalidate(self, manufacturer, ip, ports=None):
+        """
+        Marks the state of a PDU as outdated after a power operation
+        @param manufacturer: The manufacturer in lowercase
+        @param ip: IP of PDU
+        @param ports: Port/Outlet numbers changed by the operation, None for every port
+        """
+        now = time.monotonic()
+        ports = None if ports is None else set(int(port) for port in ports)
+        with self._lock:
+            self._sweep_if_due(now)
+            self._invalidated_at[(manufacturer, ip)] = now
+            for key, entry in self._entries.items():
+                if key[1:3] != (manufacturer, ip):
+                    continue
+                if key[0] == 'get_port_info' and ports is not None and int(key[-1]) not in ports:
+                    continue
+                entry.fetched_at = float('-inf')
+            self._stats['invalidations'] += 1
+
+    def get_freshness(self, key):
+        """
+        Gets for how long the cached value of a key is still served without reading the device again
+        @param key: Tuple of (operation, manufacturer, ip, ...) identifying the value
+        @return: Secs left of the dynamic TTL, 0 when the value is missing or already stale
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0
+            return max(0.0, self._dynamic_ttl_in_secs - (time.monotonic() - entry.fetched_at))
+
+    def clear(self):
+        """
+        Drops every cached value
+        """
+        with self._lock:
+            self._entries.clear()
+            self._static_entries.clear()
+            self._invalidated_at.clear()
+
+    def get_stats(self):
+        """
+        Gets the hit, stale hit, miss, refresh, invalidation and eviction counts, and the nameplate hit and miss
+        counts
+        @return: Dictionary of counts and the numbers of cached results and nameplates
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['staticEntries'] = len(self._static_entries)
+            return stats
+
+    def _load(self, key, loader):
+        with self._lock:
+            load_id = next(self._load_ids)
+            started_at = self._loads_in_flight[load_id] = time.monotonic()
+        try:
+            value = loader()
+        finally:
+            with self._lock:
+                del self._loads_in_flight[load_id]
+        finished_at = time.monotonic()
+        with self._lock:
+            if self._invalidated_at.get(key[1:3], float('-inf')) >= started_at:
+                return value
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.value = value
+                entry.fetched_at = finished_at
+            else:
+                self._make_room(self._entries)
+                self._entries[key] = _CacheEntry(value, finished_at)
+        return value
+
+    def _refresh(self, key, loader):
+        outcome = 'refreshes'
+        try:
+            self._load(key, loader)
+        except Exception as err:
+            self._Logger.error('Error while refreshing ' + str(key[:3]) + ' :: ' + str(err))
+            outcome = 'refreshErrors'
+        finally:
+            with self._lock:
+                self._stats[outcome] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+    def _sweep_if_due(self, now):
+        """
+        Drops the results past their stale TTL, the nameplates past their TTL and the invalidations older than
+        every read in flight, at most every sweep_interval_in_secs. Called with the lock held.
+        """
+        if now - self._swept_at < self.sweep_interval_in_secs:
+            return
+        self._swept_at = now
+
+        expired_before = now - self._dynamic_ttl_in_secs - self._stale_ttl_in_secs
+        for key in [key for key, entry in self._entries.items()
+                    if entry.fetched_at < expired_before and not entry.refreshing]:
+            del self._entries[key]
+
+        expired_before = now - self._static_ttl_in_secs
+        for key in [key for key, entry in self._static_entries.items() if entry.fetched_at < expired_before]:
+            del self._static_entries[key]
+
+        oldest_load_started_at = min(self._loads_in_flight.values(), default=now)
+        for pdu in [pdu for pdu, invalidated_at in self._invalidated_at.items()
+                    if invalidated_at < oldest_load_started_at]:
+            del self._invalidated_at[pdu]
+
+    def _make_room(self, entries):
+        """
+        Evicts the oldest tenth of entries when they are full, so that evictions are paid once per many inserts.
+        Called with the lock held.
+        """
+        if len(entries) < self._max_entries:
+            return
+        self._swept_at = float('-inf')
+        self._sweep_if_due(time.monotonic())
+        if len(entries) < self._max_entries:
+            return
+        evicted_keys = heapq.nsmallest(max(1, self._max_entries // 10), entries,
+                                       key=lambda key: entries[key].fetched_at)
+        for key in evicted_keys:
+            del entries[key]
+        self._stats['evictions'] += len(evicted_keys)
+
+    def _get_refresh_executor(self):
+        if self._refresh_executor is None:
+            self._refresh_executor = ThreadPoolExecutor(max_workers=self._max_refresh_workers,
+                                                        thread_name_prefix='PduInfoCacheRefresh')
+        return self._refresh_executor
@@ -1,28 +1,45 @@
+import contextlib
+import copy
 import datetime
 
 from PduLibrary import __version__
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import MetricsRegistry
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+from PduLibrary.Common.SingleFlight import SingleFlight
 from PduLibrary.Common.Singleton import Singleton
-from PduLibrary.PDUManager.ApcLibraryManager import ApcLibraryManager
-from PduLibrary.PDUManager.DliLibraryManager import DliLibraryManager
-from PduLibrary.PDUManager.RaritanLibraryManager import RaritanLibraryManager
-from PduLibrary.PDUManager.AtenLibraryManager import AtenLibraryManager
+from PduLibrary.Controller.DriverRegistry import DriverRegistry
+from PduLibrary.Controller.EventBroker import EventBroker
+from PduLibrary.Controller.FleetExecutor import FleetExecutor
+from PduLibrary.Controller.FleetPoller import FleetPoller
+from PduLibrary.Controller.JobScheduler import JobScheduler
+from PduLibrary.Controller.PduInfoCache import PduInfoCache
+from PduLibrary.Controller.SensorHistory import SensorHistory
+from PduLibrary.Core.ServingMode import ServingMode
+from PduLibrary.Errors.ErrorCodes import INVALID_PORT_LIST, UNSUPPORTED_JOB_OPERATION, UNAVAILABLE_IN_PREFORK_WORKER
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
 
 
 class PduLibraryManager(BaseObject, Singleton):
+    # Operation name -> name of the target field, for operations that can run as jobs
+    job_operations = {
+        'power_on': 'port',
+        'power_off': 'port',
+        'reboot': 'port',
+        'power_on_ports': 'ports',
+        'power_off_ports': 'ports',
+        'reboot_ports': 'ports'
+    }
 
     def Factory(self, manufacturer="raritan"):
-        """Factory Method to instantiate the object of actual library manager
+        """Factory Method to get the object of actual library manager
         @param manufacturer: The manufacturer in lowercase
         @return: The object of the actual library manager which serves the request
         """
-        pdu_managers = {
-            "raritan": RaritanLibraryManager(),
-            "dli": DliLibraryManager(),
-            "apc": ApcLibraryManager(),
-            "aten": AtenLibraryManager()
-        }
-        return pdu_managers[manufacturer]
+        driver = self._driver_registry.get_driver(manufacturer)
+        if getattr(driver, 'keeps_device_sessions', False):
+            self._check_single_process('The device session of %s PDUs' % manufacturer.upper())
+        return driver
 
     def __init__(self):
         """
@@ -30,6 +47,39 @@ class PduLibraryManager(BaseObject, Singleton):
         """
         BaseObject.__init__(self)
         self._working_folder_path = '.'
+        self._driver_registry = DriverRegistry.get_instance()
+        self._fleet_executor = FleetExecutor(self)
+        self._job_scheduler = JobScheduler.get_instance()
+        self._single_flight = SingleFlight()
+        self._pdu_info_cache = PduInfoCache()
+        self._fleet_poller = FleetPoller(self)
+        self._sensor_history = SensorHistory()
+        self._event_broker = EventBroker()
+        self._metrics = MetricsRegistry.get_instance()
+
+    def _check_single_process(self, feature):
+        """
+        Refuses a feature keeping its state in memory in the worker processes of the prefork serving mode, which
+        would each answer from their own copy of it, see ServingMode.is_prefork_worker
+        @param feature: Name of the feature, for the error message
+        """
+        if ServingMode.is_prefork_worker():
+            raise PduLibraryException(UNAVAILABLE_IN_PREFORK_WORKER, feature)
+
+    def register_driver(self, manufacturer, driver):
+        """
+        Registers a library manager for a manufacturer
+        @param manufacturer: The manufacturer name
+        @param driver: 'module:Class' path, a library manager class or a library manager instance
+        """
+        self._driver_registry.register(manufacturer, driver)
+
+    def get_manufacturers(self):
+        """
+        Gets the supported manufacturers
+        @return: List of manufacturer names
+        """
+        return self._driver_registry.get_manufacturers()
 
     def get_version(self):
         """
@@ -39,13 +89,16 @@ class PduLibraryManager(BaseObject, Singleton):
         self._Logger.info('Getting version information from %s-%s' % ('PduLibrary', __version__))
         return 'PduLibrary:' + __version__
 
-    def get_pdu_info(self, manufacturer, ip, username, password):
+    def get_pdu_info(self, manufacturer, ip, username, password, max_age=None):
         """
         Gets PDU Information
+        PDUs registered for polling are answered from the state table of FleetPoller, other results are cached,
+        see PduInfoCache, and concurrent reads of the same PDU share a single device call
         @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
         @param ip: IP of PDU
         @param username: Username of PDU
         @param password: Password of PDU
+        @param max_age: Maximum age in secs of a cached result, 0 to read the device, None for the cache TTLs
         @return: The PDU information
         """
         self._Logger.info('Getting PDU Metadata information from %s' % ip)
@@ -80,16 +133,30 @@ class PduLibraryManager(BaseObject, Singleton):
         }]
         }
         '''
-        return self.Factory(manufacturer.lower()).get_pdu_info(ip, username, password, output)
+        with self._track_operation(manufacturer, 'get_pdu_info'):
+            polled_data = self._fleet_poller.get_polled_data(manufacturer.lower(), ip, username, password,
+                                                             max_age=max_age)
+            if polled_data is not None:
+                return polled_data
 
-    def get_port_info(self, manufacturer, ip, username, password, port):
+            driver = self.Factory(manufacturer.lower())
+            key = ('get_pdu_info', manufacturer.lower(), ip, username, password)
+            return self._pdu_info_cache.get(key,
+                                            lambda: self._single_flight.do(key, lambda: self._read_pdu_info(
+                                                driver, key, ip, username, password, output)),
+                                            max_age)
+
+    def get_port_info(self, manufacturer, ip, username, password, port, max_age=None):
         """
         Gets Port/Outlet Information
+        Ports registered for polling are answered from the state table of FleetPoller, other results are cached,
+        see PduInfoCache, and concurrent reads of the same port share a single device call
         @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
         @param ip: IP of PDU
         @param username: Username of PDU
         @param password: Password of PDU
         @param port: Port/Outlet Number
+        @param max_age: Maximum age in secs of a cached result, 0 to read the device, None for the cache TTLs
         @return: The Port/Outlet information
         """
         self._Logger.info('Getting Port Metadata information from %s for port %s' % (ip, port))
@@ -130,7 +197,224 @@ class PduLibraryManager(BaseObject, Singleton):
             }
         }
         '''
-        return self.Factory(manufacturer.lower()).get_port_info(ip, username, password, port, output)
+        with self._track_operation(manufacturer, 'get_port_info'):
+            polled_data = self._fleet_poller.get_polled_data(manufacturer.lower(), ip, username, password, port,
+                                                             max_age)
+            if polled_data is not None:
+                return polled_data
+
+            driver = self.Factory(manufacturer.lower())
+            key = ('get_port_info', manufacturer.lower(), ip, username, password, port)
+            return self._pdu_info_cache.get(key,
+                                            lambda: self._single_flight.do(key, lambda: self._read_port_info(
+                                                driver, key, ip, username, password, port, output)),
+                                            max_age)
+
+    @contextlib.contextmanager
+    def _track_operation(self, manufacturer, operation):
+        """
+        Records the latency and outcome of an operation in the pdu_library_operation metrics, and the time
+        spent in each of its phases, see get_last_timing
+        Unknown manufacturers share the 'unknown' vendor label to keep the number of series bounded
+        """
+        vendor = manufacturer.lower()
+        if vendor not in self._driver_registry.get_manufacturers():
+            vendor = 'unknown'
+        with self._metrics.track_operation('pdu_library_operation', vendor, operation), \
+                PhaseTimer.operation(vendor, operation):
+            yield
+
+    def get_last_timing(self):
+        """
+        Gets the phase timing breakdown (connect, login, rpc, command...) of the last operation of the caller
+        Cached and polled results show no device phase, callers sharing a call in flight show a coalesced phase
+        @return: Dictionary with vendor, operation, total and phases, in secs, None if no operation ran yet
+        """
+        return PhaseTimer.get_last_timing()
+
+    def _read_pdu_info(self, driver, key, ip, username, password, output):
+        """
+        Reads a PDU from the device and publishes the power states of its outlets, see EventBroker
+        Drivers providing get_pdu_nameplate and get_pdu_state only read the state of the outlets, the nameplate
+        being cached for the static TTL of the cache
+        """
+        if hasattr(driver, 'get_pdu_nameplate') and hasattr(driver, 'get_pdu_state'):
+            nameplate = self._pdu_info_cache.get_static(('get_pdu_nameplate',) + key[1:], lambda: (
+                driver.get_pdu_nameplate(ip, username, password, copy.deepcopy(output))))
+            output = driver.get_pdu_state(ip, username, password, nameplate)
+        else:
+            output = driver.get_pdu_info(ip, username, password, copy.deepcopy(output))
+        self._event_broker.publish_power_states(ip, {outlet.get('portNumber'): outlet.get('portStatus')
+                                                     for outlet in output.get('outlets') or []})
+        return output
+
+    def _read_port_info(self, driver, key, ip, username, password, port, output):
+        """
+        Reads a port from the device, records its sensor readings in the sensor history and publishes its power
+        state and sensor readings, see EventBroker
+        Drivers providing get_port_nameplate and get_port_state only read the state and sensors, the nameplate
+        being cached for the static TTL of the cache
+        """
+        if hasattr(driver, 'get_port_nameplate') and hasattr(driver, 'get_port_state'):
+            nameplate = self._pdu_info_cache.get_static(('get_port_nameplate',) + key[1:], lambda: (
+                driver.get_port_nameplate(ip, username, password, port, copy.deepcopy(output))))
+            output = driver.get_port_state(ip, username, password, port, nameplate)
+        else:
+            output = driver.get_port_info(ip, username, password, port, copy.deepcopy(output))
+        sensor_data = output.get('sensorData') or dict()
+        self._sensor_history.record(ip, port, sensor_data)
+        self._event_broker.publish_power_states(ip, {port: (output.get('stateData') or dict()).get('powerState')})
+        self._event_broker.publish_sensor_readings(ip, port, sensor_data)
+        return output
+
+    def get_sensor_history(self, ip, port, start=None, end=None, bucket_in_secs=None):
+        """
+        Gets the sensor readings recorded by get_port_info for an outlet
+        @param ip: IP of PDU
+        @param port: Port/Outlet Number
+        @param start: Epoch secs of the first sample, None for the oldest
+        @param end: Epoch secs of the last sample, None for the newest
+        @param bucket_in_secs: Downsamples to min/max/mean per bucket of this many secs, None for raw samples
+        @return: The timestamps and values of every sensor, see SensorHistory.query
+        """
+        self._check_single_process('The sensor history')
+        return self._sensor_history.query(ip, port, start, end, bucket_in_secs)
+
+    def subscribe_events(self, ips=None, ports=None, event_types=None, thresholds=None):
+        """
+        Subscribes to outlet power state changes, power operation results and sensor threshold crossings
+        @param ips: IPs of the PDUs to get events of, None for every PDU
+        @param ports: Port/Outlet Numbers to get events of, None for every port
+        @param event_types: Event types to get, see EventBroker.event_types, None for every type
+        @param thresholds: List of SensorThreshold raising sensor_threshold events
+        @return: The EventSubscription, to pass to unsubscribe_events once done
+        """
+        self._check_single_process('The event stream')
+        return self._event_broker.subscribe(ips, ports, event_types, thresholds)
+
+    def unsubscribe_events(self, subscription):
+        """
+        Ends a subscription of subscribe_events
+        @param subscription: The EventSubscription
+        """
+        self._event_broker.unsubscribe(subscription)
+
+    def publish_power_operation(self, operation, ip, port_outputs, error=None):
+        """
+        Publishes the result of a power operation run outside of this class, e.g. by AsyncPduLibraryManager
+        @param operation: Name of the operation, e.g. power_on
+        @param ip: IP of PDU
+        @param port_outputs: Dictionary of Port/Outlet Number to the output of the operation for the port
+        @param error: Exception raised by the operation, if any
+        """
+        self._event_broker.publish_power_operation(operation, ip, port_outputs, error)
+
+    def get_coalescing_stats(self):
+        """
+        Gets how many get_pdu_info/get_port_info calls reached a device and how many shared a call in flight
+        @return: Dictionary of operation name to its executed and coalesced counts
+        """
+        return self._single_flight.get_stats()
+
+    def get_cache_stats(self):
+        """
+        Gets the hit, miss and refresh counts of the PDU and port info cache
+        @return: Dictionary of counts
+        """
+        return self._pdu_info_cache.get_stats()
+
+    def invalidate_cache(self, manufacturer, ip, ports=None):
+        """
+        Marks the cached state of a PDU as outdated, power operations call it automatically
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param ports: Port/Outlet Numbers whose state changed, None for every port
+        """
+        self._pdu_info_cache.invalidate(manufacturer.lower(), ip, ports)
+        self._fleet_poller.mark_changed(ip, ports)
+
+    def get_freshness(self, manufacturer, ip, username, password, port=None):
+        """
+        Gets for how long the information returned by get_pdu_info / get_port_info is served again as is, from
+        the state table of FleetPoller until the next poll, or from the cache until its dynamic TTL expires
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number, None for the PDU information
+        @return: The number of secs, 0 when the next call reads the device
+        """
+        if self._fleet_poller.get_polled_data(manufacturer.lower(), ip, username, password, port) is not None:
+            return self._fleet_poller.get_polled_freshness(ip, port) or 0
+        if port is None:
+            key = ('get_pdu_info', manufacturer.lower(), ip, username, password)
+        else:
+            key = ('get_port_info', manufacturer.lower(), ip, username, password, port)
+        return self._pdu_info_cache.get_freshness(key)
+
+    def get_registration(self, ip):
+        """
+        Gets the manufacturer and credentials of a PDU registered for polling
+        @param ip: IP of PDU
+        @return: Tuple of (manufacturer, username, password), None if the PDU is not registered
+        """
+        return self._fleet_poller.get_registration(ip)
+
+    def register_pdu(self, manufacturer, ip, username, password, ports=None):
+        """
+        Registers a PDU for background polling, its information is then served from memory
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param ports: Port/Outlet Numbers to poll besides the PDU information
+        """
+        self._check_single_process('Polling')
+        self.Factory(manufacturer.lower())
+        self._fleet_poller.register_pdu(manufacturer, ip, username, password, ports)
+
+    def unregister_pdu(self, ip):
+        """
+        Stops polling a PDU
+        @param ip: IP of PDU
+        """
+        self._check_single_process('Polling')
+        self._fleet_poller.unregister_pdu(ip)
+
+    def get_fleet_state(self):
+        """
+        Gets the state table of the PDUs registered for polling
+        @return: List of PDUs with the last PDU and port information read, and when it was read
+        """
+        '''
+        [{
+            "manufacturer": "<manufacturer>",
+            "ip": "<ip>",
+            "pdu": {
+                "port": null,
+                "ErrorCode": "<0 if the last read succeeded>",
+                "Message": "<error message>",
+                "Data": "<result of get_pdu_info>",
+                "updatedAt": "<epoch secs of the last successful read>",
+                "changedAt": "<epoch secs of the last outlet state change>",
+                "pollIntervalInSecs": "<current poll interval>"
+            },
+            "ports": ["<same as pdu, Data being the result of get_port_info>"]
+        }]
+        '''
+        self._check_single_process('Polling')
+        return self._fleet_poller.get_state()
+
+    def get_default_power_output(self, power_state):
+        """
+        Gets the default output of a power operation
+        @param power_state: The power state expected after the operation
+        @return: The default output
+        """
+        output = dict()
+        output['powerState'] = power_state
+        output['lastPowerStateChangeTime'] = str(datetime.datetime.now())
+        return output
 
     def power_on(self, manufacturer, ip, username, password, port):
         """
@@ -143,10 +427,17 @@ class PduLibraryManager(BaseObject, Singleton):
         @return: The Status of Power ON request
         """
         self._Logger.info('Powering ON in PDU %s for Port %s' % (ip, port))
-        output = dict()
-        output['powerState'] = 'ON'
-        output['lastPowerStateChangeTime'] = str(datetime.datetime.now())
-        return self.Factory(manufacturer.lower()).power_on(ip, username, password, port, output)
+        output = self.get_default_power_output('ON')
+        try:
+            with self._track_operation(manufacturer, 'power_on'):
+                output = self.Factory(manufacturer.lower()).power_on(ip, username, password, port, output)
+        except Exception as err:
+            self._event_broker.publish_power_operation('power_on', ip, {port: output}, err)
+            raise
+        finally:
+            self.invalidate_cache(manufacturer, ip, [port])
+        self._event_broker.publish_power_operation('power_on', ip, {port: output})
+        return output
 
     def power_off(self, manufacturer, ip, username, password, port):
         """
@@ -159,10 +450,17 @@ class PduLibraryManager(BaseObject, Singleton):
         @return: The Status of Power Off request
         """
         self._Logger.info('Powering Off in PDU %s for Port %s' % (ip, port))
-        output = dict()
-        output['powerState'] = 'OFF'
-        output['lastPowerStateChangeTime'] = str(datetime.datetime.now())
-        return self.Factory(manufacturer.lower()).power_off(ip, username, password, port, output)
+        output = self.get_default_power_output('OFF')
+        try:
+            with self._track_operation(manufacturer, 'power_off'):
+                output = self.Factory(manufacturer.lower()).power_off(ip, username, password, port, output)
+        except Exception as err:
+            self._event_broker.publish_power_operation('power_off', ip, {port: output}, err)
+            raise
+        finally:
+            self.invalidate_cache(manufacturer, ip, [port])
+        self._event_broker.publish_power_operation('power_off', ip, {port: output})
+        return output
 
     def reboot(self, manufacturer, ip, username, password, port):
         """
@@ -175,7 +473,247 @@ class PduLibraryManager(BaseObject, Singleton):
         @return: The Status of Reboot request
         """
         self._Logger.info('Rebooting PDU %s for Port %s' % (ip, port))
+        output = self.get_default_power_output('ON')
+        try:
+            with self._track_operation(manufacturer, 'reboot'):
+                output = self.Factory(manufacturer.lower()).reboot(ip, username, password, port, output)
+        except Exception as err:
+            self._event_broker.publish_power_operation('reboot', ip, {port: output}, err)
+            raise
+        finally:
+            self.invalidate_cache(manufacturer, ip, [port])
+        self._event_broker.publish_power_operation('reboot', ip, {port: output})
+        return output
+
+    def power_on_ports(self, manufacturer, ip, username, password, ports):
+        """
+        Power ON several outlets of a PDU in one device session
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param ports: List of Port/Outlet Numbers
+        @return: The Status of Power ON request for every port
+        """
+        self._Logger.info('Powering ON in PDU %s for Ports %s' % (ip, ports))
+        return self._run_ports_operation(manufacturer, ip, username, password, ports, 'ON',
+                                         'power_on_ports', 'power_on')
+
+    def power_off_ports(self, manufacturer, ip, username, password, ports):
+        """
+        Power Off several outlets of a PDU in one device session
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param ports: List of Port/Outlet Numbers
+        @return: The Status of Power Off request for every port
+        """
+        self._Logger.info('Powering Off in PDU %s for Ports %s' % (ip, ports))
+        return self._run_ports_operation(manufacturer, ip, username, password, ports, 'OFF',
+                                         'power_off_ports', 'power_off')
+
+    def reboot_ports(self, manufacturer, ip, username, password, ports):
+        """
+        Reboots several outlets of a PDU in one device session
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param ports: List of Port/Outlet Numbers
+        @return: The Status of Reboot request for every port
+        """
+        self._Logger.info('Rebooting PDU %s for Ports %s' % (ip, ports))
+        return self._run_ports_operation(manufacturer, ip, username, password, ports, 'ON',
+                                         'reboot_ports', 'reboot')
+
+    def _run_ports_operation(self, manufacturer, ip, username, password, ports, power_state,
+                             ports_operation_name, port_operation_name):
+        """
+        Runs a power operation on several ports, natively when the driver supports it, else port by port
+        """
+        if not ports:
+            raise PduLibraryException(INVALID_PORT_LIST, ports)
+
+        ports = sorted(set(int(port) for port in ports))
         output = dict()
-        output['powerState'] = 'ON'
-        output['lastPowerStateChangeTime'] = str(datetime.datetime.now())
-        return self.Factory(manufacturer.lower()).reboot(ip, username, password, port, output)
+        output['ports'] = [{
+            'portNumber': port,
+            'ErrorCode': 0,
+            'Message': None,
+            'powerState': power_state,
+            'lastPowerStateChangeTime': str(datetime.datetime.now())
+        } for port in ports]
+        '''
+        {
+            "ports": [{
+                "portNumber": "<port number>",
+                "ErrorCode": "<0 on success>",
+                "Message": "<error message>",
+                "powerState": "<powerstate>",
+                "lastPowerStateChangeTime": "<date-time>"
+            }]
+        }
+        '''
+        try:
+            with self._track_operation(manufacturer, ports_operation_name):
+                output = self._run_driver_ports_operation(manufacturer, ip, username, password, ports, output,
+                                                          ports_operation_name, port_operation_name)
+        except Exception as err:
+            self._event_broker.publish_power_operation(ports_operation_name, ip, {
+                port_output['portNumber']: port_output for port_output in output['ports']}, err)
+            raise
+        finally:
+            self.invalidate_cache(manufacturer, ip, ports)
+        self._event_broker.publish_power_operation(ports_operation_name, ip, {
+            port_output['portNumber']: port_output for port_output in output.get('ports') or []})
+        return output
+
+    def _run_driver_ports_operation(self, manufacturer, ip, username, password, ports, output,
+                                    ports_operation_name, port_operation_name):
+        driver = self.Factory(manufacturer.lower())
+        if hasattr(driver, ports_operation_name):
+            try:
+                return getattr(driver, ports_operation_name)(ip, username, password, ports, output)
+            except PduLibraryException as err:
+                for port_output in output['ports']:
+                    port_output['ErrorCode'] = err.get_error_code()
+                    port_output['Message'] = err.get_error_message()
+                return output
+
+        port_operation = getattr(driver, port_operation_name)
+        for port_output in output['ports']:
+            port_default_output = {
+                'powerState': port_output['powerState'],
+                'lastPowerStateChangeTime': port_output['lastPowerStateChangeTime']
+            }
+            try:
+                port_output.update(port_operation(ip, username, password, port_output['portNumber'],
+                                                  port_default_output))
+            except PduLibraryException as err:
+                port_output['ErrorCode'] = err.get_error_code()
+                port_output['Message'] = err.get_error_message()
+        return output
+
+    def iter_fleet_operation(self, operation, targets, max_concurrency=None, max_concurrency_per_pdu=None):
+        """
+        Runs an operation against many PDUs concurrently, yielding each result as soon as it completes
+        @param operation: get_pdu_info/get_port_info/power_on/power_off/reboot or their *_ports variants
+        @param targets: Iterable of dictionaries with manufacturer, ip, username, password and port/ports
+        @param max_concurrency: Maximum number of targets in flight at the same time
+        @param max_concurrency_per_pdu: Maximum number of targets in flight against the same PDU
+        @return: Generator of results with target, ErrorCode, Message, Data and latency
+        """
+        self._Logger.info('Running fleet operation %s' % operation)
+        return self._fleet_executor.execute(operation, targets, max_concurrency, max_concurrency_per_pdu)
+
+    def run_fleet_operation(self, operation, targets, max_concurrency=None, max_concurrency_per_pdu=None):
+        """
+        Runs an operation against many PDUs concurrently
+        @param operation: get_pdu_info/get_port_info/power_on/power_off/reboot or their *_ports variants
+        @param targets: Iterable of dictionaries with manufacturer, ip, username, password and port/ports
+        @param max_concurrency: Maximum number of targets in flight at the same time
+        @param max_concurrency_per_pdu: Maximum number of targets in flight against the same PDU
+        @return: The results in completion order and their summary
+        """
+        results = list(self.iter_fleet_operation(operation, targets, max_concurrency, max_concurrency_per_pdu))
+        '''
+        {
+            "results": [{
+                "target": {"manufacturer": "<manufacturer>", "ip": "<ip>", "port": "<port>"},
+                "ErrorCode": "<0 on success>",
+                "Message": "<error message>",
+                "Data": "<result of the operation>",
+                "latency": "<secs>"
+            }],
+            "summary": {
+                "total": "<count>",
+                "succeeded": "<count>",
+                "failed": "<count>",
+                "latency": {"min", "max", "mean", "p50", "p95", "p99"},
+                "failuresPerErrorCode": {"<error code>": "<count>"}
+            }
+        }
+        '''
+        return {
+            'results': results,
+            'summary': self._fleet_executor.summarize(results)
+        }
+
+    def submit_job(self, operation, manufacturer, ip, username, password, target, delay_in_secs=0):
+        """
+        Runs a power operation in the background
+        Reboots of drivers declaring reboot_off_time_in_secs are split into a power off and a power on
+        scheduled on a timer, so no thread sleeps while the outlet is off
+        @param operation: power_on/power_off/reboot or their *_ports variants
+        @param manufacturer: The manufacturer - Raritan/APC/DLI/Aten
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param target: Port/Outlet Number, or list of them for the *_ports operations
+        @param delay_in_secs: Time to wait before starting, to stagger many jobs
+        @return: The job status, see get_job
+        """
+        if operation not in self.job_operations:
+            raise PduLibraryException(UNSUPPORTED_JOB_OPERATION, operation)
+        self._check_single_process('The job scheduler')
+
+        driver = self.Factory(manufacturer.lower())
+        reboot_off_time_in_secs = getattr(driver, 'reboot_off_time_in_secs', None)
+        arguments = (manufacturer, ip, username, password, target)
+        if operation == 'reboot' and reboot_off_time_in_secs:
+            steps = [
+                (delay_in_secs, lambda: self.power_off(*arguments)),
+                (reboot_off_time_in_secs, lambda: self.power_on(*arguments))
+            ]
+        elif operation == 'reboot_ports' and reboot_off_time_in_secs:
+            power_off_output = dict()
+            steps = [
+                (delay_in_secs, lambda: power_off_output.update(self.power_off_ports(*arguments))),
+                (reboot_off_time_in_secs, lambda: self._merge_ports_errors(power_off_output,
+                                                                           self.power_on_ports(*arguments)))
+            ]
+        else:
+            steps = [(delay_in_secs, lambda: getattr(self, operation)(*arguments))]
+
+        job = self._job_scheduler.submit(operation, {
+            'manufacturer': manufacturer,
+            'ip': ip,
+            self.job_operations[operation]: target
+        }, steps)
+        return job.to_dict()
+
+    def get_job(self, job_id):
+        """
+        Gets the status of a job
+        @param job_id: Id returned by submit_job
+        @return: The job status
+        """
+        '''
+        {
+            "jobId": "<job id>",
+            "operation": "<operation>",
+            "target": {"manufacturer": "<manufacturer>", "ip": "<ip>", "port": "<port>"},
+            "state": "PENDING/RUNNING/SUCCEEDED/FAILED",
+            "createdAt": "<epoch secs>",
+            "startedAt": "<epoch secs>",
+            "finishedAt": "<epoch secs>",
+            "ErrorCode": "<0 on success>",
+            "Message": "<error message>",
+            "Data": "<result of the operation>"
+        }
+        '''
+        self._check_single_process('The job scheduler')
+        return self._job_scheduler.get_job(job_id).to_dict()
+
+    def _merge_ports_errors(self, first_output, second_output):
+        """
+        Keeps the errors of the first step of a ports operation in the output of the second step
+        """
+        first_errors = {port_output['portNumber']: port_output for port_output in first_output.get('ports', [])
+                        if port_output['ErrorCode']}
+        for port_output in second_output['ports']:
+            if port_output['portNumber'] in first_errors and not port_output['ErrorCode']:
+                port_output['ErrorCode'] = first_errors[port_output['portNumber']]['ErrorCode']
+                port_output['Message'] = first_errors[port_output['portNumber']]['Message']
+        return second_output
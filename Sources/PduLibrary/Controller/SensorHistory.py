@@ -0,0 +1,185 @@
+import threading
+import time
+
+import numpy
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Errors.ErrorCodes import SENSOR_HISTORY_NOT_FOUND, INVALID_SENSOR_HISTORY_QUERY
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class SensorRingBuffer(object):
+    """
+    Fixed size history of the sensor readings of one outlet, the oldest samples being overwritten
+    """
+
+    def __init__(self, capacity, field_count):
+        self.lock = threading.Lock()
+        self.timestamps = numpy.zeros(capacity, dtype=numpy.float64)
+        self.values = numpy.full((capacity, field_count), numpy.nan, dtype=numpy.float32)
+        self.next_index = 0
+        self.count = 0
+
+    def append(self, timestamp, values):
+        with self.lock:
+            capacity = len(self.timestamps)
+            if self.count:
+                # Keep the timestamps sorted when concurrent reads complete out of order
+                timestamp = max(timestamp, self.timestamps[(self.next_index - 1) % capacity])
+            self.timestamps[self.next_index] = timestamp
+            self.values[self.next_index] = values
+            self.next_index = (self.next_index + 1) % capacity
+            self.count = min(self.count + 1, capacity)
+
+    def snapshot(self):
+        """
+        Copies the samples, oldest first
+        @return: (timestamps, values) arrays
+        """
+        with self.lock:
+            if self.count < len(self.timestamps):
+                return self.timestamps[:self.count].copy(), self.values[:self.count].copy()
+            return (numpy.concatenate((self.timestamps[self.next_index:], self.timestamps[:self.next_index])),
+                    numpy.concatenate((self.values[self.next_index:], self.values[:self.next_index])))
+
+
+class SensorHistory(BaseObject):
+    """
+    Time series of the outlet sensor readings returned by get_port_info
+    Every outlet has a preallocated ring buffer of capacity samples (capacity * 24 bytes), so memory stays fixed
+    however long the samples keep coming. Range queries and downsampling are vectorized with NumPy.
+    """
+    fields = ('voltage', 'current', 'activeEnergy', 'lineFrequency')
+    default_capacity = 360
+    default_max_outlets = 50000
+
+    def __init__(self, capacity=None, max_outlets=None):
+        """
+        Initializes the class
+        @param capacity: Number of samples kept per outlet, 360 is 30 minutes sampled every 5 secs
+        @param max_outlets: Maximum number of outlets tracked, samples of further outlets are dropped
+        """
+        BaseObject.__init__(self)
+        self._capacity = capacity or self.default_capacity
+        self._max_outlets = max_outlets or self.default_max_outlets
+        self._lock = threading.Lock()
+        self._buffers = dict()
+
+    def record(self, ip, port, sensor_data, timestamp=None):
+        """
+        Records the sensor readings of an outlet
+        @param ip: IP of PDU
+        @param port: Port/Outlet Number
+        @param sensor_data: The sensorData of get_port_info, missing or invalid readings are stored as NaN
+        @param timestamp: Epoch secs of the readings, defaults to now
+        """
+        values = [self._to_float(sensor_data.get(field)) for field in self.fields]
+        if all(value != value for value in values):
+            return
+
+        key = (ip, int(port))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    if len(self._buffers) >= self._max_outlets:
+                        self._Logger.warning('Sensor history is full, dropping samples of ' + str(key))
+                        return
+                    buffer = self._buffers[key] = SensorRingBuffer(self._capacity, len(self.fields))
+        buffer.append(time.time() if timestamp is None else timestamp, values)
+
+    def query(self, ip, port, start=None, end=None, bucket_in_secs=None):
+        """
+        Gets the samples of an outlet in a time range, optionally downsampled
+        @param ip: IP of PDU
+        @param port: Port/Outlet Number
+        @param start: Epoch secs of the first sample, None for the oldest
+        @param end: Epoch secs of the last sample, None for the newest
+        @param bucket_in_secs: Downsamples to min/max/mean per bucket of this many secs, None for raw samples
+        @return: Dictionary with the timestamps and, per field, the values or their min/max/mean per bucket
+        """
+        if bucket_in_secs is not None and bucket_in_secs <= 0:
+            raise PduLibraryException(INVALID_SENSOR_HISTORY_QUERY, 'bucket_in_secs must be positive')
+        if start is not None and end is not None and start > end:
+            raise PduLibraryException(INVALID_SENSOR_HISTORY_QUERY, 'start is after end')
+
+        buffer = self._buffers.get((ip, int(port)))
+        if buffer is None:
+            raise PduLibraryException(SENSOR_HISTORY_NOT_FOUND, str(ip) + ' port ' + str(port))
+
+        timestamps, values = buffer.snapshot()
+        first = 0 if start is None else numpy.searchsorted(timestamps, start, side='left')
+        last = len(timestamps) if end is None else numpy.searchsorted(timestamps, end, side='right')
+        timestamps = timestamps[first:last]
+        values = values[first:last]
+
+        output = {
+            'ip': ip,
+            'port': int(port),
+            'bucketInSecs': bucket_in_secs
+        }
+        '''
+        {
+            "ip": "<ip>",
+            "port": "<port number>",
+            "bucketInSecs": "<bucket size, null for raw samples>",
+            "timestamps": ["<epoch secs of the sample, or of the bucket start>"],
+            "voltage": ["<value>"] or {"min": ["<value>"], "max": ["<value>"], "mean": ["<value>"]},
+            "current": ...,
+            "activeEnergy": ...,
+            "lineFrequency": ...
+        }
+        '''
+        if bucket_in_secs is None:
+            output['timestamps'] = timestamps.tolist()
+            for index, field in enumerate(self.fields):
+                output[field] = self._to_list(values[:, index])
+            return output
+
+        if not len(timestamps):
+            output['timestamps'] = []
+            for field in self.fields:
+                output[field] = {'min': [], 'max': [], 'mean': []}
+            return output
+
+        origin = timestamps[0] if start is None else numpy.float64(start)
+        bucket_ids = numpy.floor((timestamps - origin) / bucket_in_secs).astype(numpy.int64)
+        bucket_starts = numpy.flatnonzero(numpy.diff(bucket_ids, prepend=bucket_ids[0] - 1))
+
+        missing = numpy.isnan(values)
+        counts = numpy.add.reduceat((~missing).astype(numpy.int64), bucket_starts, axis=0)
+        sums = numpy.add.reduceat(numpy.where(missing, 0, values).astype(numpy.float64), bucket_starts, axis=0)
+        minimums = numpy.fmin.reduceat(values, bucket_starts, axis=0)
+        maximums = numpy.fmax.reduceat(values, bucket_starts, axis=0)
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            means = numpy.where(counts > 0, sums / counts, numpy.nan)
+
+        output['timestamps'] = (origin + bucket_ids[bucket_starts] * bucket_in_secs).tolist()
+        for index, field in enumerate(self.fields):
+            output[field] = {
+                'min': self._to_list(minimums[:, index]),
+                'max': self._to_list(maximums[:, index]),
+                'mean': self._to_list(means[:, index])
+            }
+        return output
+
+    def get_outlets(self):
+        """
+        Gets the outlets having a history
+        @return: List of (ip, port)
+        """
+        with self._lock:
+            return sorted(self._buffers)
+
+    def _to_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return numpy.nan
+
+    def _to_list(self, values):
+        """
+        Converts an array to a JSON friendly list, NaN becoming None
+        """
+        return [None if value != value else value for value in values.astype(numpy.float64).round(6).tolist()]
@@ -0,0 +1,299 @@
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Core.ServingMode import ServingMode
+from PduLibrary.Errors.ErrorCodes import ADMIN_ACCESS_DENIED, PROFILING_IN_PROGRESS, INVALID_PROFILING_REQUEST, \
+    MEMORY_SNAPSHOT_NOT_FOUND
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class _ProfilingWindow(object):
+    """
+    The cProfile stats of the requests handled while a profiling window is open
+    """
+
+    def __init__(self, profile=None):
+        self.lock = threading.Lock()
+        self.stats = None
+        self.request_count = 0
+        self.skipped_request_count = 0
+        self.profiled_threads = set()
+        # Profiler enabled for the whole window, instead of one per request
+        self.profile = profile
+
+    def add(self, profile, request_count=1):
+        with self.lock:
+            self.request_count += request_count
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+
+class Profiler(BaseObject, Singleton):
+    """
+    On demand CPU and memory profiling of a live REST server, behind the admin endpoints
+    CPU: requests handled during a time-boxed window are run under cProfile and their stats merged. Under gevent,
+    whose greenlets share the OS thread cProfile hooks into, a single profiler covers the process for the window.
+    Memory: tracemalloc snapshots are taken and diffed against each other.
+    The admin endpoints only exist when the PDU_LIBRARY_ADMIN_TOKEN environment variable is set, and every call
+    must carry the token in the X-Admin-Token header.
+    """
+    admin_token_env_var = 'PDU_LIBRARY_ADMIN_TOKEN'
+    admin_token_header = 'X-Admin-Token'
+    max_profiling_duration_in_secs = 300
+    default_stats_limit = 50
+    max_snapshots = 5
+    sort_keys = tuple(sorted(pstats.Stats.sort_arg_dict_default))
+
+    def __init__(self, admin_token=None):
+        """
+        Initializes the class
+        @param admin_token: Token guarding the admin endpoints, defaults to $PDU_LIBRARY_ADMIN_TOKEN
+        """
+        BaseObject.__init__(self)
+        self._admin_token = admin_token or os.environ.get(self.admin_token_env_var) or None
+        self._lock = threading.Lock()
+        self._window = None
+        self._snapshots = OrderedDict()
+        self._snapshot_ids = itertools.count(1)
+
+    def is_enabled(self):
+        """
+        Whether the admin endpoints are enabled, i.e. an admin token is configured
+        """
+        return self._admin_token is not None
+
+    def check_admin_token(self, token):
+        """
+        Raises ADMIN_ACCESS_DENIED unless the token is the configured admin token
+        """
+        if not self.is_enabled() or not token \
+                or not hmac.compare_digest(token.encode('utf-8'), self._admin_token.encode('utf-8')):
+            raise PduLibraryException(ADMIN_ACCESS_DENIED)
+
+    def wrap_wsgi_app(self, wsgi_app):
+        """
+        Wraps a WSGI app so that its requests are profiled while a profiling window is open
+        @param wsgi_app: The WSGI app
+        @return: The wrapped WSGI app
+        """
+
+        def profiled_wsgi_app(environ, start_response):
+            window = self._window
+            if window is None:
+                return wsgi_app(environ, start_response)
+            if window.profile is not None:
+                with window.lock:
+                    window.request_count += 1
+                return wsgi_app(environ, start_response)
+
+            # cProfile only sees the thread it is enabled in, and a thread can run one profiler at a time
+            thread_id = threading.get_ident()
+            with window.lock:
+                is_profiled = thread_id not in window.profiled_threads
+                if is_profiled:
+                    window.profiled_threads.add(thread_id)
+                else:
+                    window.skipped_request_count += 1
+            if not is_profiled:
+                return wsgi_app(environ, start_response)
+
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                with window.lock:
+                    window.profiled_threads.discard(thread_id)
+                    window.skipped_request_count += 1
+                return wsgi_app(environ, start_response)
+
+            try:
+                return wsgi_app(environ, start_response)
+            finally:
+                profile.disable()
+                with window.lock:
+                    window.profiled_threads.discard(thread_id)
+                window.add(profile)
+
+        return profiled_wsgi_app
+
+    def profile_requests(self, duration_in_secs, sort_by='cumulative', limit=None):
+        """
+        Profiles the requests handled during the next duration_in_secs
+        @param duration_in_secs: Length of the profiling window
+        @param sort_by: pstats sort key, e.g. cumulative, tottime, ncalls
+        @param limit: Maximum number of functions returned
+        @return: Dictionary with the request counts and the sorted function stats
+        """
+        if not 0 < duration_in_secs <= self.max_profiling_duration_in_secs:
+            raise PduLibraryException(INVALID_PROFILING_REQUEST, 'duration must be within 0 and '
+                                      + str(self.max_profiling_duration_in_secs) + ' secs')
+        if sort_by not in self.sort_keys:
+            raise PduLibraryException(INVALID_PROFILING_REQUEST, 'sort must be one of ' + ', '.join(self.sort_keys))
+        limit = limit or self.default_stats_limit
+
+        window = _ProfilingWindow(cProfile.Profile() if ServingMode.is_patched_for_gevent() else None)
+        with self._lock:
+            if self._window is not None:
+                raise PduLibraryException(PROFILING_IN_PROGRESS)
+            self._window = window
+        self._Logger.info('Profiling requests for %s secs' % duration_in_secs)
+        try:
+            if window.profile is not None:
+                window.profile.enable()
+            time.sleep(duration_in_secs)
+        except ValueError:
+            # Another profiler is already active
+            raise PduLibraryException(PROFILING_IN_PROGRESS)
+        finally:
+            if window.profile is not None:
+                window.profile.disable()
+            with self._lock:
+                self._window = None
+        if window.profile is not None:
+            window.add(window.profile, 0)
+
+        with window.lock:
+            output = {
+                'durationInSecs': duration_in_secs,
+                'requestCount': window.request_count,
+                'skippedRequestCount': window.skipped_request_count,
+                'sortBy': sort_by,
+                'totalTime': 0.0,
+                'functions': [],
+                'text': ''
+            }
+            '''
+            {
+                "durationInSecs": "<length of the profiling window>",
+                "requestCount": "<number of requests profiled>",
+                "skippedRequestCount": "<number of requests which could not be profiled>",
+                "sortBy": "<sort key>",
+                "totalTime": "<secs>",
+                "functions": [{
+                    "function": "<file>:<line>(<function name>)",
+                    "callCount": "<number of calls>",
+                    "primitiveCallCount": "<number of non recursive calls>",
+                    "totalTime": "<secs spent in the function itself>",
+                    "cumulativeTime": "<secs spent in the function and its callees>"
+                }],
+                "text": "<pstats report>"
+            }
+            '''
+            if window.stats is None:
+                return output
+
+            stream = io.StringIO()
+            window.stats.stream = stream
+            window.stats.sort_stats(sort_by).print_stats(limit)
+            output['totalTime'] = window.stats.total_tt
+            output['text'] = stream.getvalue()
+            for function in window.stats.fcn_list[:limit]:
+                primitive_call_count, call_count, total_time, cumulative_time, _ = window.stats.stats[function]
+                output['functions'].append({
+                    'function': pstats.func_std_string(function),
+                    'callCount': call_count,
+                    'primitiveCallCount': primitive_call_count,
+                    'totalTime': total_time,
+                    'cumulativeTime': cumulative_time
+                })
+        return output
+
+    def take_snapshot(self, frames=1, limit=None):
+        """
+        Takes a tracemalloc snapshot, starting tracemalloc if needed
+        Only the allocations made after tracemalloc started are traced
+        @param frames: Number of frames kept per allocation, when tracemalloc is started
+        @param limit: Maximum number of allocation sites returned
+        @return: Dictionary with the snapshot id, the traced memory and the largest allocation sites
+        """
+        if not tracemalloc.is_tracing():
+            self._Logger.info('Starting tracemalloc with %d frames' % frames)
+            tracemalloc.start(frames)
+
+        snapshot = self._take_filtered_snapshot()
+        with self._lock:
+            snapshot_id = next(self._snapshot_ids)
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        output = self.get_memory_status()
+        output['snapshotId'] = snapshot_id
+        output['top'] = [{
+            'location': self._format_traceback(statistic.traceback),
+            'size': statistic.size,
+            'count': statistic.count
+        } for statistic in snapshot.statistics('lineno')[:limit or self.default_stats_limit]]
+        return output
+
+    def compare_to_snapshot(self, snapshot_id=None, limit=None):
+        """
+        Takes a tracemalloc snapshot and diffs it against an earlier one
+        @param snapshot_id: Id of the earlier snapshot, None for the latest
+        @param limit: Maximum number of allocation sites returned
+        @return: Dictionary with the traced memory and the allocation sites which grew the most
+        """
+        with self._lock:
+            if snapshot_id is None and self._snapshots:
+                snapshot_id = next(reversed(self._snapshots))
+            old_snapshot = self._snapshots.get(snapshot_id)
+        if old_snapshot is None or not tracemalloc.is_tracing():
+            raise PduLibraryException(MEMORY_SNAPSHOT_NOT_FOUND, str(snapshot_id))
+
+        output = self.get_memory_status()
+        output['snapshotId'] = snapshot_id
+        output['diff'] = [{
+            'location': self._format_traceback(statistic.traceback),
+            'size': statistic.size,
+            'sizeDiff': statistic.size_diff,
+            'count': statistic.count,
+            'countDiff': statistic.count_diff
+        } for statistic in self._take_filtered_snapshot().compare_to(old_snapshot, 'lineno')[
+            :limit or self.default_stats_limit]]
+        return output
+
+    def stop_tracing(self):
+        """
+        Stops tracemalloc and drops the snapshots
+        """
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+        self._Logger.info('Stopped tracemalloc')
+        return self.get_memory_status()
+
+    def get_memory_status(self):
+        """
+        Gets whether tracemalloc is running, the traced memory and the snapshots available
+        """
+        traced_memory, peak_traced_memory = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshot_ids = list(self._snapshots)
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'tracedMemory': traced_memory,
+            'peakTracedMemory': peak_traced_memory,
+            'snapshotIds': snapshot_ids
+        }
+
+    def _take_filtered_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ))
+
+    def _format_traceback(self, traceback):
+        return ' <- '.join('%s:%d' % (frame.filename, frame.lineno) for frame in traceback)
@@ -0,0 +1,94 @@
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ResponseEncoder(object):
+    """
+    Serializes and compresses the responses of the REST API, see RestServer._make_response
+    JSON is encoded with orjson when installed, the standard json module otherwise. MessagePack is offered when
+    msgpack is installed. Bodies of at least min_compressed_size_in_bytes are compressed with gzip or deflate
+    when the client accepts it, smaller ones are not worth the CPU.
+    """
+    JSON = 'application/json'
+    MSGPACK = 'application/msgpack'
+    # Media types clients send for MessagePack
+    msgpack_media_types = (MSGPACK, 'application/x-msgpack')
+
+    GZIP = 'gzip'
+    DEFLATE = 'deflate'
+    content_encodings = (GZIP, DEFLATE)
+
+    min_compressed_size_in_bytes = 1024
+    # zlib level, 6 is the default of gzip, lower levels trade size for speed
+    compression_level = 6
+
+    @staticmethod
+    def is_msgpack_available():
+        return msgpack is not None
+
+    @staticmethod
+    def to_json(data):
+        """
+        Encodes data as JSON
+        @param data: The data, values JSON does not know are encoded as strings
+        @return: The UTF-8 encoded JSON
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=ResponseEncoder._default,
+                                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            except TypeError:
+                # e.g. integers beyond 64 bits, left to the json module
+                pass
+        return json.dumps(data, default=ResponseEncoder._default).encode('utf-8')
+
+    @staticmethod
+    def to_msgpack(data):
+        """
+        Encodes data as MessagePack
+        @param data: The data, values MessagePack does not know are encoded as strings
+        @return: The encoded data
+        """
+        return msgpack.packb(data, default=ResponseEncoder._default, use_bin_type=True)
+
+    @staticmethod
+    def compress(body, content_encoding):
+        """
+        Compresses a body
+        @param body: The body
+        @param content_encoding: gzip or deflate
+        @return: The compressed body
+        """
+        # wbits 31 writes a gzip header and trailer, 15 a zlib one, which is what HTTP calls deflate
+        compressor = zlib.compressobj(ResponseEncoder.compression_level, zlib.DEFLATED,
+                                      31 if content_encoding == ResponseEncoder.GZIP else 15)
+        return compressor.compress(body) + compressor.flush()
+
+    @staticmethod
+    def get_content_encoding(accept_encodings, body):
+        """
+        Chooses how to compress a body
+        @param accept_encodings: The werkzeug Accept object of the Accept-Encoding header of the request
+        @param body: The body
+        @return: gzip or deflate, None to send the body as is
+        """
+        if len(body) < ResponseEncoder.min_compressed_size_in_bytes:
+            return None
+        return accept_encodings.best_match(ResponseEncoder.content_encodings)
+
+    @staticmethod
+    def _default(value):
+        # NumPy scalars and arrays, then anything else as its string
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        return str(value)
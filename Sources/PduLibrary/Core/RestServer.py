@@ -4,23 +4,41 @@ import webbrowser
 from time import sleep
 
 import requests
-from flask import Flask
+from flask import Flask, make_response, request
 from flask_cors import CORS
 from flask_restful import Api
 from flask_restful_swagger import swagger
-from gevent.pywsgi import WSGIServer
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.PhaseTimer import PhaseTimer, PhaseTiming
 from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from PduLibrary.Core.Profiler import Profiler
+from PduLibrary.Core.ResponseEncoder import ResponseEncoder
+from PduLibrary.Core.WsgiServer import WsgiServer
 from PduLibrary.Errors.ErrorCodes import *
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
+from PduLibrary.RestResource.AdminMemory import AdminMemory
+from PduLibrary.RestResource.AdminProfile import AdminProfile
+from PduLibrary.RestResource.Events import Events
+from PduLibrary.RestResource.FleetOperation import FleetOperation
+from PduLibrary.RestResource.FleetOperationStream import FleetOperationStream
+from PduLibrary.RestResource.GetJob import GetJob
 from PduLibrary.RestResource.GetPduInfo import GetPduInfo
 from PduLibrary.RestResource.GetPortInfo import GetPortInfo
+from PduLibrary.RestResource.GetSensorHistory import GetSensorHistory
 from PduLibrary.RestResource.GetVersion import GetVersion
+from PduLibrary.RestResource.Metrics import Metrics
+from PduLibrary.RestResource.PduState import PduState
+from PduLibrary.RestResource.PolledPdus import PolledPdus
+from PduLibrary.RestResource.PortState import PortState
 from PduLibrary.RestResource.PowerOff import PowerOff
+from PduLibrary.RestResource.PowerOffPorts import PowerOffPorts
 from PduLibrary.RestResource.PowerOn import PowerOn
+from PduLibrary.RestResource.PowerOnPorts import PowerOnPorts
 from PduLibrary.RestResource.Reboot import Reboot
+from PduLibrary.RestResource.RebootPorts import RebootPorts
 
 
 class RestServer(BaseObject, Singleton):
@@ -35,8 +53,11 @@ class RestServer(BaseObject, Singleton):
     rest_server_state_file_name = '.restserverstate'
 
     url_shutdown_rest_server = '/v1/shutdownserver'
+    url_admin_profile = '/v1/admin/profile'
+    url_admin_memory = '/v1/admin/memory'
     url_rest_api_spec = '/v1/spec'
     url_swagger_docs = '/docs'
+    url_metrics = '/metrics'
 
     url_service_logs = '/servicelogs'
 
@@ -60,6 +81,7 @@ class RestServer(BaseObject, Singleton):
 
         self._rest_app = None
         self._rest_api_v1 = None
+        self._server_object = None
 
         shutdowntimeout = 60
         if not shutdowntimeout:
@@ -105,6 +127,11 @@ class RestServer(BaseObject, Singleton):
         """
         self._rest_app = Flask(__name__)
 
+        profiler = Profiler.get_instance()
+        if profiler.is_enabled():
+            self._Logger.info("Admin endpoints enabled, wrapping the app for request profiling")
+            self._rest_app.wsgi_app = profiler.wrap_wsgi_app(self._rest_app.wsgi_app)
+
         if self._rest_server_url_prefix:
             self._rest_app.config['APPLICATION_ROOT'] = self._rest_server_url_prefix
             self._rest_app.wsgi_app = DispatcherMiddleware(
@@ -118,12 +145,26 @@ class RestServer(BaseObject, Singleton):
         self._Logger.info("Providing support for Cross Origin Resource Sharing")
         CORS(self._rest_app)
 
+        self._Logger.info("Reporting the phase timing of device operations")
+        self._rest_app.before_request(PhaseTimer.clear_last_timing)
+
+        self._Logger.info("Negotiating the response encoding, JSON or MessagePack, gzip or deflate")
+        self._rest_api_v1.representation(ResponseEncoder.JSON)(self._output_json)
+        if ResponseEncoder.is_msgpack_available():
+            for media_type in ResponseEncoder.msgpack_media_types:
+                self._rest_api_v1.representation(media_type)(self._output_msgpack)
+
         # Adding Rest resources to Flask
         self._register_resources_v1()
 
-    def start_rest_server(self, debug_mode=False, force_start=False, **server_options):
+    def start_rest_server(self, debug_mode=False, force_start=False, serving_mode=None, worker_count=None,
+                          thread_count=None, **server_options):
         """
-        Starts the rest server
+        Starts the rest server, see WsgiServer for the serving modes
+        @param serving_mode: gevent, threaded or prefork, defaults to PDU_LIBRARY_SERVING_MODE or gevent
+        @param worker_count: Concurrent connections (gevent), threads (threaded) or processes (prefork)
+        @param thread_count: Threads of every prefork process
+        @param server_options: keep_alive_timeout_in_secs and backlog, see WsgiServer
         """
         self._prepare_rest_server()
 
@@ -135,19 +176,21 @@ class RestServer(BaseObject, Singleton):
             raise PduLibraryException(REST_SERVER_ALREADY_RUNNING)
         '''
 
+        self._server_object = WsgiServer(self._rest_app, rest_server_host, rest_server_port, serving_mode,
+                                         worker_count, thread_count, **server_options)
+
         self._create_rest_server_state_file()
 
         self._Logger.info('Launching TestExecutor Rest Server. Details :')
         self._Logger.info('     Host : %s' % rest_server_host)
         self._Logger.info('     Port : %s' % rest_server_port)
         self._Logger.info('     Debug Mode : %s' % debug_mode)
+        self._Logger.info('     Serving Mode : %s' % self._server_object.get_serving_mode())
         self._Logger.info('     Server Options : %s' % server_options)
         self._Logger.info('     Force Start : %s' % force_start)
 
         try:
-            self._server_object = WSGIServer((rest_server_host, rest_server_port), self._rest_app)
-
-            self._rest_app.run(rest_server_host, rest_server_port)
+            self._server_object.serve_forever()
 
             self._Logger.info('Server shutdown')
             self._delete_rest_server_state_file()
@@ -282,6 +325,46 @@ class RestServer(BaseObject, Singleton):
         with open(file_path, 'a'):
             os.utime(file_path, times)
 
+    def _output_json(self, data, code, headers=None):
+        """
+        Renders JSON responses, see _make_response
+        """
+        return self._make_response(data, code, headers, ResponseEncoder.JSON, ResponseEncoder.to_json)
+
+    def _output_msgpack(self, data, code, headers=None):
+        """
+        Renders MessagePack responses, for clients sending Accept: application/msgpack, see _make_response
+        """
+        return self._make_response(data, code, headers, ResponseEncoder.MSGPACK, ResponseEncoder.to_msgpack)
+
+    def _make_response(self, data, code, headers, mimetype, encode):
+        """
+        Renders responses in the encoding negotiated from the Accept header, compressed as the Accept-Encoding
+        header allows, see ResponseEncoder
+        The phase timing of the device operation of the request, if any, is added as a Server-Timing header, and
+        as a Timing section of the response when the request has ?timing=true
+        """
+        timing = PhaseTimer.get_last_timing()
+        if timing is not None:
+            headers = dict(headers or {})
+            headers['Server-Timing'] = PhaseTiming.to_server_timing(timing)
+            if request.args.get('timing', '').lower() in ('1', 'true') and isinstance(data, dict) \
+                    and 'ErrorCode' in data:
+                data = dict(data, Timing=timing)
+
+        body = encode(data)
+        content_encoding = ResponseEncoder.get_content_encoding(request.accept_encodings, body)
+        if content_encoding is not None:
+            body = ResponseEncoder.compress(body, content_encoding)
+
+        response = make_response(body, code)
+        response.headers.extend(headers or {})
+        response.mimetype = mimetype
+        if content_encoding is not None:
+            response.content_encoding = content_encoding
+        response.vary.update(('Accept', 'Accept-Encoding'))
+        return response
+
     def _register_resources_v1(self):
         """
         Register the REST APIs that needs to be exposed
@@ -289,8 +372,33 @@ class RestServer(BaseObject, Singleton):
         """
         # RestResource Endpoints
         self._rest_api_v1.add_resource(GetVersion, '/v1/get_version')
-        self._rest_api_v1.add_resource(GetPduInfo, '/v1/get_pdu_info')
-        self._rest_api_v1.add_resource(GetPortInfo, '/v1/get_port_info')
-        self._rest_api_v1.add_resource(PowerOn, '/v1/power_on')
-        self._rest_api_v1.add_resource(PowerOff, '/v1/power_off')
-        self._rest_api_v1.add_resource(Reboot, '/v1/reboot')
+
+        # Device operations, the hottest resources, and the state and streaming resources get their manager and
+        # compiled request schema at registration instead of building them for every request
+        for resource_class, url in ((GetPduInfo, '/v1/get_pdu_info'),
+                                    (GetPortInfo, '/v1/get_port_info'),
+                                    (PowerOn, '/v1/power_on'),
+                                    (PowerOff, '/v1/power_off'),
+                                    (Reboot, '/v1/reboot'),
+                                    (PowerOnPorts, '/v1/power_on_ports'),
+                                    (PowerOffPorts, '/v1/power_off_ports'),
+                                    (RebootPorts, '/v1/reboot_ports'),
+                                    (PduState, '/v1/pdus/<string:ip>'),
+                                    (PortState, '/v1/pdus/<string:ip>/ports/<int:port>'),
+                                    (Events, '/v1/events'),
+                                    (FleetOperationStream, '/v1/fleet/stream')):
+            self._rest_api_v1.add_resource(resource_class, url, resource_class_kwargs={
+                'pdu_library_manager': PduLibraryManager.get_instance(),
+                'request_schema': resource_class.build_request_schema()
+            })
+
+        self._rest_api_v1.add_resource(FleetOperation, '/v1/fleet')
+        self._rest_api_v1.add_resource(GetJob, '/v1/jobs/<string:job_id>')
+        self._rest_api_v1.add_resource(PolledPdus, '/v1/polled_pdus')
+        self._rest_api_v1.add_resource(GetSensorHistory, '/v1/sensor_history')
+        self._rest_api_v1.add_resource(Metrics, self.url_metrics)
+
+        # Admin endpoints are off unless an admin token is configured
+        if Profiler.get_instance().is_enabled():
+            self._rest_api_v1.add_resource(AdminProfile, self.url_admin_profile)
+            self._rest_api_v1.add_resource(AdminMemory, self.url_admin_memory)
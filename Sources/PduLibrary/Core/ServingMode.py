@@ -0,0 +1,81 @@
+import os
+import sys
+
+
+class ServingMode(object):
+    """
+    Serving modes of the REST server, see WsgiServer
+    This module imports nothing heavy on purpose: the gevent mode has to patch the standard library before the
+    rest of the library, requests or telnetlib import socket, ssl and threading.
+    """
+    GEVENT = 'gevent'
+    THREADED = 'threaded'
+    PREFORK = 'prefork'
+    modes = (GEVENT, THREADED, PREFORK)
+
+    serving_mode_env_var = 'PDU_LIBRARY_SERVING_MODE'
+    default_mode = GEVENT
+
+    # Set in the worker processes of the prefork mode, see mark_prefork_worker
+    _is_prefork_worker = False
+
+    @staticmethod
+    def get_default_mode():
+        """
+        Gets the serving mode used when none is given, PDU_LIBRARY_SERVING_MODE or gevent
+        """
+        return os.environ.get(ServingMode.serving_mode_env_var, '').strip().lower() or ServingMode.default_mode
+
+    @staticmethod
+    def get_requested_mode(argv):
+        """
+        Gets the serving mode of a 'restserver start|restart [--mode MODE]' command line
+        @param argv: Command line arguments, without the program name
+        @return: The serving mode, None if the command line does not start the rest server
+        """
+        if len(argv) < 2 or argv[0] != 'restserver' or argv[1] not in ('start', 'restart'):
+            return None
+        for index, argument in enumerate(argv):
+            if argument in ('-m', '--mode') and index + 1 < len(argv):
+                return argv[index + 1].lower()
+            if argument.startswith('--mode='):
+                return argument.split('=', 1)[1].lower()
+        return ServingMode.get_default_mode()
+
+    @staticmethod
+    def mark_prefork_worker():
+        """
+        Marks the current process as a worker of the prefork mode, called by WsgiServer once forked
+        """
+        ServingMode._is_prefork_worker = True
+
+    @staticmethod
+    def is_prefork_worker():
+        """
+        Whether the current process is a worker of the prefork mode
+        Workers do not share memory, so the features keeping state in memory - jobs, polling, events, sensor history,
+        metrics and the device sessions of APC and DLI PDUs - refuse to run there instead of answering from the state
+        of whichever worker got the request
+        """
+        return ServingMode._is_prefork_worker
+
+    @staticmethod
+    def is_patched_for_gevent():
+        """
+        Whether the standard library is patched for gevent, requests then run in greenlets sharing an OS thread
+        """
+        monkey = sys.modules.get('gevent.monkey')
+        return monkey is not None and monkey.is_module_patched('threading')
+
+    @staticmethod
+    def patch_for_gevent():
+        """
+        Monkey patches the standard library so that blocking socket I/O, sleeps and locks yield to other greenlets
+        Patching twice is harmless
+        @return: False if the library was already patched
+        """
+        from gevent import monkey
+        if monkey.is_module_patched('socket'):
+            return False
+        monkey.patch_all()
+        return True
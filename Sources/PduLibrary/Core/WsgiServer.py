@@ -0,0 +1,243 @@
+import io
+import os
+import signal
+import socket
+
+import gevent
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIHandler, WSGIServer
+from gevent.threadpool import ThreadPool
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Core.ServingMode import ServingMode
+from PduLibrary.Errors.ErrorCodes import *
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class KeepAliveWSGIHandler(WSGIHandler):
+    """
+    gevent request handler closing keep-alive connections idle for longer than keep_alive_timeout_in_secs, so that
+    idle clients do not hold on to the slots of the greenlet pool
+    """
+    keep_alive_timeout_in_secs = None
+
+    def handle(self):
+        self.socket.settimeout(self.keep_alive_timeout_in_secs)
+        WSGIHandler.handle(self)
+
+
+class ThreadPoolApp(object):
+    """
+    Runs a WSGI app in the threads of a gevent ThreadPool, while the gevent hub keeps the connections
+    Blocking device I/O then only holds a thread, without any monkey patching. Responses with a Content-Length are
+    produced in one go by the worker thread, streamed ones chunk by chunk in the threads of stream_threadpool, so
+    that long lived streams such as /v1/events do not hold the threads serving requests.
+    """
+
+    def __init__(self, app, threadpool, stream_threadpool=None):
+        self._app = app
+        self._threadpool = threadpool
+        self._stream_threadpool = stream_threadpool or threadpool
+
+    def __call__(self, environ, start_response):
+        # The socket belongs to the hub thread, the request body is read before handing over to a worker thread
+        environ['wsgi.input'] = io.BytesIO(environ['wsgi.input'].read())
+        return self._threadpool.apply(self._call_app, (environ, start_response))
+
+    def _call_app(self, environ, start_response):
+        response_headers = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            response_headers[:] = headers
+            return start_response(status, headers, exc_info)
+
+        result = self._app(environ, capture_start_response)
+        if not any(name.lower() == 'content-length' for name, _ in response_headers):
+            return self._stream(iter(result), result)
+        try:
+            return [b''.join(result)]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    def _stream(self, iterator, result):
+        try:
+            while True:
+                chunk = self._stream_threadpool.apply(next, (iterator, None))
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            if hasattr(result, 'close'):
+                self._stream_threadpool.apply(result.close)
+
+
+class WsgiServer(BaseObject):
+    """
+    Serves a WSGI app in one of the serving modes of ServingMode, HTTP being handled by gevent's pywsgi
+    - gevent: a single process, a greenlet per connection up to worker_count connections. Device I/O only yields
+      to other requests once the standard library is monkey patched, see ServingMode.patch_for_gevent
+    - threaded: a single process, the app running in a pool of worker_count threads, see ThreadPoolApp
+    - prefork: worker_count processes sharing the listening socket, each running the app in a pool of
+      thread_count threads. Workers that die are replaced. Workers do not share memory, the features keeping state
+      in memory are not available in them, see ServingMode.is_prefork_worker
+    In the threaded and prefork modes streamed responses hold a thread of their own while they wait for data, up
+    to default_stream_thread_count streams per process.
+    Every mode keeps HTTP/1.1 connections alive between requests.
+    """
+    default_worker_counts = {
+        ServingMode.GEVENT: 1000,
+        ServingMode.THREADED: 64,
+        ServingMode.PREFORK: os.cpu_count() or 2
+    }
+    default_thread_count = 16
+    # Sized with EventBroker.default_max_subscribers, which leaves some of them to streams other than /v1/events
+    default_stream_thread_count = 256
+    default_keep_alive_timeout_in_secs = 15
+    default_backlog = 1024
+    default_stop_timeout_in_secs = 10
+
+    def __init__(self, app, host, port, serving_mode=None, worker_count=None, thread_count=None,
+                 keep_alive_timeout_in_secs=None, backlog=None):
+        """
+        Initializes the class
+        @param app: The WSGI app
+        @param host: Host to listen on
+        @param port: Port to listen on
+        @param serving_mode: gevent, threaded or prefork, defaults to PDU_LIBRARY_SERVING_MODE or gevent
+        @param worker_count: Concurrent connections (gevent), threads (threaded) or processes (prefork)
+        @param thread_count: Threads of every prefork process
+        @param keep_alive_timeout_in_secs: Idle keep-alive connections are closed after this long
+        @param backlog: Length of the queue of connections waiting to be accepted
+        """
+        BaseObject.__init__(self)
+        self._serving_mode = (serving_mode or ServingMode.get_default_mode()).lower()
+        if self._serving_mode not in ServingMode.modes:
+            raise PduLibraryException(INVALID_SERVING_MODE, '%s, expected one of %s' % (
+                self._serving_mode, ', '.join(ServingMode.modes)))
+        if self._serving_mode == ServingMode.PREFORK and not hasattr(os, 'fork'):
+            raise PduLibraryException(INVALID_SERVING_MODE, 'prefork needs os.fork, not available on this platform')
+
+        self._app = app
+        self._host = host
+        self._port = port
+        self._worker_count = worker_count or self.default_worker_counts[self._serving_mode]
+        self._thread_count = thread_count or self.default_thread_count
+        self._keep_alive_timeout_in_secs = keep_alive_timeout_in_secs or self.default_keep_alive_timeout_in_secs
+        self._backlog = backlog or self.default_backlog
+        self._server = None
+        self._stopping = False
+        self._worker_pids = set()
+
+    def get_serving_mode(self):
+        return self._serving_mode
+
+    def serve_forever(self):
+        """
+        Serves requests until stop() is called, or until interrupted
+        """
+        self._Logger.info('Serving on %s:%s in %s mode with %d workers' % (
+            self._host, self._port, self._serving_mode, self._worker_count))
+        if self._serving_mode == ServingMode.GEVENT:
+            if ServingMode.patch_for_gevent():
+                self._Logger.warning('Patched the standard library for gevent after the library was loaded, start '
+                                     'the rest server from the PduLibrary command line for fully cooperative I/O')
+            self._serve(self._create_listener(), self._app, Pool(self._worker_count))
+        elif self._serving_mode == ServingMode.THREADED:
+            self._serve_in_threads(self._create_listener(), self._worker_count)
+        else:
+            self._serve_prefork()
+
+    def stop(self):
+        """
+        Stops serving, serve_forever returns once the requests in progress are done or after
+        default_stop_timeout_in_secs
+        May be called from any thread.
+        """
+        self._stopping = True
+        if self._serving_mode == ServingMode.PREFORK and self._worker_pids:
+            self._stop_workers()
+        elif self._server is not None and self._server.started:
+            self._server.loop.run_callback_threadsafe(gevent.spawn, self._server.stop)
+
+    def _create_listener(self):
+        listener = socket.create_server((self._host, self._port), backlog=self._backlog)
+        listener.setblocking(False)
+        return listener
+
+    def _serve(self, listener, app, spawn):
+        handler_class = type('KeepAliveWSGIHandler', (KeepAliveWSGIHandler,),
+                             {'keep_alive_timeout_in_secs': self._keep_alive_timeout_in_secs})
+        self._server = WSGIServer(listener, app, spawn=spawn, handler_class=handler_class)
+        self._server.stop_timeout = self.default_stop_timeout_in_secs
+        self._server.serve_forever()
+
+    def _serve_in_threads(self, listener, thread_count):
+        threadpool = ThreadPool(thread_count)
+        stream_threadpool = ThreadPool(self.default_stream_thread_count)
+        try:
+            self._serve(listener, ThreadPoolApp(self._app, threadpool, stream_threadpool), 'default')
+        finally:
+            threadpool.kill()
+            stream_threadpool.kill()
+
+    def _serve_prefork(self):
+        listener = self._create_listener()
+        previous_handlers = {signal_number: signal.signal(signal_number, self._handle_stop_signal)
+                             for signal_number in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            while not self._stopping:
+                while len(self._worker_pids) < self._worker_count and not self._stopping:
+                    self._fork_worker(listener)
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    continue
+                if pid in self._worker_pids:
+                    self._worker_pids.discard(pid)
+                    if not self._stopping:
+                        self._Logger.warning('Worker %d exited with status %d, replacing it' % (pid, status))
+        finally:
+            for signal_number, previous_handler in previous_handlers.items():
+                signal.signal(signal_number, previous_handler)
+            self._stop_workers()
+            listener.close()
+
+    def _fork_worker(self, listener):
+        pid = os.fork()
+        if pid:
+            self._worker_pids.add(pid)
+            return
+
+        exit_code = 0
+        try:
+            # The parent forwards the stop signals, Ctrl+C reaching the whole process group is left to it
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            gevent.reinit()
+            ServingMode.mark_prefork_worker()
+            self._worker_pids = set()
+            self._serve_in_threads(listener, self._thread_count)
+        except BaseException as ex:
+            self._Logger.error('Worker %d failed. Details : %s' % (os.getpid(), str(ex)))
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _handle_stop_signal(self, signal_number, frame):
+        self._Logger.info('Received signal %d, stopping the workers' % signal_number)
+        self._stopping = True
+        self._stop_workers()
+
+    def _stop_workers(self):
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._worker_pids.discard(pid)
+        while self._worker_pids:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            self._worker_pids.discard(pid)
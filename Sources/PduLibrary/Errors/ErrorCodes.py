@@ -6,12 +6,31 @@ INVALID_REST_SERVER_PORT = 105
 REST_SERVER_NOT_RUNNING = 106
 REST_SERVER_SHUTDOWN_REQUEST_TIMEDOUT = 107
 REST_SERVER_SHUTDOWN_REQUEST_FAILED = 109
+INVALID_SERVING_MODE = 110
 
 ERROR_WHILE_FETCHING_PDU_INFO = 1001
 ERROR_WHILE_FETCHING_PORT_INFO = 1002
 ERROR_WHILE_POWERING_ON_PORT = 1003
 ERROR_WHILE_POWERING_OFF_PORT = 1004
 ERROR_WHILE_REBOOTING_PORT = 1005
+RARITAN_SESSION_POOL_EXHAUSTED = 1006
+UNSUPPORTED_MANUFACTURER = 1007
+ERROR_WHILE_LOADING_DRIVER = 1008
+INVALID_PORT_LIST = 1009
+UNSUPPORTED_FLEET_OPERATION = 1010
+INVALID_FLEET_TARGET = 1011
+OPERATION_TIMED_OUT = 1012
+JOB_NOT_FOUND = 1013
+UNSUPPORTED_JOB_OPERATION = 1014
+PDU_NOT_REGISTERED = 1015
+SENSOR_HISTORY_NOT_FOUND = 1016
+INVALID_SENSOR_HISTORY_QUERY = 1017
+ADMIN_ACCESS_DENIED = 1018
+PROFILING_IN_PROGRESS = 1019
+INVALID_PROFILING_REQUEST = 1020
+MEMORY_SNAPSHOT_NOT_FOUND = 1021
+TOO_MANY_EVENT_SUBSCRIBERS = 1022
+UNAVAILABLE_IN_PREFORK_WORKER = 1023
 
 ErrorMessages = {
     REST_SERVER_WORKING_FOLDER_CREATE_FAILURE: 'Error while creating working folder for rest server. Details : {0}',
@@ -22,9 +41,29 @@ ErrorMessages = {
     REST_SERVER_NOT_RUNNING: 'Rest server is not running. {0}',
     REST_SERVER_SHUTDOWN_REQUEST_TIMEDOUT: 'Timed out while rest server shutdown request. {0}',
     REST_SERVER_SHUTDOWN_REQUEST_FAILED: 'Cannot shutdown',
+    INVALID_SERVING_MODE: 'Invalid serving mode for the rest server. {0}',
     ERROR_WHILE_FETCHING_PDU_INFO: 'Error while fetching PDU Info : {0}',
     ERROR_WHILE_FETCHING_PORT_INFO: 'Error while fetching Port Info : {0}',
     ERROR_WHILE_POWERING_ON_PORT: 'Error while Powering On Port : {0}',
     ERROR_WHILE_POWERING_OFF_PORT: 'Error while Powering Off Port : {0}',
-    ERROR_WHILE_REBOOTING_PORT: 'Error while Rebooting Port : {0}'
+    ERROR_WHILE_REBOOTING_PORT: 'Error while Rebooting Port : {0}',
+    RARITAN_SESSION_POOL_EXHAUSTED: 'Timed out waiting for a free session to Raritan PDU : {0}',
+    UNSUPPORTED_MANUFACTURER: 'Unsupported manufacturer : {0}',
+    ERROR_WHILE_LOADING_DRIVER: 'Error while loading driver for {0} : {1}',
+    INVALID_PORT_LIST: 'Invalid list of ports : {0}',
+    UNSUPPORTED_FLEET_OPERATION: 'Unsupported fleet operation : {0}',
+    INVALID_FLEET_TARGET: 'Fleet target is missing field or has an invalid one : {0}',
+    OPERATION_TIMED_OUT: 'Timed out while running {0} against PDU : {1}',
+    JOB_NOT_FOUND: 'Job not found : {0}',
+    UNSUPPORTED_JOB_OPERATION: 'Unsupported job operation : {0}',
+    PDU_NOT_REGISTERED: 'PDU is not registered for polling : {0}',
+    SENSOR_HISTORY_NOT_FOUND: 'No sensor history for PDU : {0}',
+    INVALID_SENSOR_HISTORY_QUERY: 'Invalid sensor history query : {0}',
+    ADMIN_ACCESS_DENIED: 'Missing or invalid admin token',
+    PROFILING_IN_PROGRESS: 'Another profiling window is already open',
+    INVALID_PROFILING_REQUEST: 'Invalid profiling request : {0}',
+    MEMORY_SNAPSHOT_NOT_FOUND: 'Memory snapshot not found, take a snapshot first : {0}',
+    TOO_MANY_EVENT_SUBSCRIBERS: 'Too many event subscribers, at most {0}',
+    UNAVAILABLE_IN_PREFORK_WORKER: '{0} keeps its state in the memory of a single process and is not available in '
+                                   'the prefork serving mode, use the gevent or threaded mode'
 }
@@ -1,18 +1,24 @@
-import telnetlib
+import asyncio
 import traceback
 from abc import ABC
 
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import driver_metrics
 from PduLibrary.Errors.ErrorCodes import ERROR_WHILE_POWERING_ON_PORT, ERROR_WHILE_POWERING_OFF_PORT,\
     ERROR_WHILE_REBOOTING_PORT
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
+from PduLibrary.PDUManager.ApcSessionManager import ApcSessionManager
 
 
 class ApcLibraryManager(BaseObject, ABC):
+    # The PDUs accept a single telnet login, which ApcSessionManager keeps open in the memory of this process
+    keeps_device_sessions = True
 
     def __init__(self):
         BaseObject.__init__(self)
+        self._session_manager = ApcSessionManager.get_instance()
 
+    @driver_metrics('apc', 'get_pdu_info')
     def get_pdu_info(self, ip, username, password, output):
         """
         Gets PDU Information
@@ -25,6 +31,7 @@ class ApcLibraryManager(BaseObject, ABC):
         output['manufacturer'] = 'APC'
         return output
 
+    @driver_metrics('apc', 'get_port_info')
     def get_port_info(self, ip, username, password, port, output):
         """
         Gets Port/Outlet Information
@@ -37,6 +44,7 @@ class ApcLibraryManager(BaseObject, ABC):
         """
         return output
 
+    @driver_metrics('apc', 'power_on')
     def power_on(self, ip, username, password, port, output):
         """
         Power On the port/outlet
@@ -48,15 +56,7 @@ class ApcLibraryManager(BaseObject, ABC):
         @return: Status of Power On request
         """
         try:
-            telnet_session = telnetlib.Telnet(host=ip)
-            telnet_session.read_until(b"User Name :")
-            telnet_session.write(bytes(f"{username}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Password  :")
-            telnet_session.write(bytes(f"{password}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Use tcpip command")
-            command = bytes(f"olOn {port}\r\n", 'utf-8')
-            telnet_session.write(command)
-            telnet_session.read_until(b"E000: Success")
+            self._session_manager.execute(ip, username, password, f"olOn {port}")
             self._Logger.info('Powered ON Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Powering ON Port :: ' + str(port)
@@ -66,6 +66,7 @@ class ApcLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
         return output
 
+    @driver_metrics('apc', 'power_off')
     def power_off(self, ip, username, password, port, output):
         """
         Power Off the port/outlet
@@ -77,15 +78,7 @@ class ApcLibraryManager(BaseObject, ABC):
         @return: Status of Power Off request
         """
         try:
-            telnet_session = telnetlib.Telnet(host=ip)
-            telnet_session.read_until(b"User Name :")
-            telnet_session.write(bytes(f"{username}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Password  :")
-            telnet_session.write(bytes(f"{password}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Use tcpip command")
-            command = bytes(f"olOff {port}\r\n", 'utf-8')
-            telnet_session.write(command)
-            telnet_session.read_until(b"E000: Success")
+            self._session_manager.execute(ip, username, password, f"olOff {port}")
             self._Logger.info('Powered Off Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Powering Off Port :: ' + str(port)
@@ -95,6 +88,7 @@ class ApcLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
         return output
 
+    @driver_metrics('apc', 'reboot')
     def reboot(self, ip, username, password, port, output):
         """
         Reboots the port/outlet
@@ -106,15 +100,7 @@ class ApcLibraryManager(BaseObject, ABC):
         @return: Status of Reboot request
         """
         try:
-            telnet_session = telnetlib.Telnet(host=ip)
-            telnet_session.read_until(b"User Name :")
-            telnet_session.write(bytes(f"{username}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Password  :")
-            telnet_session.write(bytes(f"{password}\r\n", 'utf-8'))
-            telnet_session.read_until(b"Use tcpip command")
-            command = bytes(f"olReboot {port}\r\n", 'utf-8')
-            telnet_session.write(command)
-            telnet_session.read_until(b"E000: Success")
+            self._session_manager.execute(ip, username, password, f"olReboot {port}", retry_on_drop=False)
             self._Logger.info('Reboot Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Rebooting Port :: ' + str(port)
@@ -123,3 +109,152 @@ class ApcLibraryManager(BaseObject, ABC):
             self._Logger.error(traceback.print_exc())
             raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
         return output
+
+    @driver_metrics('apc', 'power_on')
+    async def async_power_on(self, ip, username, password, port, output):
+        """
+        Power On the port/outlet without blocking the event loop
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param port: Port/Outlet number
+        @param output: The default output
+        @return: Status of Power On request
+        """
+        try:
+            await self._session_manager.async_execute(ip, username, password, f"olOn {port}")
+            self._Logger.info('Powered ON Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            self._Logger.error('Error while Powering ON Port :: ' + str(port)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
+        return output
+
+    @driver_metrics('apc', 'power_off')
+    async def async_power_off(self, ip, username, password, port, output):
+        """
+        Power Off the port/outlet without blocking the event loop
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param port: Port/Outlet number
+        @param output: The default output
+        @return: Status of Power Off request
+        """
+        try:
+            await self._session_manager.async_execute(ip, username, password, f"olOff {port}")
+            self._Logger.info('Powered Off Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            self._Logger.error('Error while Powering Off Port :: ' + str(port)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
+        return output
+
+    @driver_metrics('apc', 'reboot')
+    async def async_reboot(self, ip, username, password, port, output):
+        """
+        Reboots the port/outlet without blocking the event loop
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param port: Port/Outlet number
+        @param output: The default output
+        @return: Status of Reboot request
+        """
+        try:
+            await self._session_manager.async_execute(ip, username, password, f"olReboot {port}",
+                                                     retry_on_drop=False)
+            self._Logger.info('Reboot Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            self._Logger.error('Error while Rebooting Port :: ' + str(port)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
+        return output
+
+    @driver_metrics('apc', 'power_on_ports')
+    def power_on_ports(self, ip, username, password, ports, output):
+        """
+        Power On several ports/outlets with a single olOn command
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power On request for every port
+        """
+        try:
+            self._session_manager.execute(ip, username, password, f"olOn {self._format_ports(ports)}")
+            self._Logger.info('Powered ON Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering ON Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
+        return output
+
+    @driver_metrics('apc', 'power_off_ports')
+    def power_off_ports(self, ip, username, password, ports, output):
+        """
+        Power Off several ports/outlets with a single olOff command
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power Off request for every port
+        """
+        try:
+            self._session_manager.execute(ip, username, password, f"olOff {self._format_ports(ports)}")
+            self._Logger.info('Powered Off Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering Off Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
+        return output
+
+    @driver_metrics('apc', 'reboot_ports')
+    def reboot_ports(self, ip, username, password, ports, output):
+        """
+        Reboots several ports/outlets with a single olReboot command
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Reboot request for every port
+        """
+        try:
+            self._session_manager.execute(ip, username, password, f"olReboot {self._format_ports(ports)}",
+                                          retry_on_drop=False)
+            self._Logger.info('Reboot Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Rebooting Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
+        return output
+
+    def _format_ports(self, ports):
+        """
+        Formats a sorted list of ports the way the APC CLI expects it, e.g. [1, 3, 5, 6, 7, 8] as 1,3,5-8
+        """
+        ranges = []
+        for port in ports:
+            if ranges and port == ranges[-1][1] + 1:
+                ranges[-1][1] = port
+            else:
+                ranges.append([port, port])
+        return ','.join(str(first) if first == last else '%d-%d' % (first, last) for first, last in ranges)
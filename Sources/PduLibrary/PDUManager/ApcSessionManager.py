@@ -0,0 +1,387 @@
+import asyncio
+import queue
+import telnetlib
+import threading
+import time
+import traceback
+from concurrent.futures import Future, TimeoutError
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+from PduLibrary.Common.Singleton import Singleton
+
+
+class ApcCommandError(Exception):
+    """
+    Raised when the PDU answers a command with anything but E000: Success
+    """
+    pass
+
+
+class ApcCommand(object):
+    """
+    A command queued for an APC telnet session
+    """
+
+    def __init__(self, command, retry_on_drop=True):
+        self.command = command
+        self.retry_on_drop = retry_on_drop
+        self.future = Future()
+        # (phase, duration in secs) timed by the worker thread, added to the caller's PhaseTimer once answered
+        self.phases = []
+        self.queued_at = time.perf_counter()
+
+
+class ApcSession(BaseObject):
+    """
+    A single logged-in telnet session to an APC PDU, served by its own worker thread
+    Commands queued while the session is busy are written back to back and their replies read in order. A session
+    replacing another one of the same PDU waits in its worker thread for the other one to log out first.
+    """
+    prompt = b"apc>"
+    success_reply = b"E000: Success"
+
+    def __init__(self, ip, username, password, telnet_port, idle_timeout_in_secs, keepalive_interval_in_secs,
+                 login_timeout_in_secs, command_timeout_in_secs, max_pipeline_depth, previous_session=None):
+        BaseObject.__init__(self)
+        self.ip = ip
+        self.username = username
+        self.password = password
+        self._telnet_port = telnet_port
+        self._idle_timeout_in_secs = idle_timeout_in_secs
+        self._keepalive_interval_in_secs = keepalive_interval_in_secs
+        self._login_timeout_in_secs = login_timeout_in_secs
+        self._command_timeout_in_secs = command_timeout_in_secs
+        self._max_pipeline_depth = max_pipeline_depth
+        self._previous_session = previous_session
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._telnet_session = None
+        self._last_used_at = time.monotonic()
+        self._worker = threading.Thread(target=self._run, name='ApcSession-' + str(ip), daemon=True)
+        self._worker.start()
+
+    def submit(self, apc_command):
+        """
+        Queues a command on the session
+        @param apc_command: ApcCommand to run
+        @return: False if the session already closed and the command was not queued
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self._queue.put(apc_command)
+        return True
+
+    def close(self):
+        """
+        Asks the worker to log out and stop once the queued commands are done
+        """
+        self._queue.put(None)
+
+    def wait_closed(self, timeout):
+        """
+        Waits for the worker to log out, so that a new session to the PDU is not refused
+        """
+        self._worker.join(timeout)
+
+    def _run(self):
+        if self._previous_session is not None:
+            # The PDU refuses a second telnet login
+            self._previous_session.wait_closed(self._login_timeout_in_secs)
+            self._previous_session = None
+
+        while True:
+            try:
+                apc_command = self._queue.get(timeout=self._idle_timeout_in_secs)
+            except queue.Empty:
+                with self._lock:
+                    if not self._queue.empty():
+                        continue
+                    self._closed = True
+                self._Logger.debug('Closing idle telnet session to PDU :: ' + str(self.ip))
+                self._logout()
+                return
+
+            if apc_command is None:
+                with self._lock:
+                    self._closed = True
+                self._logout()
+                self._fail_pending(ApcCommandError('Session to PDU ' + str(self.ip) + ' was closed'))
+                return
+
+            batch = []
+            while True:
+                # Commands whose caller gave up before they were sent are dropped
+                if apc_command.future.set_running_or_notify_cancel():
+                    apc_command.phases.append(('queue', time.perf_counter() - apc_command.queued_at))
+                    batch.append(apc_command)
+                if len(batch) >= self._max_pipeline_depth:
+                    break
+                try:
+                    apc_command = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if apc_command is None:
+                    self._queue.put(None)
+                    break
+
+            if batch:
+                self._execute_batch(batch)
+
+    def _execute_batch(self, batch):
+        """
+        Runs a batch of commands, logging in again once if the session turns out to be dropped
+        """
+        try:
+            self._ensure_logged_in(batch)
+            self._pipeline(batch)
+            return
+        except (EOFError, OSError) as err:
+            self._Logger.info('Telnet session to PDU :: ' + str(self.ip) + ' dropped, logging in again :: '
+                              + str(err))
+            self._disconnect()
+            retry_batch = []
+            for apc_command in batch:
+                if apc_command.future.done():
+                    continue
+                if apc_command.retry_on_drop:
+                    retry_batch.append(apc_command)
+                else:
+                    apc_command.future.set_exception(err)
+        except Exception as err:
+            self._disconnect()
+            self._fail(batch, err)
+            return
+
+        if not retry_batch:
+            return
+
+        try:
+            self._ensure_logged_in(retry_batch)
+            self._pipeline(retry_batch)
+        except Exception as err:
+            self._disconnect()
+            self._fail(retry_batch, err)
+
+    def _pipeline(self, batch):
+        """
+        Writes every command of the batch, then reads the replies in order
+        """
+        self._last_used_at = time.monotonic()
+        started_at = time.perf_counter()
+        for apc_command in batch:
+            self._telnet_session.write(bytes(f"{apc_command.command}\r\n", 'utf-8'))
+
+        for apc_command in batch:
+            reply = self._read_prompt(self._command_timeout_in_secs)
+            apc_command.phases.append(('command', time.perf_counter() - started_at))
+            if self.success_reply in reply:
+                apc_command.future.set_result(reply.decode('utf-8', 'replace'))
+            else:
+                apc_command.future.set_exception(ApcCommandError(self._error_from_reply(reply)))
+
+    def _ensure_logged_in(self, batch):
+        """
+        Logs in if needed and probes sessions which were quiet for a while
+        """
+        if self._telnet_session is not None:
+            if time.monotonic() - self._last_used_at < self._keepalive_interval_in_secs:
+                return
+            started_at = time.perf_counter()
+            try:
+                self._telnet_session.write(b"\r\n")
+                self._read_prompt(self._login_timeout_in_secs)
+                return
+            except (EOFError, OSError) as err:
+                self._Logger.info('Telnet session to PDU :: ' + str(self.ip) + ' is stale :: ' + str(err))
+                self._disconnect()
+            finally:
+                self._add_phase(batch, 'probe', started_at)
+
+        started_at = time.perf_counter()
+        self._telnet_session = telnetlib.Telnet(host=self.ip, port=self._telnet_port,
+                                                timeout=self._login_timeout_in_secs)
+        self._add_phase(batch, 'connect', started_at)
+        started_at = time.perf_counter()
+        self._telnet_session.read_until(b"User Name :", self._login_timeout_in_secs)
+        self._telnet_session.write(bytes(f"{self.username}\r\n", 'utf-8'))
+        self._telnet_session.read_until(b"Password  :", self._login_timeout_in_secs)
+        self._telnet_session.write(bytes(f"{self.password}\r\n", 'utf-8'))
+        self._read_prompt(self._login_timeout_in_secs)
+        self._add_phase(batch, 'login', started_at)
+        self._last_used_at = time.monotonic()
+        self._Logger.debug('Logged in to PDU :: ' + str(self.ip))
+
+    def _add_phase(self, batch, name, started_at):
+        duration_in_secs = time.perf_counter() - started_at
+        for apc_command in batch:
+            apc_command.phases.append((name, duration_in_secs))
+
+    def _read_prompt(self, timeout):
+        reply = self._telnet_session.read_until(self.prompt, timeout)
+        if not reply.endswith(self.prompt):
+            raise EOFError('Timed out waiting for prompt from PDU ' + str(self.ip))
+        return reply
+
+    def _error_from_reply(self, reply):
+        for line in reply.decode('utf-8', 'replace').splitlines():
+            line = line.strip()
+            if len(line) > 4 and line[0] == 'E' and line[1:4].isdigit():
+                return line
+        return 'Unexpected reply from PDU ' + str(self.ip)
+
+    def _logout(self):
+        if self._telnet_session is None:
+            return
+        try:
+            self._telnet_session.write(b"exit\r\n")
+        except Exception as err:
+            self._Logger.debug('Ignoring error while logging out of PDU :: ' + str(self.ip) + ' Error :: '
+                               + str(err))
+        self._disconnect()
+
+    def _disconnect(self):
+        if self._telnet_session is not None:
+            try:
+                self._telnet_session.close()
+            except Exception:
+                self._Logger.debug(traceback.format_exc())
+            self._telnet_session = None
+
+    def _fail(self, batch, err):
+        for apc_command in batch:
+            if not apc_command.future.done():
+                apc_command.future.set_exception(err)
+
+    def _fail_pending(self, err):
+        while True:
+            try:
+                apc_command = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if apc_command is not None and apc_command.future.set_running_or_notify_cancel():
+                apc_command.future.set_exception(err)
+
+
+class ApcSessionManager(BaseObject, Singleton):
+    """
+    Keeps one persistent telnet session per APC PDU, since the PDUs accept a single telnet login at a time
+    """
+    default_telnet_port = 23
+    default_idle_timeout_in_secs = 120
+    default_keepalive_interval_in_secs = 30
+    default_login_timeout_in_secs = 10
+    default_command_timeout_in_secs = 30
+    default_max_pipeline_depth = 16
+
+    def __init__(self,
+                 telnet_port=None,
+                 idle_timeout_in_secs=None,
+                 keepalive_interval_in_secs=None,
+                 login_timeout_in_secs=None,
+                 command_timeout_in_secs=None,
+                 max_pipeline_depth=None):
+        """
+        Initializes the class
+        @param telnet_port: Telnet port of the PDUs
+        @param idle_timeout_in_secs: Sessions without commands for this long are logged out
+        @param keepalive_interval_in_secs: Sessions quiet for this long are probed before the next command
+        @param login_timeout_in_secs: Timeout for connecting and logging in
+        @param command_timeout_in_secs: Timeout for the reply of a single command
+        @param max_pipeline_depth: Maximum number of commands written before reading their replies
+        """
+        BaseObject.__init__(self)
+        self._telnet_port = telnet_port or self.default_telnet_port
+        self._idle_timeout_in_secs = idle_timeout_in_secs or self.default_idle_timeout_in_secs
+        self._keepalive_interval_in_secs = keepalive_interval_in_secs or self.default_keepalive_interval_in_secs
+        self._login_timeout_in_secs = login_timeout_in_secs or self.default_login_timeout_in_secs
+        self._command_timeout_in_secs = command_timeout_in_secs or self.default_command_timeout_in_secs
+        self._max_pipeline_depth = max_pipeline_depth or self.default_max_pipeline_depth
+
+        self._lock = threading.Lock()
+        self._sessions = dict()
+
+    def submit(self, ip, username, password, command, retry_on_drop=True):
+        """
+        Queues a command on the session of the PDU
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param command: CLI command, e.g. olOn 1
+        @param retry_on_drop: Whether the command may be sent again if the session drops before it is answered
+        @return: Future resolved with the reply of the PDU
+        """
+        return self._submit(ip, username, password, ApcCommand(command, retry_on_drop)).future
+
+    def execute(self, ip, username, password, command, retry_on_drop=True):
+        """
+        Runs a command on the session of the PDU and waits for its reply
+        The queue, connect, login, probe and command phases are added to the PhaseTimer of the caller
+        @return: The reply of the PDU
+        """
+        apc_command = self._submit(ip, username, password, ApcCommand(command, retry_on_drop))
+        try:
+            return apc_command.future.result(self._login_timeout_in_secs + 2 * self._command_timeout_in_secs)
+        except TimeoutError:
+            # A command still queued is then dropped by the worker instead of running after the caller gave up
+            apc_command.future.cancel()
+            raise
+        finally:
+            PhaseTimer.add_phases(list(apc_command.phases))
+
+    async def async_execute(self, ip, username, password, command, retry_on_drop=True):
+        """
+        Runs a command on the session of the PDU without blocking the event loop
+        @return: The reply of the PDU
+        """
+        apc_command = self._submit(ip, username, password, ApcCommand(command, retry_on_drop))
+        try:
+            return await asyncio.wrap_future(apc_command.future)
+        finally:
+            PhaseTimer.add_phases(list(apc_command.phases))
+
+    def _submit(self, ip, username, password, apc_command):
+        """
+        Queues a command without waiting, the lock only guards the sessions dictionary
+        """
+        closed_session = None
+        while True:
+            replaced_session = None
+            with self._lock:
+                apc_session = self._sessions.get(ip)
+                if apc_session is None or apc_session.username != username or apc_session.password != password:
+                    replaced_session = apc_session
+                    apc_session = self._create_session(ip, username, password, replaced_session or closed_session)
+                    self._sessions[ip] = apc_session
+            if replaced_session is not None:
+                replaced_session.close()
+            if apc_session.submit(apc_command):
+                return apc_command
+            # Closed as idle in the meantime, the next session waits for its logout
+            closed_session = apc_session
+            with self._lock:
+                if self._sessions.get(ip) is apc_session:
+                    del self._sessions[ip]
+
+    def close_all(self):
+        """
+        Logs out of every PDU
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for apc_session in sessions:
+            apc_session.close()
+
+    def _create_session(self, ip, username, password, previous_session=None):
+        return ApcSession(ip, username, password,
+                          self._telnet_port,
+                          self._idle_timeout_in_secs,
+                          self._keepalive_interval_in_secs,
+                          self._login_timeout_in_secs,
+                          self._command_timeout_in_secs,
+                          self._max_pipeline_depth,
+                          previous_session)
@@ -1,6 +1,7 @@
 from abc import ABC
 
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import driver_metrics
 
 
 class AtenLibraryManager(BaseObject, ABC):
@@ -8,6 +9,7 @@ class AtenLibraryManager(BaseObject, ABC):
     def __init__(self):
         BaseObject.__init__(self)
 
+    @driver_metrics('aten', 'get_pdu_info')
     def get_pdu_info(self, ip, username, password, output):
         """
         Gets PDU Information
@@ -20,6 +22,7 @@ class AtenLibraryManager(BaseObject, ABC):
         output['manufacturer'] = 'Aten'
         return output
 
+    @driver_metrics('aten', 'get_port_info')
     def get_port_info(self, ip, username, password, port, output):
         """
         Gets Port/Outlet Information
@@ -32,6 +35,7 @@ class AtenLibraryManager(BaseObject, ABC):
         """
         return output
 
+    @driver_metrics('aten', 'power_on')
     def power_on(self, ip, username, password, port, output):
         """
         Power On the port/outlet
@@ -44,6 +48,7 @@ class AtenLibraryManager(BaseObject, ABC):
         """
         return output
 
+    @driver_metrics('aten', 'power_off')
     def power_off(self, ip, username, password, port, output):
         """
         Power Off the port/outlet
@@ -56,6 +61,7 @@ class AtenLibraryManager(BaseObject, ABC):
         """
         return output
 
+    @driver_metrics('aten', 'reboot')
     def reboot(self, ip, username, password, port, output):
         """
         Reboots the port/outlet
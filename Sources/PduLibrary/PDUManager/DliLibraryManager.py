@@ -1,19 +1,26 @@
+import time
 import traceback
 from abc import ABC
 
-import dlipower
-
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import driver_metrics
 from PduLibrary.Errors.ErrorCodes import ERROR_WHILE_FETCHING_PDU_INFO, ERROR_WHILE_FETCHING_PORT_INFO,\
     ERROR_WHILE_POWERING_ON_PORT, ERROR_WHILE_POWERING_OFF_PORT, ERROR_WHILE_REBOOTING_PORT
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
+from PduLibrary.PDUManager.DliSwitchCache import DliSwitchCache
 
 
 class DliLibraryManager(BaseObject, ABC):
+    # Default cycle time of dlipower, used by the job scheduler to reboot without a sleeping thread
+    reboot_off_time_in_secs = 3
+    # Logins and outlet status snapshots are kept by DliSwitchCache in the memory of this process
+    keeps_device_sessions = True
 
     def __init__(self):
         BaseObject.__init__(self)
+        self._switch_cache = DliSwitchCache.get_instance()
 
+    @driver_metrics('dli', 'get_pdu_info')
     def get_pdu_info(self, ip, username, password, output):
         """
         Gets PDU Information
@@ -24,10 +31,10 @@ class DliLibraryManager(BaseObject, ABC):
         @return: The PDU information
         """
         try:
-            switch = dlipower.PowerSwitch(hostname=ip, userid=username, password=password)
+            status_list = self._switch_cache.get_status_list(ip, username, password)
             output['manufacturer'] = 'DLI'
             output['outlets'] = []
-            for outlet in switch.statuslist():
+            for outlet in status_list:
                 output['outlets'].append({
                     "portNumber": outlet[0],
                     "portName": outlet[1],
@@ -39,6 +46,7 @@ class DliLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_FETCHING_PDU_INFO, str(err))
         return output
 
+    @driver_metrics('dli', 'get_port_info')
     def get_port_info(self, ip, username, password, port, output):
         """
         Gets Port/Outlet Information
@@ -50,10 +58,10 @@ class DliLibraryManager(BaseObject, ABC):
         @return: The Port/Outlet information
         """
         try:
-            switch = dlipower.PowerSwitch(hostname=ip, userid=username, password=password)
+            status_list = self._switch_cache.get_status_list(ip, username, password)
             output['stateData'] = {
                 'available': True,
-                'powerState': switch.status(port),
+                'powerState': self._get_port_status(status_list, port),
                 'lastPowerStateChangeTime': ''
             }
         except Exception as err:
@@ -62,6 +70,7 @@ class DliLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_FETCHING_PORT_INFO, str(err))
         return output
 
+    @driver_metrics('dli', 'power_on')
     def power_on(self, ip, username, password, port, output):
         """
         Power On the port/outlet
@@ -73,12 +82,12 @@ class DliLibraryManager(BaseObject, ABC):
         @return: Status of Power On request
         """
         try:
-            switch = dlipower.PowerSwitch(hostname=ip, userid=username, password=password)
             # https://dlipower.readthedocs.io/en/latest/dlipower_module.html#dlipower.PowerSwitch.on
             # Turn on power to an outlet
             # False = Success
             # True = Fail
-            status = switch.on(port)
+            status = self._switch_cache.run(ip, username, password, lambda switch: switch.on(port))
+            self._switch_cache.invalidate_status(ip, username)
             # status will be True if the operation is success else False
             self._Logger.info(f'Status of Power ON in DLI :: {status}')
             if status:
@@ -95,6 +104,7 @@ class DliLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
         return output
 
+    @driver_metrics('dli', 'power_off')
     def power_off(self, ip, username, password, port, output):
         """
         Power Off the port/outlet
@@ -106,12 +116,12 @@ class DliLibraryManager(BaseObject, ABC):
         @return: Status of Power Off request
         """
         try:
-            switch = dlipower.PowerSwitch(hostname=ip, userid=username, password=password)
             # https://dlipower.readthedocs.io/en/latest/dlipower_module.html#dlipower.PowerSwitch.off
             # Turn off a power to an outlet
             # False = Success
             # True = Fail
-            status = switch.off(port)
+            status = self._switch_cache.run(ip, username, password, lambda switch: switch.off(port))
+            self._switch_cache.invalidate_status(ip, username)
             # status will be True if the operation is success else False
             self._Logger.info(f'Status of Power Off in DLI :: {status}')
             if status:
@@ -128,6 +138,7 @@ class DliLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
         return output
 
+    @driver_metrics('dli', 'reboot')
     def reboot(self, ip, username, password, port, output):
         """
         Reboots the port/outlet
@@ -139,13 +150,13 @@ class DliLibraryManager(BaseObject, ABC):
         @return: Status of Reboot request
         """
         try:
-            switch = dlipower.PowerSwitch(hostname=ip, userid=username, password=password)
             # https://dlipower.readthedocs.io/en/latest/dlipower_module.html#dlipower.PowerSwitch.cycle
             # Cycle power to an outlet
             # False = Power off Success
             # True = Power off Fail
             # Note, does not return any status info about the power on part of the operation by design
-            status = switch.cycle(port)
+            status = self._switch_cache.run(ip, username, password, lambda switch: switch.cycle(port))
+            self._switch_cache.invalidate_status(ip, username)
             # Status will be True if the operation is success else False
             self._Logger.info(f'Status of Reboot in DLI :: {status}')
             if status:
@@ -161,3 +172,111 @@ class DliLibraryManager(BaseObject, ABC):
             self._Logger.error(traceback.print_exc())
             raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
         return output
+
+    @driver_metrics('dli', 'power_on_ports')
+    def power_on_ports(self, ip, username, password, ports, output):
+        """
+        Power On several ports/outlets in one login, checking their state with a single scrape
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power On request for every port
+        """
+        try:
+            status_list = self._switch_cache.run(ip, username, password,
+                                                 lambda switch: self._switch_ports(switch, ports, ['ON']))
+            self._switch_cache.invalidate_status(ip, username)
+            self._set_ports_output(status_list, 'ON', ERROR_WHILE_POWERING_ON_PORT, output)
+            self._Logger.info('Powered ON - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering ON Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
+        return output
+
+    @driver_metrics('dli', 'power_off_ports')
+    def power_off_ports(self, ip, username, password, ports, output):
+        """
+        Power Off several ports/outlets in one login, checking their state with a single scrape
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power Off request for every port
+        """
+        try:
+            status_list = self._switch_cache.run(ip, username, password,
+                                                 lambda switch: self._switch_ports(switch, ports, ['OFF']))
+            self._switch_cache.invalidate_status(ip, username)
+            self._set_ports_output(status_list, 'OFF', ERROR_WHILE_POWERING_OFF_PORT, output)
+            self._Logger.info('Powered Off - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering Off Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
+        return output
+
+    @driver_metrics('dli', 'reboot_ports')
+    def reboot_ports(self, ip, username, password, ports, output):
+        """
+        Reboots several ports/outlets in one login, checking their state with a single scrape
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Reboot request for every port
+        """
+        try:
+            status_list = self._switch_cache.run(ip, username, password,
+                                                 lambda switch: self._switch_ports(switch, ports, ['OFF', 'ON']))
+            self._switch_cache.invalidate_status(ip, username)
+            self._set_ports_output(status_list, 'ON', ERROR_WHILE_REBOOTING_PORT, output)
+            self._Logger.info('Reboot - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Rebooting Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
+        return output
+
+    def _switch_ports(self, switch, ports, commands):
+        """
+        Sends each command to every port, waiting the cycle time of the switch between commands
+        @return: The outlet status rows after the last command
+        """
+        for index, command in enumerate(commands):
+            if index:
+                time.sleep(switch.cycletime)
+            for port in ports:
+                switch.geturl(url='outlet?%d=%s' % (port, command))
+        status_list = switch.statuslist()
+        if status_list is None:
+            raise Exception('Unable to read outlet status of PDU ' + str(switch.hostname))
+        return status_list
+
+    def _set_ports_output(self, status_list, expected_state, error_code, output):
+        for port_output in output['ports']:
+            port_state = self._get_port_status(status_list, port_output['portNumber'])
+            port_output['powerState'] = port_state
+            if port_state != expected_state:
+                err = PduLibraryException(error_code, 'Port ' + str(port_output['portNumber']) + ' is ' + port_state)
+                port_output['ErrorCode'] = err.get_error_code()
+                port_output['Message'] = err.get_error_message()
+
+    def _get_port_status(self, status_list, port):
+        """
+        Picks the status of a port out of the outlet status rows, the same way dlipower.PowerSwitch.status does
+        """
+        for outlet in status_list:
+            if outlet[0] == int(port):
+                return outlet[2]
+        return 'Unknown'
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import dlipower
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+from PduLibrary.Common.Singleton import Singleton
+
+
+class DliSwitch(object):
+    """
+    A logged-in dlipower.PowerSwitch and the last outlet status scraped from it
+    """
+
+    def __init__(self, ip, username, password):
+        self.ip = ip
+        self.username = username
+        self.password = password
+        self.lock = threading.RLock()
+        self.switch = None
+        self.status_list = None
+        self.status_taken_at = 0.0
+
+
+class DliSwitchCache(BaseObject, Singleton):
+    """
+    Keeps dlipower.PowerSwitch handles alive per (ip, username) and shares short-lived outlet status snapshots
+    Every call against the same switch is serialized, since the embedded web server of the PDU is easily overloaded
+    """
+    default_status_snapshot_ttl_in_secs = 2
+
+    def __init__(self, status_snapshot_ttl_in_secs=None):
+        """
+        Initializes the class
+        @param status_snapshot_ttl_in_secs: Outlet status reads within this window are answered from one scrape
+        """
+        BaseObject.__init__(self)
+        self._status_snapshot_ttl_in_secs = status_snapshot_ttl_in_secs or self.default_status_snapshot_ttl_in_secs
+        self._lock = threading.Lock()
+        self._switches = dict()
+
+    def run(self, ip, username, password, operation):
+        """
+        Runs an operation on the cached switch of the PDU, logging in on first use
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param operation: Callable taking a dlipower.PowerSwitch
+        @return: The value returned by the operation
+        """
+        dli_switch = self._get_dli_switch(ip, username, password)
+        with PhaseTimer.phase('wait'):
+            dli_switch.lock.acquire()
+        try:
+            self._ensure_logged_in(dli_switch)
+            with PhaseTimer.phase('command'):
+                return operation(dli_switch.switch)
+        finally:
+            dli_switch.lock.release()
+
+    def get_status_list(self, ip, username, password):
+        """
+        Gets the status of every outlet as [port number, port name, port status] rows
+        The page is scraped at most once per snapshot window, logging in again once if the scrape fails
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @return: The outlet status rows
+        """
+        dli_switch = self._get_dli_switch(ip, username, password)
+        with PhaseTimer.phase('wait'):
+            dli_switch.lock.acquire()
+        try:
+            if dli_switch.status_list is not None \
+                    and time.monotonic() - dli_switch.status_taken_at < self._status_snapshot_ttl_in_secs:
+                return dli_switch.status_list
+
+            self._ensure_logged_in(dli_switch)
+
+            with PhaseTimer.phase('scrape'):
+                status_list = dli_switch.switch.statuslist()
+            if status_list is None:
+                self._Logger.info('Outlet status of PDU :: ' + str(ip) + ' unavailable, logging in again')
+                with PhaseTimer.phase('login'):
+                    dli_switch.switch.login()
+                with PhaseTimer.phase('scrape'):
+                    status_list = dli_switch.switch.statuslist()
+            if status_list is None:
+                raise Exception('Unable to read outlet status of PDU ' + str(ip))
+
+            dli_switch.status_list = status_list
+            dli_switch.status_taken_at = time.monotonic()
+            return status_list
+        finally:
+            dli_switch.lock.release()
+
+    def invalidate_status(self, ip, username):
+        """
+        Drops the outlet status snapshot of the PDU, e.g. after switching an outlet
+        """
+        with self._lock:
+            dli_switch = self._switches.get((ip, username))
+        if dli_switch is not None:
+            with dli_switch.lock:
+                dli_switch.status_list = None
+
+    def _ensure_logged_in(self, dli_switch):
+        """
+        Creates the switch of the PDU on first use, which connects and logs in to its web server
+        """
+        if dli_switch.switch is None:
+            with PhaseTimer.phase('login'):
+                dli_switch.switch = dlipower.PowerSwitch(hostname=dli_switch.ip, userid=dli_switch.username,
+                                                         password=dli_switch.password)
+
+    def _get_dli_switch(self, ip, username, password):
+        with self._lock:
+            dli_switch = self._switches.get((ip, username))
+            if dli_switch is None or dli_switch.password != password:
+                dli_switch = DliSwitch(ip, username, password)
+                self._switches[(ip, username)] = dli_switch
+            return dli_switch
@@ -5,17 +5,22 @@ from abc import ABC
 from PduLibrary.Errors.ErrorCodes import ERROR_WHILE_FETCHING_PDU_INFO, ERROR_WHILE_FETCHING_PORT_INFO, \
     ERROR_WHILE_POWERING_ON_PORT, ERROR_WHILE_POWERING_OFF_PORT, ERROR_WHILE_REBOOTING_PORT
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
-from raritan import rpc
+from PduLibrary.PDUManager.RaritanSessionPool import RaritanSessionPool
 from raritan.rpc import pdumodel
 
 from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.MetricsRegistry import driver_metrics
 
 
 class RaritanLibraryManager(BaseObject, ABC):
+    # Time a rebooted outlet stays off, also used by the job scheduler to reboot without a sleeping thread
+    reboot_off_time_in_secs = 2
 
     def __init__(self):
         BaseObject.__init__(self)
+        self._session_pool = RaritanSessionPool.get_instance()
 
+    @driver_metrics('raritan', 'get_pdu_info')
     def get_pdu_info(self, ip, username, password, output):
         """
         Gets PDU Information
@@ -26,38 +31,119 @@ class RaritanLibraryManager(BaseObject, ABC):
         @return: The PDU information
         """
         try:
-            agent = rpc.Agent("https", ip, username, password)
-            pdu = pdumodel.Pdu("/model/pdu/0", agent)
-            metadata = pdu.getMetaData()
-            outlets = pdu.getOutlets()
-            output['manufacturer'] = metadata.nameplate.manufacturer
-            output['model'] = metadata.nameplate.model
-            output['serialNumber'] = metadata.nameplate.serialNumber
-            output['ctrlBoardSerial'] = metadata.ctrlBoardSerial
-            output['fwRevision'] = metadata.fwRevision
-            output['macAddress'] = metadata.macAddress
-            output['voltage'] = metadata.nameplate.rating.voltage
-            output['current'] = metadata.nameplate.rating.current
-            output['frequency'] = metadata.nameplate.rating.frequency
-            output['power'] = metadata.nameplate.rating.power
-            output['outlets'] = []
-
-            for outlet in outlets:
-                outlet_metadata = outlet.getMetaData()
-                outlet_state = outlet.getState()
-                output['outlets'].append({
-                    "portNumber": int(outlet_metadata.label),
-                    "portName": 'Outlet ' + outlet_metadata.label
-                                if outlet.getSettings().name == ''
-                                else outlet.getSettings().name,
-                    "portStatus": 'ON' if outlet_state.powerState.val == 1 else 'OFF'
-                })
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._read_pdu_info(session, output))
         except Exception as err:
             self._Logger.error('Error while getting pdu info :: ' + str(err))
             self._Logger.error(traceback.print_exc())
             raise PduLibraryException(ERROR_WHILE_FETCHING_PDU_INFO, str(err))
         return output
 
+    @driver_metrics('raritan', 'get_pdu_nameplate')
+    def get_pdu_nameplate(self, ip, username, password, output):
+        """
+        Gets the part of the PDU Information that does not change: the nameplate and the outlets
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param output: The default output
+        @return: The PDU information, the outlets without their status
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._read_pdu_nameplate(session, output))
+        except Exception as err:
+            self._Logger.error('Error while getting pdu nameplate :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_FETCHING_PDU_INFO, str(err))
+        return output
+
+    @driver_metrics('raritan', 'get_pdu_state')
+    def get_pdu_state(self, ip, username, password, output):
+        """
+        Gets the name and status of the outlets
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param output: The output of get_pdu_nameplate
+        @return: The PDU information
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._read_pdu_state(session, output))
+        except Exception as err:
+            self._Logger.error('Error while getting pdu state :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_FETCHING_PDU_INFO, str(err))
+        return output
+
+    def _read_pdu_info(self, session, output):
+        """
+        Reads the PDU in two bulk round trips, the PDU itself and then every outlet
+        """
+        metadata, outlets = session.bulk([(session.pdu.getMetaData,), (session.pdu.getOutlets,)])
+        session.outlets = outlets
+        self._set_pdu_nameplate(output, metadata)
+        output['outlets'] = []
+
+        calls = []
+        for outlet in outlets:
+            calls.extend([(outlet.getMetaData,), (outlet.getState,), (outlet.getSettings,)])
+        results = session.bulk(calls)
+
+        for index in range(0, len(results), 3):
+            outlet_metadata, outlet_state, outlet_settings = results[index:index + 3]
+            output['outlets'].append(self._make_outlet_output(outlet_metadata))
+            self._set_outlet_state(output['outlets'][-1], outlet_state, outlet_settings)
+
+    def _read_pdu_nameplate(self, session, output):
+        """
+        Reads the PDU and the metadata of its outlets in two bulk round trips
+        """
+        metadata, outlets = session.bulk([(session.pdu.getMetaData,), (session.pdu.getOutlets,)])
+        session.outlets = outlets
+        self._set_pdu_nameplate(output, metadata)
+        output['outlets'] = [self._make_outlet_output(outlet_metadata)
+                             for outlet_metadata in session.bulk([(outlet.getMetaData,) for outlet in outlets])]
+
+    def _read_pdu_state(self, session, output):
+        """
+        Reads the state and settings of every outlet of the nameplate in one bulk round trip
+        """
+        calls = []
+        for outlet in session.get_outlets():
+            calls.extend([(outlet.getState,), (outlet.getSettings,)])
+        results = session.bulk(calls)
+
+        for outlet_output, index in zip(output['outlets'], range(0, len(results), 2)):
+            outlet_state, outlet_settings = results[index:index + 2]
+            self._set_outlet_state(outlet_output, outlet_state, outlet_settings)
+
+    def _set_pdu_nameplate(self, output, metadata):
+        output['manufacturer'] = metadata.nameplate.manufacturer
+        output['model'] = metadata.nameplate.model
+        output['serialNumber'] = metadata.nameplate.serialNumber
+        output['ctrlBoardSerial'] = metadata.ctrlBoardSerial
+        output['fwRevision'] = metadata.fwRevision
+        output['macAddress'] = metadata.macAddress
+        output['voltage'] = metadata.nameplate.rating.voltage
+        output['current'] = metadata.nameplate.rating.current
+        output['frequency'] = metadata.nameplate.rating.frequency
+        output['power'] = metadata.nameplate.rating.power
+
+    def _make_outlet_output(self, outlet_metadata):
+        return {
+            "portNumber": int(outlet_metadata.label),
+            "portName": 'Outlet ' + outlet_metadata.label,
+            "portStatus": ''
+        }
+
+    def _set_outlet_state(self, outlet_output, outlet_state, outlet_settings):
+        if outlet_settings.name != '':
+            outlet_output['portName'] = outlet_settings.name
+        outlet_output['portStatus'] = 'ON' if outlet_state.powerState.val == 1 else 'OFF'
+
+    @driver_metrics('raritan', 'get_port_info')
     def get_port_info(self, ip, username, password, port, output):
         """
         Gets Port/Outlet Information
@@ -69,31 +155,98 @@ class RaritanLibraryManager(BaseObject, ABC):
         @return: The Port/Outlet information
         """
         try:
-            agent = rpc.Agent("https", ip, username, password)
-            pdu = pdumodel.Pdu("/model/pdu/0", agent)
-            outlet = pdu.getOutlets()[port - 1]
-            metadata = outlet.getMetaData()
-            output['receptacleType'] = metadata.receptacleType
-            output['current'] = metadata.rating.current
-            output['minVoltage'] = metadata.rating.minVoltage
-            output['maxVoltage'] = metadata.rating.maxVoltage
-            output['sensorData'] = {
-                'voltage': outlet.getSensors().voltage.getReading().value,
-                'current': outlet.getSensors().current.getReading().value,
-                'activeEnergy': outlet.getSensors().activeEnergy.getReading().value,
-                'lineFrequency': outlet.getSensors().lineFrequency.getReading().value
-            }
-            output['stateData'] = {
-                'available': outlet.getState().available,
-                'powerState': 'ON' if outlet.getState().powerState.val == 1 else 'OFF',
-                'lastPowerStateChangeTime': str(outlet.getState().lastPowerStateChange)
-            }
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._read_port_info(session, port, output))
         except Exception as err:
             self._Logger.error('Error while getting pdu info :: ' + str(err))
             self._Logger.error(traceback.print_exc())
             raise PduLibraryException(ERROR_WHILE_FETCHING_PORT_INFO, str(err))
         return output
 
+    @driver_metrics('raritan', 'get_port_nameplate')
+    def get_port_nameplate(self, ip, username, password, port, output):
+        """
+        Gets the part of the Port/Outlet Information that does not change: the receptacle type and the ratings
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param output: The default output
+        @return: The Port/Outlet information, without sensor readings and state
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_port_nameplate(
+                                       output, session.get_outlets()[port - 1].getMetaData()))
+        except Exception as err:
+            self._Logger.error('Error while getting port nameplate :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_FETCHING_PORT_INFO, str(err))
+        return output
+
+    @driver_metrics('raritan', 'get_port_state')
+    def get_port_state(self, ip, username, password, port, output):
+        """
+        Gets the sensor readings and state of the port/outlet
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param port: Port/Outlet Number
+        @param output: The output of get_port_nameplate
+        @return: The Port/Outlet information
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._read_port_state(session, port, output))
+        except Exception as err:
+            self._Logger.error('Error while getting port state :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_FETCHING_PORT_INFO, str(err))
+        return output
+
+    def _read_port_info(self, session, port, output):
+        """
+        Reads the port in two bulk round trips, the outlet itself and then its sensor readings
+        """
+        outlet = session.get_outlets()[port - 1]
+        metadata, sensors, state = session.bulk([(outlet.getMetaData,), (outlet.getSensors,), (outlet.getState,)])
+        self._set_port_nameplate(output, metadata)
+        self._set_port_state(session, output, sensors, state)
+
+    def _read_port_state(self, session, port, output):
+        """
+        Reads the state of the port in two bulk round trips, the outlet itself and then its sensor readings
+        """
+        outlet = session.get_outlets()[port - 1]
+        sensors, state = session.bulk([(outlet.getSensors,), (outlet.getState,)])
+        self._set_port_state(session, output, sensors, state)
+
+    def _set_port_nameplate(self, output, metadata):
+        output['receptacleType'] = metadata.receptacleType
+        output['current'] = metadata.rating.current
+        output['minVoltage'] = metadata.rating.minVoltage
+        output['maxVoltage'] = metadata.rating.maxVoltage
+
+    def _set_port_state(self, session, output, sensors, state):
+        sensor_names = [sensor_name for sensor_name in ('voltage', 'current', 'activeEnergy', 'lineFrequency')
+                        if getattr(sensors, sensor_name)]
+        readings = session.bulk([(getattr(sensors, sensor_name).getReading,) for sensor_name in sensor_names])
+        output['sensorData'] = {
+            'voltage': '',
+            'current': '',
+            'activeEnergy': '',
+            'lineFrequency': ''
+        }
+        for sensor_name, reading in zip(sensor_names, readings):
+            output['sensorData'][sensor_name] = reading.value
+
+        output['stateData'] = {
+            'available': state.available,
+            'powerState': 'ON' if state.powerState.val == 1 else 'OFF',
+            'lastPowerStateChangeTime': str(state.lastPowerStateChange)
+        }
+
+    @driver_metrics('raritan', 'power_on')
     def power_on(self, ip, username, password, port, output):
         """
         Power On the port/outlet
@@ -105,10 +258,8 @@ class RaritanLibraryManager(BaseObject, ABC):
         @return: Status of Power On request
         """
         try:
-            agent = rpc.Agent("https", ip, username, password)
-            pdu = pdumodel.Pdu("/model/pdu/0", agent)
-            outlet = pdu.getOutlets()[port - 1]
-            outlet.setPowerState(pdumodel.Outlet.PowerState(1))
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_power_state(session, port, 1))
             self._Logger.info('Powered ON Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Powering ON Port :: ' + str(port)
@@ -118,6 +269,7 @@ class RaritanLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
         return output
 
+    @driver_metrics('raritan', 'power_off')
     def power_off(self, ip, username, password, port, output):
         """
         Power Off the port/outlet
@@ -129,10 +281,8 @@ class RaritanLibraryManager(BaseObject, ABC):
         @return: Status of Power Off request
         """
         try:
-            agent = rpc.Agent("https", ip, username, password)
-            pdu = pdumodel.Pdu("/model/pdu/0", agent)
-            outlet = pdu.getOutlets()[port - 1]
-            outlet.setPowerState(pdumodel.Outlet.PowerState(0))
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_power_state(session, port, 0))
             self._Logger.info('Powered Off Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Powering Off Port :: ' + str(port)
@@ -142,6 +292,7 @@ class RaritanLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
         return output
 
+    @driver_metrics('raritan', 'reboot')
     def reboot(self, ip, username, password, port, output):
         """
         Reboots the port/outlet
@@ -153,12 +304,11 @@ class RaritanLibraryManager(BaseObject, ABC):
         @return: Status of Reboot request
         """
         try:
-            agent = rpc.Agent("https", ip, username, password)
-            pdu = pdumodel.Pdu("/model/pdu/0", agent)
-            outlet = pdu.getOutlets()[port - 1]
-            outlet.setPowerState(pdumodel.Outlet.PowerState(0))
-            time.sleep(2)
-            outlet.setPowerState(pdumodel.Outlet.PowerState(1))
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_power_state(session, port, 0))
+            time.sleep(self.reboot_off_time_in_secs)
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_power_state(session, port, 1))
             self._Logger.info('Reboot Successful - Port :: ' + str(port) + ' in PDU :: ' + str(ip))
         except Exception as err:
             self._Logger.error('Error while Rebooting Port :: ' + str(port)
@@ -168,6 +318,90 @@ class RaritanLibraryManager(BaseObject, ABC):
             raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
         return output
 
+    def _set_power_state(self, session, port, power_state):
+        outlet = session.get_outlets()[port - 1]
+        outlet.setPowerState(pdumodel.Outlet.PowerState(power_state))
+
+    @driver_metrics('raritan', 'power_on_ports')
+    def power_on_ports(self, ip, username, password, ports, output):
+        """
+        Power On several ports/outlets with a single setMultipleOutletPowerStates call
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power On request for every port
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_multiple_power_states(session, ports, 1))
+            self._Logger.info('Powered ON Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering ON Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_ON_PORT, str(err))
+        return output
+
+    @driver_metrics('raritan', 'power_off_ports')
+    def power_off_ports(self, ip, username, password, ports, output):
+        """
+        Power Off several ports/outlets with a single setMultipleOutletPowerStates call
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Power Off request for every port
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_multiple_power_states(session, ports, 0))
+            self._Logger.info('Powered Off Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Powering Off Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_POWERING_OFF_PORT, str(err))
+        return output
+
+    @driver_metrics('raritan', 'reboot_ports')
+    def reboot_ports(self, ip, username, password, ports, output):
+        """
+        Reboots several ports/outlets with setMultipleOutletPowerStates calls
+        @param ip: PDU IP
+        @param username: PDU Username
+        @param password: PDU password
+        @param ports: Sorted list of Port/Outlet numbers
+        @param output: The default output
+        @return: Status of Reboot request for every port
+        """
+        try:
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_multiple_power_states(session, ports, 0))
+            time.sleep(self.reboot_off_time_in_secs)
+            self._session_pool.run(ip, username, password,
+                                   lambda session: self._set_multiple_power_states(session, ports, 1))
+            self._Logger.info('Reboot Successful - Ports :: ' + str(ports) + ' in PDU :: ' + str(ip))
+        except Exception as err:
+            self._Logger.error('Error while Rebooting Ports :: ' + str(ports)
+                               + ' in PDU :: ' + str(ip)
+                               + ' Error :: ' + str(err))
+            self._Logger.error(traceback.print_exc())
+            raise PduLibraryException(ERROR_WHILE_REBOOTING_PORT, str(err))
+        return output
+
+    def _set_multiple_power_states(self, session, ports, power_state):
+        # Outlets are addressed by their 0 based index
+        return_code = session.pdu.setMultipleOutletPowerStates([port - 1 for port in ports],
+                                                               pdumodel.Outlet.PowerState(power_state),
+                                                               False)
+        if return_code != 0:
+            raise Exception('setMultipleOutletPowerStates failed with code ' + str(return_code))
+
     def get_data_from_meta_data(self, metadata):
         output = dict()
         try:
@@ -0,0 +1,268 @@
+import threading
+import time
+import traceback
+
+from raritan import rpc
+from raritan.rpc import BulkRequestHelper, pdumodel, session
+
+from PduLibrary.Common.BaseObject import BaseObject
+from PduLibrary.Common.PhaseTimer import PhaseTimer
+from PduLibrary.Common.Singleton import Singleton
+from PduLibrary.Errors.ErrorCodes import RARITAN_SESSION_POOL_EXHAUSTED
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class RaritanSession(object):
+    """
+    An authenticated JSON-RPC session to a single Raritan PDU
+    """
+    max_requests_per_bulk = 100
+
+    def __init__(self, ip, username, password, agent, session_manager, rpc_counter):
+        self.ip = ip
+        self.username = username
+        self.password = password
+        self.agent = agent
+        self.session_manager = session_manager
+        self.pdu = pdumodel.Pdu("/model/pdu/0", agent)
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.last_checked_at = self.created_at
+        self.outlets = None
+
+        json_rpc = agent.json_rpc
+
+        def counted_json_rpc(*args, **kwargs):
+            rpc_counter()
+            with PhaseTimer.phase('rpc'):
+                return json_rpc(*args, **kwargs)
+
+        agent.json_rpc = counted_json_rpc
+
+    def get_outlets(self):
+        """
+        Gets the outlet handles of the PDU, fetched once per session
+        """
+        if self.outlets is None:
+            self.outlets = self.pdu.getOutlets()
+        return self.outlets
+
+    def bulk(self, calls):
+        """
+        Performs many RPC calls in as few round trips as possible
+        @param calls: List of (bound RPC method, arguments...) tuples
+        @return: The results of the calls, in order
+        """
+        results = []
+        bulk_helper = BulkRequestHelper(self.agent)
+        for index in range(0, len(calls), self.max_requests_per_bulk):
+            bulk_helper.clear()
+            for call in calls[index:index + self.max_requests_per_bulk]:
+                bulk_helper.add_request(*call)
+            results.extend(bulk_helper.perform_bulk(raise_subreq_failure=True))
+        return results
+
+
+class RaritanSessionPool(BaseObject, Singleton):
+    """
+    Keeps authenticated Raritan JSON-RPC sessions alive between calls, keyed by (ip, username)
+    """
+    default_max_sessions_per_host = 4
+    default_idle_timeout_in_secs = 300
+    default_health_check_interval_in_secs = 60
+    default_acquire_timeout_in_secs = 30
+    default_rpc_scheme = 'https'
+
+    def __init__(self,
+                 max_sessions_per_host=None,
+                 idle_timeout_in_secs=None,
+                 health_check_interval_in_secs=None,
+                 acquire_timeout_in_secs=None,
+                 rpc_scheme=None):
+        """
+        Initializes the class
+        @param max_sessions_per_host: Maximum number of sessions open at the same time against one PDU
+        @param idle_timeout_in_secs: Idle sessions older than this are logged out and dropped
+        @param health_check_interval_in_secs: Idle sessions older than this are probed before being reused
+        @param acquire_timeout_in_secs: Time to wait for a free session slot of a PDU
+        @param rpc_scheme: https, or http for PDUs (and simulators) serving JSON-RPC without TLS
+        """
+        BaseObject.__init__(self)
+        self._max_sessions_per_host = max_sessions_per_host or self.default_max_sessions_per_host
+        self._idle_timeout_in_secs = idle_timeout_in_secs or self.default_idle_timeout_in_secs
+        self._health_check_interval_in_secs = \
+            health_check_interval_in_secs or self.default_health_check_interval_in_secs
+        self._acquire_timeout_in_secs = acquire_timeout_in_secs or self.default_acquire_timeout_in_secs
+        self._rpc_scheme = rpc_scheme or self.default_rpc_scheme
+
+        self._lock = threading.Lock()
+        self._idle_sessions = dict()
+        self._host_slots = dict()
+        self._last_eviction_at = time.monotonic()
+        self._rpc_count = 0
+
+    def run(self, ip, username, password, operation):
+        """
+        Runs an operation on a pooled session of the PDU
+        The operation is retried once on a freshly authenticated session if the pooled one was rejected
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @param operation: Callable taking a RaritanSession
+        @return: The value returned by the operation
+        """
+        pdu_session = self.acquire(ip, username, password)
+        try:
+            try:
+                result = operation(pdu_session)
+            except rpc.HttpException as err:
+                self._Logger.info('Session to PDU :: ' + str(ip) + ' rejected, re-authenticating :: ' + str(err))
+                self._close_session(pdu_session)
+                pdu_session = None
+                pdu_session = self._open_session(ip, username, password)
+                result = operation(pdu_session)
+        except Exception:
+            if pdu_session is not None:
+                self._close_session(pdu_session)
+            self._get_host_slots(ip).release()
+            raise
+        self.release(pdu_session)
+        return result
+
+    def acquire(self, ip, username, password):
+        """
+        Takes a session of the PDU out of the pool, opening a new one if none is idle
+        @param ip: IP of PDU
+        @param username: Username of PDU
+        @param password: Password of PDU
+        @return: RaritanSession
+        """
+        self._evict_idle_sessions()
+
+        with PhaseTimer.phase('wait'):
+            acquired = self._get_host_slots(ip).acquire(timeout=self._acquire_timeout_in_secs)
+        if not acquired:
+            raise PduLibraryException(RARITAN_SESSION_POOL_EXHAUSTED, str(ip))
+
+        try:
+            while True:
+                with self._lock:
+                    idle_sessions = self._idle_sessions.get((ip, username))
+                    pdu_session = idle_sessions.pop() if idle_sessions else None
+
+                if pdu_session is None:
+                    return self._open_session(ip, username, password)
+
+                if pdu_session.password != password:
+                    self._close_session(pdu_session)
+                    continue
+
+                if self._is_healthy(pdu_session):
+                    return pdu_session
+
+                self._close_session(pdu_session)
+        except Exception:
+            self._get_host_slots(ip).release()
+            raise
+
+    def release(self, pdu_session):
+        """
+        Returns a healthy session to the pool
+        @param pdu_session: RaritanSession taken with acquire()
+        """
+        pdu_session.last_used_at = time.monotonic()
+        with self._lock:
+            self._idle_sessions.setdefault((pdu_session.ip, pdu_session.username), []).append(pdu_session)
+        self._get_host_slots(pdu_session.ip).release()
+
+    def get_rpc_count(self):
+        """
+        Gets the number of JSON-RPC round trips made through pooled sessions, bulk requests counting as one
+        """
+        return self._rpc_count
+
+    def close_all(self):
+        """
+        Logs out and drops every idle session
+        """
+        with self._lock:
+            idle_sessions = [pdu_session for sessions in self._idle_sessions.values() for pdu_session in sessions]
+            self._idle_sessions.clear()
+
+        for pdu_session in idle_sessions:
+            self._close_session(pdu_session)
+
+    def _get_host_slots(self, ip):
+        with self._lock:
+            if ip not in self._host_slots:
+                self._host_slots[ip] = threading.BoundedSemaphore(self._max_sessions_per_host)
+            return self._host_slots[ip]
+
+    def _open_session(self, ip, username, password):
+        """
+        Authenticates against the PDU and switches the agent to token authentication
+        """
+        agent = rpc.Agent(self._rpc_scheme, ip, username, password)
+        session_manager = session.SessionManager("/session", agent)
+        # Connecting, the TLS handshake and the authentication all happen within the first request
+        with PhaseTimer.phase('login'):
+            _, token = session_manager.newSession()
+        agent.set_auth_token(token)
+        self._Logger.debug('Opened session to PDU :: ' + str(ip))
+        return RaritanSession(ip, username, password, agent, session_manager, self._count_rpc)
+
+    def _count_rpc(self):
+        with self._lock:
+            self._rpc_count += 1
+
+    def _close_session(self, pdu_session):
+        try:
+            pdu_session.session_manager.closeCurrentSession()
+            self._Logger.debug('Closed session to PDU :: ' + str(pdu_session.ip))
+        except Exception as err:
+            self._Logger.debug('Ignoring error while closing session to PDU :: ' + str(pdu_session.ip)
+                               + ' Error :: ' + str(err))
+
+    def _is_healthy(self, pdu_session):
+        """
+        Probes sessions which were not checked recently
+        """
+        now = time.monotonic()
+        if now - pdu_session.last_checked_at < self._health_check_interval_in_secs:
+            return True
+
+        try:
+            with PhaseTimer.phase('health_check'):
+                pdu_session.session_manager.touchCurrentSession(False)
+            pdu_session.last_checked_at = now
+            return True
+        except Exception as err:
+            self._Logger.info('Health check of session to PDU :: ' + str(pdu_session.ip)
+                              + ' failed :: ' + str(err))
+            self._Logger.debug(traceback.format_exc())
+            return False
+
+    def _evict_idle_sessions(self):
+        """
+        Drops sessions which were idle longer than the idle timeout
+        The sweep runs at most once per health check interval
+        """
+        now = time.monotonic()
+        expired_sessions = []
+        with self._lock:
+            if now - self._last_eviction_at < self._health_check_interval_in_secs:
+                return
+            self._last_eviction_at = now
+
+            for key in list(self._idle_sessions):
+                sessions = self._idle_sessions[key]
+                expired_sessions.extend(
+                    pdu_session for pdu_session in sessions
+                    if now - pdu_session.last_used_at >= self._idle_timeout_in_secs)
+                sessions[:] = [pdu_session for pdu_session in sessions
+                               if now - pdu_session.last_used_at < self._idle_timeout_in_secs]
+                if not sessions:
+                    del self._idle_sessions[key]
+
+        for pdu_session in expired_sessions:
+            self._close_session(pdu_session)
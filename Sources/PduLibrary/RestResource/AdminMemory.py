@@ -0,0 +1,163 @@
+from flask import request
+from flask_restful import Resource, reqparse, fields
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Core.Profiler import Profiler
+from PduLibrary.Errors.ErrorCodes import ADMIN_ACCESS_DENIED, MEMORY_SNAPSHOT_NOT_FOUND
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+@swagger.model
+class AdminMemoryModel:
+    resource_fields = {
+        'action': fields.String(),
+        'snapshot_id': fields.Integer,
+        'frames': fields.Integer,
+        'limit': fields.Integer
+    }
+
+    required = ["action"]
+
+
+class AdminMemory(Resource):
+    STATUS_OK = 200
+    FORBIDDEN = 403
+    NOT_FOUND = 404
+    INTERNAL_SERVER_ERROR = 500
+
+    actions = ('snapshot', 'diff', 'stop')
+
+    def __init__(self):
+        self._profiler = Profiler.get_instance()
+        self._arg_parser = reqparse.RequestParser()
+        self._arg_parser.add_argument(
+            'action',
+            help='snapshot to take a snapshot, diff to compare a new snapshot to an earlier one, stop to stop tracing',
+            required=True,
+            location='json',
+            dest='action',
+            type=str,
+            choices=self.actions
+        )
+        self._arg_parser.add_argument(
+            'snapshot_id',
+            help='Snapshot to diff against, defaults to the latest',
+            required=False,
+            location='json',
+            dest='snapshot_id',
+            type=int
+        )
+        self._arg_parser.add_argument(
+            'frames',
+            help='Number of frames kept per allocation when tracemalloc starts',
+            required=False,
+            location='json',
+            dest='frames',
+            type=int,
+            default=1
+        )
+        self._arg_parser.add_argument(
+            'limit',
+            help='Maximum number of allocation sites returned',
+            required=False,
+            location='json',
+            dest='limit',
+            type=int
+        )
+
+    @swagger.operation(
+        notes='Admin API to get the tracemalloc status. Requires the X-Admin-Token header',
+        nickname='admin_memory_status',
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 403,
+                "message": "Missing or invalid admin token"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self):
+        return self._run(lambda: self._profiler.get_memory_status())
+
+    @swagger.operation(
+        notes='Admin API to take and diff tracemalloc snapshots. Requires the X-Admin-Token header',
+        nickname='admin_memory',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "Admin API to take and diff tracemalloc snapshots",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': AdminMemoryModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 403,
+                "message": "Missing or invalid admin token"
+            },
+            {
+                "code": 404,
+                "message": "Snapshot not found"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        def run_action():
+            args = self._arg_parser.parse_args()
+            if args.action == 'snapshot':
+                return self._profiler.take_snapshot(args.frames, args.limit)
+            if args.action == 'diff':
+                return self._profiler.compare_to_snapshot(args.snapshot_id, args.limit)
+            return self._profiler.stop_tracing()
+        return self._run(run_action)
+
+    def _run(self, operation):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            self._profiler.check_admin_token(request.headers.get(Profiler.admin_token_header))
+            return_dict['Data'] = operation()
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            if e.get_error_code() == ADMIN_ACCESS_DENIED:
+                return_status_code = self.FORBIDDEN
+            elif e.get_error_code() == MEMORY_SNAPSHOT_NOT_FOUND:
+                return_status_code = self.NOT_FOUND
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = GENERIC_ERR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = GENERIC_ERR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
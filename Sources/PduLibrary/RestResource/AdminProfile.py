@@ -0,0 +1,125 @@
+from flask import request
+from flask_restful import Resource, reqparse, fields
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Common.GenericError import GENERIC_ERR
+from PduLibrary.Core.Profiler import Profiler
+from PduLibrary.Errors.ErrorCodes import ADMIN_ACCESS_DENIED, PROFILING_IN_PROGRESS, INVALID_PROFILING_REQUEST
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+@swagger.model
+class AdminProfileModel:
+    resource_fields = {
+        'duration': fields.Float,
+        'sort': fields.String(),
+        'limit': fields.Integer
+    }
+
+    required = ["duration"]
+
+
+class AdminProfile(Resource):
+    STATUS_OK = 200
+    BAD_REQUEST = 400
+    FORBIDDEN = 403
+    CONFLICT = 409
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._profiler = Profiler.get_instance()
+        self._arg_parser = reqparse.RequestParser()
+        self._arg_parser.add_argument(
+            'duration',
+            help='Length of the profiling window in secs',
+            required=True,
+            location='json',
+            dest='duration_in_secs',
+            type=float
+        )
+        self._arg_parser.add_argument(
+            'sort',
+            help='pstats sort key, e.g. cumulative, tottime, ncalls',
+            required=False,
+            location='json',
+            dest='sort_by',
+            type=str,
+            default='cumulative'
+        )
+        self._arg_parser.add_argument(
+            'limit',
+            help='Maximum number of functions returned',
+            required=False,
+            location='json',
+            dest='limit',
+            type=int
+        )
+
+    @swagger.operation(
+        notes='Admin API to profile with cProfile the requests handled during the next duration secs. '
+              'Requires the X-Admin-Token header',
+        nickname='admin_profile',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "Admin API to profile the live request handling",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': AdminProfileModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 403,
+                "message": "Missing or invalid admin token"
+            },
+            {
+                "code": 409,
+                "message": "Another profiling window is already open"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            self._profiler.check_admin_token(request.headers.get(Profiler.admin_token_header))
+            args = self._arg_parser.parse_args()
+            return_dict['Data'] = self._profiler.profile_requests(args.duration_in_secs, args.sort_by, args.limit)
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            if e.get_error_code() == ADMIN_ACCESS_DENIED:
+                return_status_code = self.FORBIDDEN
+            elif e.get_error_code() == PROFILING_IN_PROGRESS:
+                return_status_code = self.CONFLICT
+            elif e.get_error_code() == INVALID_PROFILING_REQUEST:
+                return_status_code = self.BAD_REQUEST
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = GENERIC_ERR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = GENERIC_ERR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
@@ -0,0 +1,181 @@
+import json
+
+from flask import Response
+from flask_restful import Resource
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Common.RequestSchema import RequestSchema
+from PduLibrary.Controller.EventBroker import EventBroker, SensorThreshold
+from PduLibrary.Errors.ErrorCodes import TOO_MANY_EVENT_SUBSCRIBERS
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+class Events(Resource):
+    """
+    Server-Sent Events stream of outlet power state changes, power operation results and sensor threshold
+    crossings, see EventBroker
+    Every event is sent with its id, its type as the SSE event name and the event itself, as JSON, as data. A
+    comment is sent when nothing happened for heartbeat_interval_in_secs, so that proxies keep the connection and
+    disconnected clients are noticed. Events are not replayed on reconnection, read the current state again.
+    Not available in the prefork serving mode, whose worker processes each see their own events only.
+    """
+    STATUS_OK = 200
+    SERVICE_UNAVAILABLE = 503
+    INTERNAL_SERVER_ERROR = 500
+
+    heartbeat_interval_in_secs = 15
+    reconnection_delay_in_millisecs = 3000
+
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
+            'ip',
+            help='IP of a PDU to get events of, every PDU by default',
+            required=False,
+            location='args',
+            dest='ips',
+            type=str,
+            action='append'
+        )
+        request_schema.add_argument(
+            'port',
+            help='Port Number to get events of, every port by default',
+            required=False,
+            location='args',
+            dest='ports',
+            type=int,
+            action='append'
+        )
+        request_schema.add_argument(
+            'event',
+            help='Event type to get, one of %s, every type by default' % ', '.join(EventBroker.event_types),
+            required=False,
+            location='args',
+            dest='event_types',
+            type=EventBroker.parse_event_type,
+            action='append'
+        )
+        request_schema.add_argument(
+            'threshold',
+            help='Sensor threshold raising sensor_threshold events, e.g. current>8 or voltage<200',
+            required=False,
+            location='args',
+            dest='thresholds',
+            type=SensorThreshold.parse,
+            action='append'
+        )
+        return request_schema.compile()
+
+    @staticmethod
+    def format_event(event):
+        """
+        Formats an event in the text/event-stream format
+        """
+        return ('id: %d\nevent: %s\ndata: %s\n\n' % (event['id'], event['event'], json.dumps(event))).encode('utf-8')
+
+    @swagger.operation(
+        notes='API to stream outlet power state changes, power operation results and sensor threshold crossings '
+              'as Server-Sent Events',
+        nickname='events',
+        parameters=[
+            {
+                'name': 'ip',
+                'description': "IP of a PDU to get events of, every PDU by default",
+                'required': False,
+                'allowMultiple': True,
+                'dataType': 'string',
+                'paramType': 'query'
+            },
+            {
+                'name': 'port',
+                'description': "Port Number to get events of, every port by default",
+                'required': False,
+                'allowMultiple': True,
+                'dataType': 'integer',
+                'paramType': 'query'
+            },
+            {
+                'name': 'event',
+                'description': "Event type to get: power_state, power_operation or sensor_threshold",
+                'required': False,
+                'allowMultiple': True,
+                'dataType': 'string',
+                'paramType': 'query'
+            },
+            {
+                'name': 'threshold',
+                'description': "Sensor threshold raising sensor_threshold events, e.g. current>8 or voltage<200",
+                'required': False,
+                'allowMultiple': True,
+                'dataType': 'string',
+                'paramType': 'query'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success, text/event-stream"
+            },
+            {
+                "code": 503,
+                "message": "Too many subscribers"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+
+        try:
+            args = self._request_schema.parse()
+            subscription = self._pdu_library_manager.subscribe_events(args.ips, args.ports, args.event_types,
+                                                                       args.thresholds)
+            return Response(self._stream(subscription), mimetype='text/event-stream', headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            })
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            if e.get_error_code() == TOO_MANY_EVENT_SUBSCRIBERS:
+                return_status_code = self.SERVICE_UNAVAILABLE
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
+
+    def _stream(self, subscription):
+        try:
+            yield ('retry: %d\n\n' % self.reconnection_delay_in_millisecs).encode('utf-8')
+            while not subscription.is_closed():
+                event = subscription.get(self.heartbeat_interval_in_secs)
+                if event is None:
+                    yield b': keep-alive\n\n'
+                else:
+                    yield self.format_event(event)
+        finally:
+            self._pdu_library_manager.unsubscribe_events(subscription)
@@ -0,0 +1,131 @@
+from flask_restful import Resource, reqparse, fields
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+@swagger.model
+class FleetTargetModel:
+    resource_fields = {
+        'manufacturer': fields.String(),
+        'ip': fields.String(),
+        'username': fields.String(),
+        'password': fields.String(),
+        'port': fields.Integer,
+        'ports': fields.List(fields.Integer)
+    }
+
+    required = ["manufacturer", "ip", "username", "password"]
+
+
+@swagger.model
+@swagger.nested(targets=FleetTargetModel.__name__)
+class FleetOperationModel:
+    resource_fields = {
+        'operation': fields.String(),
+        'targets': fields.List(fields.Nested(FleetTargetModel.resource_fields)),
+        'max_concurrency': fields.Integer,
+        'max_concurrency_per_pdu': fields.Integer
+    }
+
+    required = ["operation", "targets"]
+
+
+class FleetOperation(Resource):
+    STATUS_OK = 200
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._pdu_library_manager = PduLibraryManager.get_instance()
+        self._arg_parser = reqparse.RequestParser()
+        self._arg_parser.add_argument(
+            'operation',
+            help='Operation - get_pdu_info/get_port_info/power_on/power_off/reboot or their _ports variants',
+            required=True,
+            location='json',
+            dest='operation',
+            type=str
+        )
+        self._arg_parser.add_argument(
+            'targets',
+            help='List of PDUs with manufacturer, ip, username, password and port/ports',
+            required=True,
+            location='json',
+            dest='targets',
+            type=dict,
+            action='append'
+        )
+        self._arg_parser.add_argument(
+            'max_concurrency',
+            help='Maximum number of targets in flight at the same time',
+            required=False,
+            location='json',
+            dest='max_concurrency',
+            type=int
+        )
+        self._arg_parser.add_argument(
+            'max_concurrency_per_pdu',
+            help='Maximum number of targets in flight against the same PDU',
+            required=False,
+            location='json',
+            dest='max_concurrency_per_pdu',
+            type=int
+        )
+
+    @swagger.operation(
+        notes='API to run the same operation against many PDUs concurrently',
+        nickname='fleet',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to run an operation against a list of PDUs",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': FleetOperationModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            args = self._arg_parser.parse_args()
+            response = self._pdu_library_manager.run_fleet_operation(args.operation,
+                                                                     args.targets,
+                                                                     args.max_concurrency,
+                                                                     args.max_concurrency_per_pdu)
+            return_dict['Data'] = response
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
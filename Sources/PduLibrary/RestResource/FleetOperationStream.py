@@ -0,0 +1,134 @@
+from flask import Response
+from flask_restful import Resource
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Common.RequestSchema import RequestSchema
+from PduLibrary.Core.ResponseEncoder import ResponseEncoder
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+from PduLibrary.RestResource.FleetOperation import FleetOperationModel
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+class FleetOperationStream(Resource):
+    """
+    Streaming variant of /v1/fleet: the result of every target is written as one line of NDJSON as soon as it
+    completes, with chunked transfer encoding, instead of one document once the whole fleet is done
+    Results are never accumulated, and FleetExecutor only starts new targets as the client reads, so the results
+    held in memory are bounded by the concurrency of the run. The request body, targets included, is still parsed
+    whole, so memory grows with the size of the fleet by its targets. The stream is not compressed.
+    """
+    STATUS_OK = 200
+    INTERNAL_SERVER_ERROR = 500
+
+    NDJSON = 'application/x-ndjson'
+
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
+            'operation',
+            help='Operation - get_pdu_info/get_port_info/power_on/power_off/reboot or their _ports variants',
+            required=True,
+            location='json',
+            dest='operation',
+            type=str
+        )
+        request_schema.add_argument(
+            'targets',
+            help='List of PDUs with manufacturer, ip, username, password and port/ports',
+            required=True,
+            location='json',
+            dest='targets',
+            type=dict,
+            action='append'
+        )
+        request_schema.add_argument(
+            'max_concurrency',
+            help='Maximum number of targets in flight at the same time',
+            required=False,
+            location='json',
+            dest='max_concurrency',
+            type=int
+        )
+        request_schema.add_argument(
+            'max_concurrency_per_pdu',
+            help='Maximum number of targets in flight against the same PDU',
+            required=False,
+            location='json',
+            dest='max_concurrency_per_pdu',
+            type=int
+        )
+        return request_schema.compile()
+
+    @swagger.operation(
+        notes='API to run the same operation against many PDUs concurrently, streaming one NDJSON line per PDU '
+              'as it completes',
+        nickname='fleet_stream',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to run an operation against a list of PDUs",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': FleetOperationModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success, application/x-ndjson of results with target, ErrorCode, Message, Data and "
+                           "latency"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+
+        try:
+            args = self._request_schema.parse()
+            results = self._pdu_library_manager.iter_fleet_operation(args.operation,
+                                                                     args.targets,
+                                                                     args.max_concurrency,
+                                                                     args.max_concurrency_per_pdu)
+            return Response(self._stream(results), mimetype=self.NDJSON, headers={
+                'Cache-Control': 'no-store',
+                'X-Accel-Buffering': 'no'
+            })
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
+
+    def _stream(self, results):
+        try:
+            for result in results:
+                yield ResponseEncoder.to_json(result) + b'\n'
+        finally:
+            # Stops starting targets when the client goes away, the targets in flight complete on their own
+            results.close()
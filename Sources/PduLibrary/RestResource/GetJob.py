@@ -0,0 +1,73 @@
+from flask_restful import Resource
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+from PduLibrary.Errors.ErrorCodes import JOB_NOT_FOUND
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class GetJob(Resource):
+    STATUS_OK = 200
+    NOT_FOUND = 404
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._pdu_library_manager = PduLibraryManager.get_instance()
+
+    @swagger.operation(
+        notes='API to get the status of a job submitted with async set',
+        nickname='get_job',
+        parameters=[
+            {
+                'name': 'job_id',
+                'description': "Id of the job",
+                'required': True,
+                'allowMultiple': False,
+                'dataType': 'string',
+                'paramType': 'path'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 404,
+                "message": "Job not found"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self, job_id):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            return_dict['Data'] = self._pdu_library_manager.get_job(job_id)
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            if e.get_error_code() == JOB_NOT_FOUND:
+                return_status_code = self.NOT_FOUND
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
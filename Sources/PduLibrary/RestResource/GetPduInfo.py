@@ -1,7 +1,8 @@
-from flask_restful import Resource, reqparse, fields
+from flask_restful import Resource, fields
 from flask_restful_swagger import swagger
 from werkzeug.exceptions import BadRequest
 
+from PduLibrary.Common.RequestSchema import RequestSchema
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
 
 from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
@@ -13,7 +14,8 @@ class GetPduInfoModel:
         'manufacturer': fields.String(),
         'ip': fields.String(),
         'username': fields.String(),
-        'password': fields.String()
+        'password': fields.String(),
+        'max_age': fields.Float
     }
 
     required = ["manufacturer", "ip", "username", "password"]
@@ -23,10 +25,17 @@ class GetPduInfo(Resource):
     STATUS_OK = 200
     INTERNAL_SERVER_ERROR = 500
 
-    def __init__(self):
-        self._pdu_library_manager = PduLibraryManager.get_instance()
-        self._arg_parser = reqparse.RequestParser()
-        self._arg_parser.add_argument(
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
             'manufacturer',
             help='Manufacturer',
             required=True,
@@ -34,7 +43,7 @@ class GetPduInfo(Resource):
             dest='manufacturer',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'ip',
             help='IP',
             required=True,
@@ -42,7 +51,7 @@ class GetPduInfo(Resource):
             dest='ip',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'username',
             help='UserName',
             required=True,
@@ -50,7 +59,7 @@ class GetPduInfo(Resource):
             dest='username',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'password',
             help='Password',
             required=True,
@@ -58,6 +67,15 @@ class GetPduInfo(Resource):
             dest='password',
             type=str
         )
+        request_schema.add_argument(
+            'max_age',
+            help='Maximum age in secs of a cached result, 0 to read the device',
+            required=False,
+            location='json',
+            dest='max_age',
+            type=float
+        )
+        return request_schema.compile()
 
     @swagger.operation(
         notes='API to fetch the metadata of PDU',
@@ -91,11 +109,12 @@ class GetPduInfo(Resource):
         return_status_code = self.STATUS_OK
 
         try:
-            args = self._arg_parser.parse_args()
+            args = self._request_schema.parse()
             response = self._pdu_library_manager.get_pdu_info(args.manufacturer,
                                                               args.ip,
                                                               args.username,
-                                                              args.password)
+                                                              args.password,
+                                                              args.max_age)
             return_dict['Data'] = response
         except PduLibraryException as e:
             return_dict['ErrorCode'] = e.get_error_code()
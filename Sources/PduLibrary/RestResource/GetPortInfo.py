@@ -1,7 +1,8 @@
-from flask_restful import Resource, reqparse, fields
+from flask_restful import Resource, fields
 from flask_restful_swagger import swagger
 from werkzeug.exceptions import BadRequest
 
+from PduLibrary.Common.RequestSchema import RequestSchema
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
 
 from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
@@ -14,7 +15,8 @@ class GetPortInfoModel:
         'ip': fields.String(),
         'username': fields.String(),
         'password': fields.String(),
-        'port': fields.Integer
+        'port': fields.Integer,
+        'max_age': fields.Float
     }
 
     required = ["manufacturer", "ip", "username", "password", "port"]
@@ -24,10 +26,17 @@ class GetPortInfo(Resource):
     STATUS_OK = 200
     INTERNAL_SERVER_ERROR = 500
 
-    def __init__(self):
-        self._pdu_library_manager = PduLibraryManager.get_instance()
-        self._arg_parser = reqparse.RequestParser()
-        self._arg_parser.add_argument(
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
             'manufacturer',
             help='Manufacturer',
             required=True,
@@ -35,7 +44,7 @@ class GetPortInfo(Resource):
             dest='manufacturer',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'ip',
             help='IP',
             required=True,
@@ -43,7 +52,7 @@ class GetPortInfo(Resource):
             dest='ip',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'username',
             help='UserName',
             required=True,
@@ -51,7 +60,7 @@ class GetPortInfo(Resource):
             dest='username',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'password',
             help='Password',
             required=True,
@@ -59,7 +68,7 @@ class GetPortInfo(Resource):
             dest='password',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'port',
             help='Port Number',
             required=True,
@@ -67,6 +76,15 @@ class GetPortInfo(Resource):
             dest='port',
             type=int
         )
+        request_schema.add_argument(
+            'max_age',
+            help='Maximum age in secs of a cached result, 0 to read the device',
+            required=False,
+            location='json',
+            dest='max_age',
+            type=float
+        )
+        return request_schema.compile()
 
     @swagger.operation(
         notes='API to fetch the metadata of Port',
@@ -100,12 +118,13 @@ class GetPortInfo(Resource):
         return_status_code = self.STATUS_OK
 
         try:
-            args = self._arg_parser.parse_args()
+            args = self._request_schema.parse()
             response = self._pdu_library_manager.get_port_info(args.manufacturer,
                                                                args.ip,
                                                                args.username,
                                                                args.password,
-                                                               args.port)
+                                                               args.port,
+                                                               args.max_age)
             return_dict['Data'] = response
         except PduLibraryException as e:
             return_dict['ErrorCode'] = e.get_error_code()
@@ -0,0 +1,134 @@
+from flask_restful import Resource, reqparse, fields
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Errors.ErrorCodes import SENSOR_HISTORY_NOT_FOUND
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+@swagger.model
+class GetSensorHistoryModel:
+    resource_fields = {
+        'ip': fields.String(),
+        'port': fields.Integer,
+        'start': fields.Float,
+        'end': fields.Float,
+        'bucket_in_secs': fields.Float
+    }
+
+    required = ["ip", "port"]
+
+
+class GetSensorHistory(Resource):
+    STATUS_OK = 200
+    NOT_FOUND = 404
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._pdu_library_manager = PduLibraryManager.get_instance()
+        self._arg_parser = reqparse.RequestParser()
+        self._arg_parser.add_argument(
+            'ip',
+            help='IP',
+            required=True,
+            location='json',
+            dest='ip',
+            type=str
+        )
+        self._arg_parser.add_argument(
+            'port',
+            help='Port Number',
+            required=True,
+            location='json',
+            dest='port',
+            type=int
+        )
+        self._arg_parser.add_argument(
+            'start',
+            help='Epoch secs of the first sample',
+            required=False,
+            location='json',
+            dest='start',
+            type=float
+        )
+        self._arg_parser.add_argument(
+            'end',
+            help='Epoch secs of the last sample',
+            required=False,
+            location='json',
+            dest='end',
+            type=float
+        )
+        self._arg_parser.add_argument(
+            'bucket_in_secs',
+            help='Downsample to min/max/mean per bucket of this many secs',
+            required=False,
+            location='json',
+            dest='bucket_in_secs',
+            type=float
+        )
+
+    @swagger.operation(
+        notes='API to fetch the sensor readings of a Port recorded by get_port_info',
+        nickname='sensor_history',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to fetch the sensor readings of a Port over time",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': GetSensorHistoryModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 404,
+                "message": "No history for the Port"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            args = self._arg_parser.parse_args()
+            response = self._pdu_library_manager.get_sensor_history(args.ip,
+                                                                    args.port,
+                                                                    args.start,
+                                                                    args.end,
+                                                                    args.bucket_in_secs)
+            return_dict['Data'] = response
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            if e.get_error_code() == SENSOR_HISTORY_NOT_FOUND:
+                return_status_code = self.NOT_FOUND
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
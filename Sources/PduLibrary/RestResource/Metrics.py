@@ -0,0 +1,37 @@
+from flask import Response
+from flask_restful import Resource
+from flask_restful_swagger import swagger
+
+from PduLibrary.Common.MetricsRegistry import MetricsRegistry
+from PduLibrary.Core.ServingMode import ServingMode
+from PduLibrary.Errors.ErrorCodes import UNAVAILABLE_IN_PREFORK_WORKER
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+
+class Metrics(Resource):
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._metrics = MetricsRegistry.get_instance()
+
+    @swagger.operation(
+        notes='API to scrape the latency histograms, in flight gauges and error counters in Prometheus format',
+        nickname='metrics',
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 500,
+                "message": "Not available in the prefork serving mode, every worker process counts on its own"
+            }
+        ]
+    )
+    def get(self):
+        if ServingMode.is_prefork_worker():
+            return Response(PduLibraryException(UNAVAILABLE_IN_PREFORK_WORKER,
+                                                'The metrics registry').get_error_message(),
+                            status=self.INTERNAL_SERVER_ERROR, mimetype='text/plain')
+        return Response(self._metrics.render(), mimetype=None, content_type=self.CONTENT_TYPE)
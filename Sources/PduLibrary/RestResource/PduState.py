@@ -0,0 +1,200 @@
+import hashlib
+import hmac
+import json
+
+from flask import Response, request
+from flask_restful import Resource
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest, Unauthorized
+
+from PduLibrary.Common.RequestSchema import RequestSchema
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+class PduState(Resource):
+    """
+    GET variant of get_pdu_info addressed by PDU, for pollers and HTTP caches
+    The credentials come from HTTP Basic authentication and the manufacturer from the query string, PDUs
+    registered for polling may be read without the manufacturer when the credentials match their registration.
+    Responses are private to the credentials and carry an ETag derived from Data, requests whose
+    If-None-Match matches it get a 304 without body, and Cache-Control tells for how long Data is served as is,
+    see PduLibraryManager.get_freshness. The ETag is weak: JSON, MessagePack and their compressed forms are
+    equivalent representations of the same Data.
+    """
+    STATUS_OK = 200
+    NOT_MODIFIED = 304
+    UNAUTHORIZED = 401
+    INTERNAL_SERVER_ERROR = 500
+
+    authentication_realm = 'PduLibrary'
+
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
+            'manufacturer',
+            help='Manufacturer, optional for PDUs registered for polling',
+            required=False,
+            location='args',
+            dest='manufacturer',
+            type=str
+        )
+        request_schema.add_argument(
+            'max_age',
+            help='Maximum age in secs of a cached result, 0 to read the device',
+            required=False,
+            location='args',
+            dest='max_age',
+            type=float
+        )
+        return request_schema.compile()
+
+    @staticmethod
+    def make_etag(data):
+        """
+        Derives an entity tag from the content of a response
+        @param data: Data of the response
+        @return: The entity tag, unquoted
+        """
+        content = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    @swagger.operation(
+        notes='API to fetch the metadata of PDU, with ETag / If-None-Match support',
+        nickname='pdu_state',
+        parameters=[
+            {
+                'name': 'ip',
+                'description': "IP of PDU",
+                'required': True,
+                'allowMultiple': False,
+                'dataType': 'string',
+                'paramType': 'path'
+            },
+            {
+                'name': 'manufacturer',
+                'description': "Manufacturer, optional for PDUs registered for polling",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': 'string',
+                'paramType': 'query'
+            },
+            {
+                'name': 'max_age',
+                'description': "Maximum age in secs of a cached result, 0 to read the device",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': 'float',
+                'paramType': 'query'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 304,
+                "message": "Not modified since the ETag given in If-None-Match"
+            },
+            {
+                "code": 401,
+                "message": "No credentials, or credentials not matching the registration of the PDU"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self, ip):
+        return self._get_state(ip)
+
+    def _get_state(self, ip, port=None):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+        headers = {'Cache-Control': 'no-store'}
+
+        try:
+            args = self._request_schema.parse()
+            manufacturer, username, password = self._get_target(ip, args.manufacturer)
+            max_age = self._get_max_age(args.max_age)
+            if port is None:
+                response = self._pdu_library_manager.get_pdu_info(manufacturer, ip, username, password, max_age)
+            else:
+                response = self._pdu_library_manager.get_port_info(manufacturer, ip, username, password, port,
+                                                                   max_age)
+            freshness = self._pdu_library_manager.get_freshness(manufacturer, ip, username, password, port)
+
+            etag = self.make_etag(response)
+            headers['ETag'] = 'W/"%s"' % etag
+            headers['Cache-Control'] = 'private, max-age=%d' % freshness
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=self.NOT_MODIFIED, headers=headers)
+            return_dict['Data'] = response
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        except Unauthorized as e:
+            return_dict['ErrorCode'] = self.UNAUTHORIZED
+            return_dict['Message'] = e.description
+            return_dict['Data'] = None
+            return_status_code = e.code
+            headers['WWW-Authenticate'] = 'Basic realm="%s"' % self.authentication_realm
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code, headers
+
+    def _get_target(self, ip, manufacturer):
+        """
+        Gets the manufacturer and credentials to read a PDU with, the manufacturer defaulting to the one of its
+        polling registration when the credentials match it
+        @return: Tuple of (manufacturer, username, password)
+        """
+        authorization = request.authorization
+        if authorization is None or authorization.type != 'basic':
+            raise Unauthorized('Basic authentication with the credentials of PDU %s is required' % ip)
+        if manufacturer:
+            return manufacturer, authorization.username, authorization.password
+
+        registration = self._pdu_library_manager.get_registration(ip)
+        if registration is None:
+            raise BadRequest('Missing required parameter in the query string : manufacturer (Manufacturer)')
+        registered_manufacturer, username, password = registration
+        if not (hmac.compare_digest(str(authorization.username).encode('utf-8'), str(username).encode('utf-8'))
+                and hmac.compare_digest(str(authorization.password).encode('utf-8'), str(password).encode('utf-8'))):
+            raise Unauthorized('The credentials do not match the ones PDU %s is registered for polling with' % ip)
+        return registered_manufacturer, authorization.username, authorization.password
+
+    def _get_max_age(self, max_age):
+        """
+        Gets the maximum age of a cached result, from the query string or else from the Cache-Control header of the
+        request, no-cache reading the device
+        """
+        if max_age is not None:
+            return max_age
+        if request.cache_control.no_cache:
+            return 0
+        return request.cache_control.max_age
@@ -0,0 +1,202 @@
+from flask_restful import Resource, reqparse, fields
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Errors.ErrorCodes import PDU_NOT_REGISTERED
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+@swagger.model
+class RegisterPduModel:
+    resource_fields = {
+        'manufacturer': fields.String(),
+        'ip': fields.String(),
+        'username': fields.String(),
+        'password': fields.String(),
+        'ports': fields.List(fields.Integer)
+    }
+
+    required = ["manufacturer", "ip", "username", "password"]
+
+
+@swagger.model
+class UnregisterPduModel:
+    resource_fields = {
+        'ip': fields.String()
+    }
+
+    required = ["ip"]
+
+
+class PolledPdus(Resource):
+    STATUS_OK = 200
+    NOT_FOUND = 404
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self):
+        self._pdu_library_manager = PduLibraryManager.get_instance()
+        self._register_arg_parser = reqparse.RequestParser()
+        self._register_arg_parser.add_argument(
+            'manufacturer',
+            help='Manufacturer',
+            required=True,
+            location='json',
+            dest='manufacturer',
+            type=str
+        )
+        self._register_arg_parser.add_argument(
+            'ip',
+            help='IP',
+            required=True,
+            location='json',
+            dest='ip',
+            type=str
+        )
+        self._register_arg_parser.add_argument(
+            'username',
+            help='UserName',
+            required=True,
+            location='json',
+            dest='username',
+            type=str
+        )
+        self._register_arg_parser.add_argument(
+            'password',
+            help='Password',
+            required=True,
+            location='json',
+            dest='password',
+            type=str
+        )
+        self._register_arg_parser.add_argument(
+            'ports',
+            help='Port Numbers to poll besides the PDU information',
+            required=False,
+            location='json',
+            dest='ports',
+            type=int,
+            action='append'
+        )
+        self._unregister_arg_parser = reqparse.RequestParser()
+        self._unregister_arg_parser.add_argument(
+            'ip',
+            help='IP',
+            required=True,
+            location='json',
+            dest='ip',
+            type=str
+        )
+
+    @swagger.operation(
+        notes='API to get the state table of the PDUs polled in the background',
+        nickname='get_polled_pdus',
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self):
+        return self._run(lambda: self._pdu_library_manager.get_fleet_state())
+
+    @swagger.operation(
+        notes='API to register a PDU for background polling, its information is then served from memory',
+        nickname='register_pdu',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to register a PDU for background polling",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': RegisterPduModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        def register():
+            args = self._register_arg_parser.parse_args()
+            self._pdu_library_manager.register_pdu(args.manufacturer,
+                                                   args.ip,
+                                                   args.username,
+                                                   args.password,
+                                                   args.ports)
+        return self._run(register)
+
+    @swagger.operation(
+        notes='API to stop polling a PDU',
+        nickname='unregister_pdu',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to stop polling a PDU",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': UnregisterPduModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 404,
+                "message": "PDU not registered"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def delete(self):
+        return self._run(lambda: self._pdu_library_manager.unregister_pdu(
+            self._unregister_arg_parser.parse_args().ip))
+
+    def _run(self, operation):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            return_dict['Data'] = operation()
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            if e.get_error_code() == PDU_NOT_REGISTERED:
+                return_status_code = self.NOT_FOUND
+            else:
+                return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
@@ -0,0 +1,68 @@
+from flask_restful_swagger import swagger
+
+from PduLibrary.RestResource.PduState import PduState
+
+
+class PortState(PduState):
+    """
+    GET variant of get_port_info addressed by PDU and port, with the ETag and Cache-Control support of PduState
+    """
+
+    @swagger.operation(
+        notes='API to fetch the metadata of Port, with ETag / If-None-Match support',
+        nickname='port_state',
+        parameters=[
+            {
+                'name': 'ip',
+                'description': "IP of PDU",
+                'required': True,
+                'allowMultiple': False,
+                'dataType': 'string',
+                'paramType': 'path'
+            },
+            {
+                'name': 'port',
+                'description': "Port Number",
+                'required': True,
+                'allowMultiple': False,
+                'dataType': 'integer',
+                'paramType': 'path'
+            },
+            {
+                'name': 'manufacturer',
+                'description': "Manufacturer, optional for PDUs registered for polling",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': 'string',
+                'paramType': 'query'
+            },
+            {
+                'name': 'max_age',
+                'description': "Maximum age in secs of a cached result, 0 to read the device",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': 'float',
+                'paramType': 'query'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 304,
+                "message": "Not modified since the ETag given in If-None-Match"
+            },
+            {
+                "code": 401,
+                "message": "No credentials, or credentials not matching the registration of the PDU"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def get(self, ip, port):
+        return self._get_state(ip, port)
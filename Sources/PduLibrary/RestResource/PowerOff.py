@@ -1,7 +1,8 @@
-from flask_restful import Resource, reqparse, fields
+from flask_restful import Resource, fields, inputs
 from flask_restful_swagger import swagger
 from werkzeug.exceptions import BadRequest
 
+from PduLibrary.Common.RequestSchema import RequestSchema
 from PduLibrary.Exception.PduLibraryException import PduLibraryException
 
 from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
@@ -14,7 +15,9 @@ class PowerOffModel:
         'ip': fields.String(),
         'username': fields.String(),
         'password': fields.String(),
-        'port': fields.Integer
+        'port': fields.Integer,
+        'async': fields.Boolean,
+        'delay': fields.Float
     }
 
     required = ["manufacturer", "ip", "username", "password", "port"]
@@ -22,12 +25,20 @@ class PowerOffModel:
 
 class PowerOff(Resource):
     STATUS_OK = 200
+    STATUS_ACCEPTED = 202
     INTERNAL_SERVER_ERROR = 500
 
-    def __init__(self):
-        self._pdu_library_manager = PduLibraryManager.get_instance()
-        self._arg_parser = reqparse.RequestParser()
-        self._arg_parser.add_argument(
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
             'manufacturer',
             help='Manufacturer',
             required=True,
@@ -35,7 +46,7 @@ class PowerOff(Resource):
             dest='manufacturer',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'ip',
             help='IP',
             required=True,
@@ -43,7 +54,7 @@ class PowerOff(Resource):
             dest='ip',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'username',
             help='UserName',
             required=True,
@@ -51,7 +62,7 @@ class PowerOff(Resource):
             dest='username',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'password',
             help='Password',
             required=True,
@@ -59,7 +70,7 @@ class PowerOff(Resource):
             dest='password',
             type=str
         )
-        self._arg_parser.add_argument(
+        request_schema.add_argument(
             'port',
             help='Port Number',
             required=True,
@@ -67,6 +78,25 @@ class PowerOff(Resource):
             dest='port',
             type=int
         )
+        request_schema.add_argument(
+            'async',
+            help='Run as a job and return its id right away',
+            required=False,
+            location='json',
+            dest='run_async',
+            type=inputs.boolean,
+            default=False
+        )
+        request_schema.add_argument(
+            'delay',
+            help='Secs to wait before starting the job',
+            required=False,
+            location='json',
+            dest='delay_in_secs',
+            type=float,
+            default=0
+        )
+        return request_schema.compile()
 
     @swagger.operation(
         notes='API to Power Off a specific Port of PDU',
@@ -86,6 +116,10 @@ class PowerOff(Resource):
                 "code": 200,
                 "message": "Success"
             },
+            {
+                "code": 202,
+                "message": "Job submitted"
+            },
             {
                 "code": 500,
                 "message": "Failure"
@@ -100,12 +134,22 @@ class PowerOff(Resource):
         return_status_code = self.STATUS_OK
 
         try:
-            args = self._arg_parser.parse_args()
-            response = self._pdu_library_manager.power_off(args.manufacturer,
-                                                           args.ip,
-                                                           args.username,
-                                                           args.password,
-                                                           args.port)
+            args = self._request_schema.parse()
+            if args.run_async:
+                response = self._pdu_library_manager.submit_job('power_off',
+                                                                args.manufacturer,
+                                                                args.ip,
+                                                                args.username,
+                                                                args.password,
+                                                                args.port,
+                                                                args.delay_in_secs)
+                return_status_code = self.STATUS_ACCEPTED
+            else:
+                response = self._pdu_library_manager.power_off(args.manufacturer,
+                                                               args.ip,
+                                                               args.username,
+                                                               args.password,
+                                                               args.port)
             return_dict['Data'] = response
         except PduLibraryException as e:
             return_dict['ErrorCode'] = e.get_error_code()
@@ -0,0 +1,170 @@
+from flask_restful import Resource, fields, inputs
+from flask_restful_swagger import swagger
+from werkzeug.exceptions import BadRequest
+
+from PduLibrary.Common.RequestSchema import RequestSchema
+from PduLibrary.Exception.PduLibraryException import PduLibraryException
+
+from PduLibrary.Controller.PduLibraryManager import PduLibraryManager
+
+
+@swagger.model
+class PowerOffPortsModel:
+    resource_fields = {
+        'manufacturer': fields.String(),
+        'ip': fields.String(),
+        'username': fields.String(),
+        'password': fields.String(),
+        'ports': fields.List(fields.Integer),
+        'async': fields.Boolean,
+        'delay': fields.Float
+    }
+
+    required = ["manufacturer", "ip", "username", "password", "ports"]
+
+
+class PowerOffPorts(Resource):
+    STATUS_OK = 200
+    STATUS_ACCEPTED = 202
+    INTERNAL_SERVER_ERROR = 500
+
+    def __init__(self, pdu_library_manager=None, request_schema=None):
+        self._pdu_library_manager = pdu_library_manager or PduLibraryManager.get_instance()
+        self._request_schema = request_schema or self.build_request_schema()
+
+    @staticmethod
+    def build_request_schema():
+        """
+        Builds the request schema, once at registration, see RestServer._register_resources_v1
+        """
+        request_schema = RequestSchema()
+        request_schema.add_argument(
+            'manufacturer',
+            help='Manufacturer',
+            required=True,
+            location='json',
+            dest='manufacturer',
+            type=str
+        )
+        request_schema.add_argument(
+            'ip',
+            help='IP',
+            required=True,
+            location='json',
+            dest='ip',
+            type=str
+        )
+        request_schema.add_argument(
+            'username',
+            help='UserName',
+            required=True,
+            location='json',
+            dest='username',
+            type=str
+        )
+        request_schema.add_argument(
+            'password',
+            help='Password',
+            required=True,
+            location='json',
+            dest='password',
+            type=str
+        )
+        request_schema.add_argument(
+            'ports',
+            help='List of Port Numbers',
+            required=True,
+            location='json',
+            dest='ports',
+            type=int,
+            action='append'
+        )
+        request_schema.add_argument(
+            'async',
+            help='Run as a job and return its id right away',
+            required=False,
+            location='json',
+            dest='run_async',
+            type=inputs.boolean,
+            default=False
+        )
+        request_schema.add_argument(
+            'delay',
+            help='Secs to wait before starting the job',
+            required=False,
+            location='json',
+            dest='delay_in_secs',
+            type=float,
+            default=0
+        )
+        return request_schema.compile()
+
+    @swagger.operation(
+        notes='API to Power Off several Ports of PDU in one device session',
+        nickname='power_off_ports',
+        parameters=[
+            {
+                'name': 'body',
+                'description': "API to Power Off the specified Ports",
+                'required': False,
+                'allowMultiple': False,
+                'dataType': PowerOffPortsModel.__name__,
+                'paramType': 'body'
+            }
+        ],
+        responseMessage=[
+            {
+                "code": 200,
+                "message": "Success"
+            },
+            {
+                "code": 202,
+                "message": "Job submitted"
+            },
+            {
+                "code": 500,
+                "message": "Failure"
+            }
+        ]
+    )
+    def post(self):
+        return_dict = dict()
+        return_dict['ErrorCode'] = 0
+        return_dict['Message'] = None
+        return_dict['Data'] = None
+        return_status_code = self.STATUS_OK
+
+        try:
+            args = self._request_schema.parse()
+            if args.run_async:
+                response = self._pdu_library_manager.submit_job('power_off_ports',
+                                                                args.manufacturer,
+                                                                args.ip,
+                                                                args.username,
+                                                                args.password,
+                                                                args.ports,
+                                                                args.delay_in_secs)
+                return_status_code = self.STATUS_ACCEPTED
+            else:
+                response = self._pdu_library_manager.power_off_ports(args.manufacturer,
+                                                                     args.ip,
+                                                                     args.username,
+                                                                     args.password,
+                                                                     args.ports)
+            return_dict['Data'] = response
+        except PduLibraryException as e:
+            return_dict['ErrorCode'] = e.get_error_code()
+            return_dict['Message'] = e.get_error_message()
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        except BadRequest as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = e.code
+        except Exception as e:
+            return_dict['ErrorCode'] = self.INTERNAL_SERVER_ERROR
+            return_dict['Message'] = str(e)
+            return_dict['Data'] = None
+            return_status_code = self.INTERNAL_SERVER_ERROR
+        return return_dict, return_status_code
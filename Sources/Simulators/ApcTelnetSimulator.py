@@ -0,0 +1,130 @@
+"""
+Simulates the telnet CLI of APC PDUs, as driven by ApcSessionManager: the User Name / Password dialog, the apc>
+prompt and the olOn / olOff / olReboot commands with their E000: Success or Exxx: error replies
+"""
+import asyncio
+
+from Simulators.SimulatorBase import SimulatedPdu, FaultInjector
+
+
+class ApcTelnetSimulator(SimulatedPdu):
+    """
+    A simulated APC PDU
+    Like the real PDUs, it accepts a single telnet session at a time unless configured otherwise: further
+    connections are told so and closed.
+    """
+    prompt = b"\r\napc>"
+    default_max_sessions = 1
+    reboot_off_time_in_secs = 5
+
+    def __init__(self, host, port, config):
+        if config.max_sessions is None:
+            config.max_sessions = self.default_max_sessions
+        SimulatedPdu.__init__(self, host, port, config)
+
+    async def handle_connection(self, reader, writer):
+        if not self.open_session():
+            writer.write(b"\r\nMaximum number of sessions reached, try again later\r\n")
+            await self._close(writer)
+            return
+
+        try:
+            if await self._login(reader, writer):
+                await self._serve_commands(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.close_session()
+            await self._close(writer)
+
+    async def _login(self, reader, writer):
+        writer.write(b"\r\nUser Name : ")
+        username = (await self._read_line(reader)).strip()
+        writer.write(b"Password  : ")
+        password = (await self._read_line(reader)).strip()
+        await self.faults.delay(login=True)
+        if not self.is_valid_login(username, password):
+            writer.write(b"\r\nUser Name : ")
+            await writer.drain()
+            return False
+
+        writer.write(b"\r\n\r\nAmerican Power Conversion               Network Management Card AOS\r\n"
+                     b"Type ? for command listing\r\nUse tcpip command for IP address(-i), subnet(-s), and gateway(-g)"
+                     b"\r\n" + self.prompt)
+        await writer.drain()
+        return True
+
+    async def _serve_commands(self, reader, writer):
+        while True:
+            line = (await self._read_line(reader)).strip()
+            self.request_count += 1
+            if line == 'exit':
+                writer.write(b"\r\nBye.\r\n")
+                return
+
+            fault = await self.faults.next_fault()
+            if fault in (FaultInjector.FAULT_DROP, FaultInjector.FAULT_HANG):
+                return
+            await self.faults.delay()
+
+            if not line:
+                writer.write(self.prompt)
+            elif fault == FaultInjector.FAULT_ERROR:
+                writer.write(b"\r\nE101: Command Not Found" + b"\r\n" + self.prompt)
+            else:
+                writer.write(b"\r\n" + self._run(line).encode('utf-8') + b"\r\n" + self.prompt)
+            await writer.drain()
+
+    def _run(self, line):
+        words = line.split()
+        command = words[0]
+        if command not in ('olOn', 'olOff', 'olReboot', 'olStatus'):
+            return 'E101: Command Not Found'
+
+        try:
+            outlets = self._parse_outlets(words[1] if len(words) > 1 else 'all')
+        except ValueError:
+            return 'E102: Parameter Error'
+
+        if command == 'olStatus':
+            return 'E000: Success\r\n' + '\r\n'.join(
+                ' %d: Outlet %d: %s' % (outlet.number, outlet.number, 'On' if outlet.power_state else 'Off')
+                for outlet in outlets)
+
+        for outlet in outlets:
+            if command == 'olOn':
+                outlet.set_power_state(1)
+            elif command == 'olOff':
+                outlet.set_power_state(0)
+            else:
+                outlet.set_power_state(0)
+                asyncio.get_running_loop().call_later(self.reboot_off_time_in_secs, outlet.set_power_state, 1)
+        return 'E000: Success'
+
+    def _parse_outlets(self, outlet_list):
+        """
+        Parses an outlet list the way the APC CLI does, e.g. 1,3,5-8 or all
+        """
+        if outlet_list == 'all':
+            return list(self.outlets)
+
+        outlets = []
+        for outlet_range in outlet_list.split(','):
+            first, _, last = outlet_range.partition('-')
+            for number in range(int(first), int(last or first) + 1):
+                outlet = self.get_outlet(number)
+                if outlet is None:
+                    raise ValueError(number)
+                outlets.append(outlet)
+        return outlets
+
+    async def _read_line(self, reader):
+        line = await reader.readuntil(b"\n")
+        return line.decode('utf-8', 'replace')
+
+    async def _close(self, writer):
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
@@ -0,0 +1,122 @@
+"""
+Simulates the embedded web server of DLI web power switches, as scraped by dlipower: the challenge login page,
+/login.tgi, the outlet table of /index.htm and the /outlet?<n>=ON|OFF|CCL switching URLs
+"""
+import base64
+import hashlib
+import secrets
+import time
+from collections import deque
+
+from Simulators.SimulatorBase import HttpSimulatedPdu, HttpResponse
+
+
+class DliWebSimulator(HttpSimulatedPdu):
+    """
+    A simulated DLI web power switch
+    Logins beyond max_sessions are refused until a session expires, like the single admin session of the
+    real switches.
+    """
+    cookie_name = 'DLILPC'
+    default_session_timeout_in_secs = 600
+    max_pending_challenges = 64
+
+    def __init__(self, host, port, config, ssl_context=None, session_timeout_in_secs=None):
+        """
+        Initializes the class
+        @param session_timeout_in_secs: Sessions unused for this long are expired
+        """
+        HttpSimulatedPdu.__init__(self, host, port, config, ssl_context)
+        self._session_timeout_in_secs = session_timeout_in_secs or self.default_session_timeout_in_secs
+        self._challenges = deque(maxlen=self.max_pending_challenges)
+        self._sessions = dict()
+
+    async def handle_request(self, request, inject_error):
+        self._expire_sessions()
+        if inject_error:
+            return HttpResponse(500, 'Simulated fault', 'text/plain')
+
+        if request.method == 'POST' and request.path == '/login.tgi':
+            await self.faults.delay(login=True)
+            return self._login(request)
+
+        if not self._is_authenticated(request):
+            return self._login_page()
+
+        if request.path in ('/', '/index.htm'):
+            return HttpResponse(200, self._render_index())
+        if request.path == '/outlet':
+            return self._switch(request.query)
+        return HttpResponse(404, 'Not Found', 'text/plain')
+
+    def _login_page(self):
+        challenge = secrets.token_hex(8)
+        self._challenges.append(challenge)
+        return HttpResponse(200, '<html><body><form action="/login.tgi" method="post">'
+                                 '<input type="hidden" name="Challenge" value="%s">'
+                                 '<input type="text" name="Username" value="">'
+                                 '<input type="password" name="Password" value="">'
+                                 '</form></body></html>' % challenge)
+
+    def _login(self, request):
+        form = dict(field.split('=', 1) for field in request.body.decode('utf-8').split('&') if '=' in field)
+        # dlipower answers the challenge as md5(challenge + username + password + challenge)
+        for challenge in list(self._challenges):
+            expected = hashlib.md5((challenge + self.config.username + self.config.password + challenge)
+                                   .encode()).hexdigest()
+            if form.get('Password') == expected:
+                self._challenges.remove(challenge)
+                if not self.open_session():
+                    return HttpResponse(403, 'Too many sessions', 'text/plain')
+                session_id = secrets.token_hex(16)
+                self._sessions[session_id] = time.monotonic()
+                return HttpResponse(200, self._render_index(),
+                                    headers={'Set-Cookie': '%s=%s; path=/' % (self.cookie_name, session_id)})
+        return HttpResponse(403, 'Invalid login', 'text/plain')
+
+    def _is_authenticated(self, request):
+        for cookie in request.headers.get('cookie', '').split(';'):
+            name, _, value = cookie.strip().partition('=')
+            if name == self.cookie_name and value in self._sessions:
+                self._sessions[value] = time.monotonic()
+                return True
+
+        authorization = request.headers.get('authorization', '')
+        if authorization.lower().startswith('basic '):
+            try:
+                username, _, password = base64.b64decode(authorization[6:]).decode('utf-8').partition(':')
+            except ValueError:
+                return False
+            return self.is_valid_login(username, password)
+        return False
+
+    def _switch(self, query):
+        number, _, action = query.partition('=')
+        outlet = self.get_outlet(int(number)) if number.isdigit() else None
+        if outlet is None or action not in ('ON', 'OFF', 'CCL'):
+            return HttpResponse(400, 'Bad Request', 'text/plain')
+        if action == 'CCL':
+            # The outlet is back on by the time the next page is served
+            outlet.set_power_state(0)
+        outlet.set_power_state(0 if action == 'OFF' else 1)
+        return HttpResponse(200, self._render_index())
+
+    def _render_index(self):
+        rows = ''.join(
+            '<tr><td>%d</td><td>%s</td><td><font color="%s">%s</font></td>'
+            '<td><a href="outlet?%d=%s">Switch %s</a></td><td><a href="outlet?%d=CCL">Cycle</a></td></tr>'
+            % (outlet.number, outlet.name or 'Outlet %d' % outlet.number,
+               'green' if outlet.power_state else 'red', 'ON' if outlet.power_state else 'OFF',
+               outlet.number, 'OFF' if outlet.power_state else 'ON', 'OFF' if outlet.power_state else 'ON',
+               outlet.number)
+            for outlet in self.outlets)
+        return ('<html><head><title>Outlet Control</title></head><body><div>'
+                '<table><tr><th>#</th><th>Name</th><th>State</th><th colspan="2">Action</th></tr>%s</table>'
+                '</div></body></html>' % rows)
+
+    def _expire_sessions(self):
+        now = time.monotonic()
+        for session_id, last_used_at in list(self._sessions.items()):
+            if now - last_used_at >= self._session_timeout_in_secs:
+                del self._sessions[session_id]
+                self.close_session()
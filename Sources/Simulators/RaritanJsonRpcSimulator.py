@@ -0,0 +1,203 @@
+"""
+Simulates the JSON-RPC API of Raritan PDUs for the calls made by RaritanLibraryManager and RaritanSessionPool:
+/session (newSession, touchCurrentSession, closeCurrentSession), /bulk (performRequest), /model/pdu/0
+(getMetaData, getOutlets, setMultipleOutletPowerStates), its outlets (getMetaData, getState, getSettings,
+getSensors, setPowerState) and their sensors (getReading)
+Replies follow the JSON-RPC 2.0 encoding of the raritan.rpc bindings: return values in _ret_, structures as
+objects, enumerations as integers and object references as {"rid", "type"}. The type names below may have to be
+aligned with the version of raritan.rpc in use.
+"""
+import base64
+import json
+import secrets
+import time
+
+from Simulators.SimulatorBase import HttpSimulatedPdu, HttpResponse
+
+
+class RpcError(Exception):
+    """
+    A JSON-RPC error reply
+    """
+
+    def __init__(self, code, message):
+        Exception.__init__(self, message)
+        self.code = code
+
+
+class RaritanJsonRpcSimulator(HttpSimulatedPdu):
+    """
+    A simulated Raritan PDU
+    newSession beyond max_sessions fails, and unknown or expired session tokens are answered with HTTP 401 so
+    that the client authenticates again.
+    """
+    default_session_timeout_in_secs = 900
+    pdu_rid = '/model/pdu/0'
+    types = {
+        'outlet': 'pdumodel.Outlet:2.1.5',
+        'sensor': 'sensors.NumericSensor:4.0.3'
+    }
+    sensor_names = ('voltage', 'current', 'activeEnergy', 'lineFrequency')
+
+    # JSON-RPC error codes
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+
+    def __init__(self, host, port, config, ssl_context=None, session_timeout_in_secs=None):
+        """
+        Initializes the class
+        @param session_timeout_in_secs: Sessions unused for this long are expired
+        """
+        HttpSimulatedPdu.__init__(self, host, port, config, ssl_context)
+        self._session_timeout_in_secs = session_timeout_in_secs or self.default_session_timeout_in_secs
+        self._sessions = dict()
+
+    async def handle_request(self, request, inject_error):
+        if request.method != 'POST':
+            return HttpResponse(404, 'Not Found', 'text/plain')
+        try:
+            rpc_request = json.loads(request.body)
+        except ValueError:
+            return HttpResponse(400, 'Bad Request', 'text/plain')
+
+        self._expire_sessions()
+        token = request.headers.get('x-sessiontoken')
+        if token is not None:
+            if token not in self._sessions:
+                return HttpResponse(401, 'Unauthorized', 'text/plain')
+            self._sessions[token] = time.monotonic()
+        elif not self._is_valid_basic_auth(request.headers.get('authorization')):
+            return HttpResponse(401, 'Unauthorized', 'text/plain')
+
+        if request.path == '/session' and rpc_request.get('method') == 'newSession':
+            await self.faults.delay(login=True)
+
+        if inject_error:
+            rpc_response = self._error(rpc_request, self.INTERNAL_ERROR, 'Simulated fault')
+        else:
+            rpc_response = self._call(request.path, rpc_request, token)
+        return HttpResponse(200, json.dumps(rpc_response), 'application/json')
+
+    def _call(self, rid, rpc_request, token):
+        method = rpc_request.get('method')
+        params = rpc_request.get('params') or dict()
+        try:
+            if rid == '/bulk' and method == 'performRequest':
+                return self._result(rpc_request, {'responses': [{
+                    'statcode': 200,
+                    'json': self._call(sub_request['rid'], sub_request['json'], token)
+                } for sub_request in params['requests']]})
+            if rid == '/session':
+                return self._result(rpc_request, self._call_session(rid, method, token))
+            return self._result(rpc_request, self._call_model(rid, method, params))
+        except RpcError as err:
+            return self._error(rpc_request, err.code, str(err))
+        except (KeyError, TypeError, ValueError) as err:
+            return self._error(rpc_request, self.INVALID_PARAMS, 'Invalid params: ' + str(err))
+
+    def _call_session(self, rid, method, token):
+        if method == 'newSession':
+            if not self.open_session():
+                raise RpcError(self.INTERNAL_ERROR, 'Maximum number of sessions reached')
+            token = secrets.token_hex(16)
+            self._sessions[token] = time.monotonic()
+            return {'_ret_': 0, 'session': {'sessionId': self.session_count, 'username': self.config.username,
+                                            'remoteIp': '127.0.0.1', 'clientType': 'JSON-RPC',
+                                            'creationTime': int(time.time()),
+                                            'timeout': self._session_timeout_in_secs, 'idle': 0, 'userIdle': 0},
+                    'token': token}
+        if method == 'touchCurrentSession':
+            return {}
+        if method == 'closeCurrentSession':
+            if self._sessions.pop(token, None) is not None:
+                self.close_session()
+            return {}
+        raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+
+    def _call_model(self, rid, method, params):
+        parts = rid[len(self.pdu_rid):].strip('/').split('/') if rid.startswith(self.pdu_rid) else None
+        if parts is None:
+            raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+        if parts == ['']:
+            return self._call_pdu(rid, method, params)
+
+        if len(parts) < 2 or parts[0] != 'outlet' or not parts[1].isdigit():
+            raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+        outlet = self.get_outlet(int(parts[1]) + 1)
+        if outlet is None:
+            raise RpcError(self.METHOD_NOT_FOUND, 'No object ' + rid)
+        if len(parts) == 2:
+            return self._call_outlet(outlet, rid, method, params)
+        if len(parts) == 3 and parts[2] in self.sensor_names and method == 'getReading':
+            return {'_ret_': {'timestamp': int(time.time()), 'available': True, 'valid': True,
+                              'status': {'aboveUpperCritical': False, 'aboveUpperWarning': False,
+                                         'belowLowerWarning': False, 'belowLowerCritical': False},
+                              'value': outlet.get_readings()[parts[2]]}}
+        raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+
+    def _call_pdu(self, rid, method, params):
+        if method == 'getMetaData':
+            return {'_ret_': {
+                'nameplate': {'manufacturer': 'Raritan', 'model': 'PX3-SIM', 'partNumber': 'SIM',
+                              'serialNumber': self.serial_number, 'imageFileURL': '',
+                              'rating': {'voltage': '200-240V', 'current': '16A', 'frequency': '50/60Hz',
+                                         'power': '3.7kVA'}},
+                'ctrlBoardSerial': 'CB' + self.serial_number, 'hwRevision': '0x01', 'fwRevision': '4.0.1.5-sim',
+                'macAddress': self.mac_address, 'hasSwitchableOutlets': True, 'hasMeteredOutlets': True,
+                'hasLatchingOutletRelays': False, 'isInlineMeter': False, 'isEnergyPulseSupported': False
+            }}
+        if method == 'getOutlets':
+            return {'_ret_': [{'rid': '%s/outlet/%d' % (self.pdu_rid, outlet.number - 1),
+                               'type': self.types['outlet']} for outlet in self.outlets]}
+        if method == 'setMultipleOutletPowerStates':
+            outlets = [self.get_outlet(index + 1) for index in params['outletNumbers']]
+            if None in outlets:
+                return {'_ret_': 1}
+            for outlet in outlets:
+                outlet.set_power_state(params['state'])
+            return {'_ret_': 0}
+        raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+
+    def _call_outlet(self, outlet, rid, method, params):
+        if method == 'getMetaData':
+            return {'_ret_': {'label': str(outlet.number), 'receptacleType': 'IEC 60320 C13',
+                              'rating': {'current': 10.0, 'minVoltage': 200.0, 'maxVoltage': 240.0, 'power': 2400.0},
+                              'isSwitchable': True, 'isLatching': False, 'maxRelayCycleCnt': 100000}}
+        if method == 'getState':
+            return {'_ret_': {'available': True, 'powerState': outlet.power_state, 'switchOnInProgress': False,
+                              'cycleInProgress': False, 'isLoadShed': False,
+                              'lastPowerStateChange': int(outlet.last_power_state_change)}}
+        if method == 'getSettings':
+            return {'_ret_': {'name': outlet.name, 'startupState': 2, 'usePduCycleDelay': True, 'cycleDelay': 10,
+                              'nonCritical': False, 'sequenceDelay': 200}}
+        if method == 'getSensors':
+            sensors = {sensor_name: {'rid': '%s/%s' % (rid, sensor_name), 'type': self.types['sensor']}
+                       for sensor_name in self.sensor_names}
+            return {'_ret_': sensors}
+        if method == 'setPowerState':
+            outlet.set_power_state(params['pstate'])
+            return {'_ret_': 0}
+        raise RpcError(self.METHOD_NOT_FOUND, 'No method %s on %s' % (method, rid))
+
+    def _is_valid_basic_auth(self, authorization):
+        if not authorization or not authorization.lower().startswith('basic '):
+            return False
+        try:
+            username, _, password = base64.b64decode(authorization[6:]).decode('utf-8').partition(':')
+        except ValueError:
+            return False
+        return self.is_valid_login(username, password)
+
+    def _expire_sessions(self):
+        now = time.monotonic()
+        for token, last_used_at in list(self._sessions.items()):
+            if now - last_used_at >= self._session_timeout_in_secs:
+                del self._sessions[token]
+                self.close_session()
+
+    def _result(self, rpc_request, result):
+        return {'jsonrpc': '2.0', 'id': rpc_request.get('id'), 'result': result}
+
+    def _error(self, rpc_request, code, message):
+        return {'jsonrpc': '2.0', 'id': rpc_request.get('id'), 'error': {'code': code, 'message': message}}
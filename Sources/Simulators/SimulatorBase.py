@@ -0,0 +1,348 @@
+"""
+Building blocks shared by the vendor simulators: the state of a virtual PDU, latency and fault injection,
+and a minimal asyncio HTTP/1.1 server for the simulators speaking HTTP
+"""
+import asyncio
+import random
+import time
+from urllib.parse import unquote
+
+from PduLibrary.Common.BaseObject import BaseObject
+
+
+class SimulatorConfig(object):
+    """
+    Behaviour of a simulated PDU
+    """
+
+    def __init__(self,
+                 username='admin',
+                 password='admin',
+                 outlet_count=8,
+                 latency_in_secs=0.0,
+                 latency_jitter_in_secs=0.0,
+                 login_latency_in_secs=0.0,
+                 max_sessions=None,
+                 error_rate=0.0,
+                 drop_rate=0.0,
+                 hang_rate=0.0,
+                 hang_in_secs=60.0,
+                 seed=None):
+        """
+        Initializes the class
+        @param username: Username accepted by the PDU
+        @param password: Password accepted by the PDU
+        @param outlet_count: Number of outlets of the PDU
+        @param latency_in_secs: Delay added to every command / request
+        @param latency_jitter_in_secs: Random delay up to this many secs added on top of latency_in_secs
+        @param login_latency_in_secs: Delay added to every login
+        @param max_sessions: Maximum number of sessions open at the same time, None for no limit
+        @param error_rate: Probability of a command failing with a vendor error
+        @param drop_rate: Probability of the connection being dropped instead of answering
+        @param hang_rate: Probability of the PDU not answering for hang_in_secs
+        @param hang_in_secs: How long a hanging PDU stays silent
+        @param seed: Seed of the random generator deciding latency jitter and faults, for reproducible runs
+        """
+        self.username = username
+        self.password = password
+        self.outlet_count = outlet_count
+        self.latency_in_secs = latency_in_secs
+        self.latency_jitter_in_secs = latency_jitter_in_secs
+        self.login_latency_in_secs = login_latency_in_secs
+        self.max_sessions = max_sessions
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.hang_rate = hang_rate
+        self.hang_in_secs = hang_in_secs
+        self.seed = seed
+
+
+class FaultInjector(object):
+    """
+    Decides, request by request, the latency and the fault of a simulated PDU
+    """
+    FAULT_NONE = None
+    FAULT_ERROR = 'error'
+    FAULT_DROP = 'drop'
+    FAULT_HANG = 'hang'
+
+    def __init__(self, config):
+        self._config = config
+        self._random = random.Random(config.seed)
+
+    async def delay(self, login=False):
+        """
+        Waits for the configured latency, plus the login latency for logins
+        """
+        latency_in_secs = self._config.latency_in_secs
+        if self._config.latency_jitter_in_secs:
+            latency_in_secs += self._random.uniform(0, self._config.latency_jitter_in_secs)
+        if login:
+            latency_in_secs += self._config.login_latency_in_secs
+        if latency_in_secs > 0:
+            await asyncio.sleep(latency_in_secs)
+
+    async def next_fault(self):
+        """
+        Draws the fault of the next request, hanging right away when the fault is a hang
+        @return: One of FAULT_NONE, FAULT_ERROR, FAULT_DROP and FAULT_HANG
+        """
+        draw = self._random.random()
+        if draw < self._config.hang_rate:
+            await asyncio.sleep(self._config.hang_in_secs)
+            return self.FAULT_HANG
+        draw -= self._config.hang_rate
+        if draw < self._config.drop_rate:
+            return self.FAULT_DROP
+        draw -= self._config.drop_rate
+        if draw < self._config.error_rate:
+            return self.FAULT_ERROR
+        return self.FAULT_NONE
+
+
+class SimulatedOutlet(object):
+    """
+    An outlet of a simulated PDU, with slowly varying sensor readings
+    """
+
+    def __init__(self, number, rng):
+        self.number = number
+        self.name = ''
+        self.power_state = 1
+        self.last_power_state_change = time.time()
+        self._rng = rng
+        self.active_energy = rng.uniform(1000, 100000)
+
+    def set_power_state(self, power_state):
+        if power_state != self.power_state:
+            self.power_state = power_state
+            self.last_power_state_change = time.time()
+
+    def get_readings(self):
+        """
+        Gets the sensor readings of the outlet, no current flowing while it is off
+        @return: Dictionary with voltage, current, activeEnergy and lineFrequency
+        """
+        current = self._rng.uniform(0.1, 2.0) if self.power_state else 0.0
+        self.active_energy += current * 230 / 3600
+        return {
+            'voltage': round(self._rng.uniform(228, 232), 1),
+            'current': round(current, 3),
+            'activeEnergy': round(self.active_energy, 1),
+            'lineFrequency': round(self._rng.uniform(49.9, 50.1), 2)
+        }
+
+
+class SimulatedPdu(BaseObject):
+    """
+    State and session bookkeeping of one simulated PDU, shared by the vendor specific protocol front ends
+    """
+
+    def __init__(self, host, port, config):
+        """
+        Initializes the class
+        @param host: Address the PDU listens on
+        @param port: Port the PDU listens on
+        @param config: SimulatorConfig
+        """
+        BaseObject.__init__(self)
+        self.host = host
+        self.port = port
+        self.config = config
+        self.faults = FaultInjector(config)
+        rng = random.Random(config.seed)
+        self.outlets = [SimulatedOutlet(number, rng) for number in range(1, config.outlet_count + 1)]
+        self.serial_number = 'SIM%08d' % rng.randrange(10 ** 8)
+        self.mac_address = ':'.join('%02x' % rng.randrange(256) for _ in range(6))
+        self.session_count = 0
+        self.rejected_session_count = 0
+        self.request_count = 0
+        self._server = None
+        self._connections = dict()
+
+    def get_outlet(self, number):
+        """
+        Gets an outlet by its 1 based number
+        @return: SimulatedOutlet, None if the PDU has no such outlet
+        """
+        if 1 <= number <= len(self.outlets):
+            return self.outlets[number - 1]
+        return None
+
+    def is_valid_login(self, username, password):
+        return username == self.config.username and password == self.config.password
+
+    def open_session(self):
+        """
+        Takes a session slot
+        @return: False if the PDU already has max_sessions sessions open
+        """
+        if self.config.max_sessions is not None and self.session_count >= self.config.max_sessions:
+            self.rejected_session_count += 1
+            return False
+        self.session_count += 1
+        return True
+
+    def close_session(self):
+        self.session_count = max(0, self.session_count - 1)
+
+    def get_stats(self):
+        return {
+            'host': self.host,
+            'port': self.port,
+            'requestCount': self.request_count,
+            'openSessionCount': self.session_count,
+            'rejectedSessionCount': self.rejected_session_count
+        }
+
+    async def start(self):
+        """
+        Starts listening, must be called from the event loop running the simulator
+        """
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port,
+                                                  **self.get_server_options())
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stops listening and drops the open connections
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if not self._connections:
+            return
+        # Closing the transports ends the handlers waiting on the client, only hanging ones need cancelling
+        for writer in self._connections.values():
+            writer.transport.abort()
+        _, pending = await asyncio.wait(list(self._connections), timeout=1.0)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _serve_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            await self.handle_connection(reader, writer)
+        except asyncio.CancelledError:
+            writer.transport.abort()
+        finally:
+            self._connections.pop(task, None)
+
+    def get_server_options(self):
+        """
+        Extra asyncio.start_server options, e.g. an ssl context
+        """
+        return dict()
+
+    async def handle_connection(self, reader, writer):
+        raise NotImplementedError()
+
+
+class HttpRequest(object):
+    """
+    A parsed HTTP/1.1 request
+    """
+
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        self.target = target
+        self.headers = headers
+        self.body = body
+        path, _, query = target.partition('?')
+        self.path = unquote(path)
+        self.query = query
+
+
+class HttpResponse(object):
+    """
+    An HTTP/1.1 response
+    """
+    reasons = {200: 'OK', 302: 'Found', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden',
+               404: 'Not Found', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+    def __init__(self, status=200, body=b'', content_type='text/html', headers=None):
+        self.status = status
+        self.body = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.headers = dict(headers or {})
+        self.headers['Content-Type'] = content_type
+
+    def encode(self, keep_alive):
+        lines = ['HTTP/1.1 %d %s' % (self.status, self.reasons.get(self.status, 'Unknown'))]
+        headers = dict(self.headers)
+        headers['Content-Length'] = str(len(self.body))
+        headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        lines.extend('%s: %s' % (name, value) for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + self.body
+
+
+class HttpSimulatedPdu(SimulatedPdu):
+    """
+    A simulated PDU serving HTTP/1.1 with keep-alive, optionally over TLS
+    Subclasses implement handle_request; latency and drop/hang faults are applied to every request
+    """
+    max_header_size = 65536
+
+    def __init__(self, host, port, config, ssl_context=None):
+        SimulatedPdu.__init__(self, host, port, config)
+        self._ssl_context = ssl_context
+
+    def get_server_options(self):
+        return {'ssl': self._ssl_context} if self._ssl_context is not None else dict()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    return
+                self.request_count += 1
+
+                fault = await self.faults.next_fault()
+                if fault in (FaultInjector.FAULT_DROP, FaultInjector.FAULT_HANG):
+                    return
+                await self.faults.delay()
+
+                response = await self.handle_request(request, fault == FaultInjector.FAULT_ERROR)
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return
+        finally:
+            writer.close()
+
+    async def handle_request(self, request, inject_error):
+        """
+        Answers a request
+        @param request: HttpRequest
+        @param inject_error: Whether the fault injector asks for this request to fail
+        @return: HttpResponse
+        """
+        raise NotImplementedError()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        if len(head) > self.max_header_size:
+            return None
+
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = lines[0].split(' ', 2)
+        headers = dict()
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        body = b''
+        content_length = int(headers.get('content-length', 0))
+        if content_length:
+            body = await reader.readexactly(content_length)
+        return HttpRequest(method, target, headers, body)
@@ -0,0 +1,209 @@
+"""
+Starts many simulated PDUs of one vendor on localhost, every PDU on its own loopback address (127.x.y.z),
+all served by a single asyncio event loop
+
+Usage (from the Sources folder):
+    python -m Simulators.SimulatorFarm --vendor apc --count 1000 --latency 0.05 --targets-file targets.json
+
+The targets file lists {manufacturer, ip, username, password} per PDU, ready for the /v1/fleet endpoint.
+Point the library at the farm with ApcSessionManager.get_instance(telnet_port=<port>) for APC and
+RaritanSessionPool.get_instance(rpc_scheme='http') for Raritan; the ip of HTTP PDUs includes their port.
+Linux routes the whole 127.0.0.0/8 range to the loopback interface, other systems need the addresses aliased.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import threading
+import time
+
+from Simulators.ApcTelnetSimulator import ApcTelnetSimulator
+from Simulators.DliWebSimulator import DliWebSimulator
+from Simulators.RaritanJsonRpcSimulator import RaritanJsonRpcSimulator
+from Simulators.SimulatorBase import SimulatorConfig
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class SimulatorFarm(object):
+    """
+    A set of simulated PDUs of one vendor, running on an event loop thread of their own
+    """
+    simulator_classes = {
+        'apc': ApcTelnetSimulator,
+        'raritan': RaritanJsonRpcSimulator,
+        'dli': DliWebSimulator
+    }
+    default_ports = {
+        'apc': 2323,
+        'raritan': 8080,
+        'dli': 8081
+    }
+    default_base_address = '127.1.0.1'
+
+    def __init__(self, vendor, count, config=None, base_address=None, port=None, ssl_context=None):
+        """
+        Initializes the class
+        @param vendor: apc, raritan or dli
+        @param count: Number of PDUs
+        @param config: SimulatorConfig shared by the PDUs, each PDU gets its own seed derived from config.seed
+        @param base_address: Loopback address of the first PDU, the next ones take the following addresses
+        @param port: Port every PDU listens on, 0 for a free port per PDU
+        @param ssl_context: Serves Raritan and DLI over TLS with this context
+        """
+        self.vendor = vendor.lower()
+        self._simulator_class = self.simulator_classes[self.vendor]
+        self._count = count
+        self._config = config or SimulatorConfig()
+        self._base_address = ipaddress.IPv4Address(base_address or self.default_base_address)
+        self._port = self.default_ports[self.vendor] if port is None else port
+        self._ssl_context = ssl_context
+        self._loop = None
+        self._thread = None
+        self.pdus = []
+
+    def start(self):
+        """
+        Starts the PDUs and returns once they all listen
+        """
+        self._raise_open_file_limit(2 * self._count + 256)
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._start_pdus())
+            except Exception as err:
+                errors.append(err)
+            started.set()
+            if not errors:
+                self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='SimulatorFarm-' + self.vendor, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self):
+        """
+        Stops every PDU and the event loop
+        """
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_pdus(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def get_targets(self):
+        """
+        Gets the PDUs as library targets
+        @return: List of {manufacturer, ip, username, password}
+        """
+        return [{
+            'manufacturer': self.vendor,
+            'ip': pdu.host if self.vendor == 'apc' else '%s:%d' % (pdu.host, pdu.port),
+            'username': self._config.username,
+            'password': self._config.password
+        } for pdu in self.pdus]
+
+    def get_stats(self):
+        """
+        Gets the request and session counts summed over the PDUs
+        """
+        stats = {'pduCount': len(self.pdus), 'requestCount': 0, 'openSessionCount': 0, 'rejectedSessionCount': 0}
+        for pdu in self.pdus:
+            for name, value in pdu.get_stats().items():
+                if name in stats:
+                    stats[name] += value
+        return stats
+
+    async def _start_pdus(self):
+        for index in range(self._count):
+            config = SimulatorConfig(**vars(self._config))
+            if config.seed is not None:
+                config.seed += index
+            host = str(self._base_address + index)
+            if self.vendor == 'apc':
+                pdu = self._simulator_class(host, self._port, config)
+            else:
+                pdu = self._simulator_class(host, self._port, config, self._ssl_context)
+            await pdu.start()
+            self.pdus.append(pdu)
+
+    async def _stop_pdus(self):
+        await asyncio.gather(*[pdu.stop() for pdu in self.pdus])
+
+    def _raise_open_file_limit(self, open_file_count):
+        """
+        Every PDU takes a listening socket, and every session a connection
+        """
+        if resource is None:
+            return
+        soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit != resource.RLIM_INFINITY and soft_limit < open_file_count:
+            new_limit = open_file_count if hard_limit == resource.RLIM_INFINITY else min(open_file_count, hard_limit)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_limit, hard_limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated PDU farm')
+    parser.add_argument('--vendor', required=True, choices=sorted(SimulatorFarm.simulator_classes))
+    parser.add_argument('--count', type=int, default=1, help='Number of PDUs')
+    parser.add_argument('--base-address', default=SimulatorFarm.default_base_address,
+                        help='Loopback address of the first PDU')
+    parser.add_argument('--port', type=int, help='Port of every PDU, defaults to 2323 (apc), 8080 (raritan) or '
+                                                 '8081 (dli)')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--outlets', type=int, default=8, help='Number of outlets per PDU')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay of every command in secs')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay of up to this many secs')
+    parser.add_argument('--login-latency', type=float, default=0.0, help='Delay of every login in secs')
+    parser.add_argument('--max-sessions', type=int, help='Maximum number of sessions per PDU')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a command failing')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Probability of a connection drop')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Probability of the PDU not answering')
+    parser.add_argument('--hang', type=float, default=60.0, help='How long a hanging PDU stays silent in secs')
+    parser.add_argument('--seed', type=int, help='Seed of the latency jitter and faults')
+    parser.add_argument('--targets-file', help='Writes the targets of the PDUs as JSON to this file')
+    parser.add_argument('--stats-interval', type=float, default=10.0, help='Prints the stats this often in secs')
+    args = parser.parse_args()
+
+    config = SimulatorConfig(username=args.username,
+                             password=args.password,
+                             outlet_count=args.outlets,
+                             latency_in_secs=args.latency,
+                             latency_jitter_in_secs=args.jitter,
+                             login_latency_in_secs=args.login_latency,
+                             max_sessions=args.max_sessions,
+                             error_rate=args.error_rate,
+                             drop_rate=args.drop_rate,
+                             hang_rate=args.hang_rate,
+                             hang_in_secs=args.hang,
+                             seed=args.seed)
+    farm = SimulatorFarm(args.vendor, args.count, config, args.base_address, args.port)
+    farm.start()
+    targets = farm.get_targets()
+    print('Started %d %s PDUs, %s to %s' % (len(targets), args.vendor, targets[0]['ip'], targets[-1]['ip']))
+    if args.targets_file:
+        with open(args.targets_file, 'w') as file_handler:
+            json.dump(targets, file_handler, indent=2)
+
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            print(json.dumps(farm.get_stats()))
+    except KeyboardInterrupt:
+        farm.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -65,6 +65,12 @@ setup(
         ],
         'PduLibrary.commands': [
             'restserver = PduLibrary.Commands.RestServer:RestServer'
+        ],
+        'PduLibrary.drivers': [
+            'raritan = PduLibrary.PDUManager.RaritanLibraryManager:RaritanLibraryManager',
+            'dli = PduLibrary.PDUManager.DliLibraryManager:DliLibraryManager',
+            'apc = PduLibrary.PDUManager.ApcLibraryManager:ApcLibraryManager',
+            'aten = PduLibrary.PDUManager.AtenLibraryManager:AtenLibraryManager'
         ]
     },
     zip_safe=False